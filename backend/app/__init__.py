@@ -10,7 +10,8 @@ from app.extensions import db, migrate, jwt, ma
 
 def create_app(config_class=Config):
     """Create and configure the Flask application."""
-    app = Flask(__name__)
+    # No static route: generated media is only served through the authenticated /api/media
+    app = Flask(__name__, static_folder=None)
     app.config.from_object(config_class)
 
     # Initialize extensions
@@ -24,7 +25,8 @@ def create_app(config_class=Config):
         r"/api/*": {
             "origins": app.config.get('CORS_ORIGINS', '*'),
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "Range"],
+            "expose_headers": ["Content-Range", "Accept-Ranges", "ETag"]
         }
     })
 
@@ -32,9 +34,17 @@ def create_app(config_class=Config):
     from app.routes.auth import auth_bp
     from app.routes.video import video_bp
     from app.routes.health import health_bp
+    from app.routes.webhooks import webhook_bp
+    from app.routes.media import media_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(video_bp, url_prefix='/api/videos')
+    app.register_blueprint(webhook_bp, url_prefix='/api/webhooks')
+    app.register_blueprint(media_bp, url_prefix='/api/media')
     app.register_blueprint(health_bp, url_prefix='/api')
 
+    # Push committed status/progress changes to SSE streams
+    from app.services.progress_events import register_progress_events
+    register_progress_events()
+    
     return app
@@ -40,8 +40,70 @@ class Config:
     REPLICATE_API_TOKEN = os.getenv('REPLICATE_API_TOKEN')
     
     # Video settings
-    VIDEO_OUTPUT_DIR = os.getenv('VIDEO_OUTPUT_DIR', 'app/static/videos')
+    VIDEO_OUTPUT_DIR = os.getenv('VIDEO_OUTPUT_DIR', 'media')
     MAX_VIDEO_DURATION = int(os.getenv('MAX_VIDEO_DURATION', '60'))
+    VIDEO_BATCH_MAX_ITEMS = int(os.getenv('VIDEO_BATCH_MAX_ITEMS', '500'))  # POST /api/videos/batch
+    
+    # Provider status polling (self-rescheduling, exponential backoff)
+    VIDEO_POLL_INTERVAL = int(os.getenv('VIDEO_POLL_INTERVAL', '5'))  # seconds
+    VIDEO_POLL_MAX_INTERVAL = int(os.getenv('VIDEO_POLL_MAX_INTERVAL', '60'))
+    VIDEO_POLL_BACKOFF = float(os.getenv('VIDEO_POLL_BACKOFF', '1.5'))
+    VIDEO_POLL_TIMEOUT = int(os.getenv('VIDEO_POLL_TIMEOUT', '600'))  # 10 minutes
+    VIDEO_JOIN_TIMEOUT = int(os.getenv('VIDEO_JOIN_TIMEOUT', '900'))  # finalize without a branch that never joined
+    
+    # Status polling mode: task (per-video Celery polling) or service (centralized poller)
+    VIDEO_STATUS_POLLER = os.getenv('VIDEO_STATUS_POLLER', 'task')
+    STATUS_POLLER_INTERVAL = float(os.getenv('STATUS_POLLER_INTERVAL', '5'))  # seconds
+    STATUS_POLLER_CONCURRENCY = int(os.getenv('STATUS_POLLER_CONCURRENCY', '100'))
+    STATUS_POLLER_BATCH_SIZE = int(os.getenv('STATUS_POLLER_BATCH_SIZE', '5000'))
+    
+    # Server-Sent Events, per web process (each open stream holds a gunicorn thread)
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '24'))  # leaves 8 of 32 threads for API requests
+    SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', '300'))  # clients reconnect after this
+    SSE_RETRY_MS = int(os.getenv('SSE_RETRY_MS', '3000'))  # EventSource reconnect delay
+    
+    # Batch dispatch: direct (straight to the batch queue) or fair (run-dispatcher process,
+    # weighted round-robin across users)
+    BATCH_DISPATCH = os.getenv('BATCH_DISPATCH', 'direct')
+    FAIR_SHARE_WEIGHTS = os.getenv('FAIR_SHARE_WEIGHTS', '')  # "<user_id>:<weight>,..."
+    FAIR_SHARE_DEFAULT_WEIGHT = int(os.getenv('FAIR_SHARE_DEFAULT_WEIGHT', '1'))
+    FAIR_SHARE_QUEUE_DEPTH = int(os.getenv('FAIR_SHARE_QUEUE_DEPTH', '8'))  # messages kept in the batch queue
+    FAIR_SHARE_INTERVAL = float(os.getenv('FAIR_SHARE_INTERVAL', '1'))  # seconds
+    
+    # Provider webhooks (polling becomes a slow fallback sweeper when enabled)
+    REPLICATE_WEBHOOK_URL = os.getenv('REPLICATE_WEBHOOK_URL')
+    REPLICATE_WEBHOOK_SECRET = os.getenv('REPLICATE_WEBHOOK_SECRET')
+    WEBHOOK_TOLERANCE = int(os.getenv('WEBHOOK_TOLERANCE', '300'))  # seconds
+    VIDEO_WEBHOOK_FALLBACK_INTERVAL = int(os.getenv('VIDEO_WEBHOOK_FALLBACK_INTERVAL', '300'))
+    
+    # Outbound HTTP (HTTP_* in .env.example) is configured from the environment by
+    # app.utils.http_client, since its pools are built outside any app context
+    
+    # LLM response cache (scripts and SEO metadata)
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True').lower() == 'true'
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', '86400'))  # seconds
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1024'))  # per process
+    
+    # Generated-video result cache (optional)
+    VIDEO_CACHE_ENABLED = os.getenv('VIDEO_CACHE_ENABLED', 'False').lower() == 'true'
+    VIDEO_CACHE_TTL = int(os.getenv('VIDEO_CACHE_TTL', str(7 * 86400)))  # seconds
+    VIDEO_CACHE_MAX_BYTES = int(os.getenv('VIDEO_CACHE_MAX_BYTES', str(10 * 1024 ** 3)))  # budget for VIDEO_OUTPUT_DIR/cache
+    MEDIA_URL_PREFIX = os.getenv('MEDIA_URL_PREFIX', '/api/media')
+    
+    # Media delivery (/api/media)
+    MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', '86400'))  # seconds, browser cache only
+    MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')  # nginx internal location, e.g. /protected-media
+    MEDIA_TOKEN_TTL = int(os.getenv('MEDIA_TOKEN_TTL', '3600'))  # seconds, per-video media cookie
+    MEDIA_COOKIE_SECURE = os.getenv('MEDIA_COOKIE_SECURE', 'False').lower() == 'true'
+    MEDIA_COOKIE_SAMESITE = os.getenv('MEDIA_COOKIE_SAMESITE', 'Lax')  # None when the frontend is on another site
+    
+    # HLS packaging of finished videos (optional)
+    HLS_ENABLED = os.getenv('HLS_ENABLED', 'False').lower() == 'true'
+    
+    # In-flight coalescing of identical generation requests
+    VIDEO_COALESCE_ENABLED = os.getenv('VIDEO_COALESCE_ENABLED', 'True').lower() == 'true'
+    VIDEO_COALESCE_CLAIM_TTL = int(os.getenv('VIDEO_COALESCE_CLAIM_TTL', '120'))  # seconds
+    IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', '86400'))  # provider submission keys
     
     # AI Provider selection
     AI_VIDEO_PROVIDER = os.getenv('AI_VIDEO_PROVIDER', 'replicate')  # replicate, runway, mock
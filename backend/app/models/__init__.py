@@ -4,5 +4,6 @@ Database Models
 from app.models.user import User
 from app.models.video import Video
 from app.models.generation_task import GenerationTask
+from app.models.video_cache_entry import VideoCacheEntry
 
-__all__ = ['User', 'Video', 'GenerationTask']
+__all__ = ['User', 'Video', 'GenerationTask', 'VideoCacheEntry']
@@ -19,9 +19,13 @@ class GenerationTask(db.Model):
     """Background task tracking model."""
     
     __tablename__ = 'generation_tasks'
+    __table_args__ = (
+        # Latest task per video (get_video, retries)
+        db.Index('ix_generation_tasks_video_created', 'video_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False, index=True)
+    video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False)
     
     # Celery task info
     celery_task_id = db.Column(db.String(255), unique=True, index=True)
@@ -35,12 +39,59 @@ class GenerationTask(db.Model):
     # External provider info
     provider = db.Column(db.String(50))
     provider_task_id = db.Column(db.String(255))
+    fingerprint = db.Column(db.String(64), index=True)  # generation fingerprint (result cache key)
+    
+    # Poll state (persisted between self-rescheduling status checks)
+    poll_attempts = db.Column(db.Integer, default=0)
+    last_polled_at = db.Column(db.DateTime)
+    
+    # Pipeline join: branches (media, narration) still running before finalize
+    pending_branches = db.Column(db.Integer)
+    
+    # Stage checkpoints (retries resume after the last completed stage)
+    idempotency_key = db.Column(db.String(64))  # provider submission key
+    script_done_at = db.Column(db.DateTime)
+    submitted_at = db.Column(db.DateTime)
+    downloaded_at = db.Column(db.DateTime)
+    post_processed_at = db.Column(db.DateTime)
+    output_path = db.Column(db.String(500))
     
     # Timestamps
     started_at = db.Column(db.DateTime)
     finished_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Checkpoint columns carried over to a new task row by /retry
+    CHECKPOINT_FIELDS = (
+        'provider',
+        'provider_task_id',
+        'fingerprint',
+        'idempotency_key',
+        'script_done_at',
+        'submitted_at',
+        'downloaded_at',
+        'post_processed_at',
+        'output_path',
+    )
+    
+    @property
+    def stage(self) -> str:
+        """Last completed pipeline stage."""
+        if self.post_processed_at:
+            return 'post_processed'
+        if self.downloaded_at:
+            return 'downloaded'
+        if self.submitted_at:
+            return 'submitted'
+        if self.script_done_at:
+            return 'script'
+        return 'pending'
+    
+    def resume_from(self, previous: 'GenerationTask') -> None:
+        """Copy stage checkpoints from an earlier attempt."""
+        for field in self.CHECKPOINT_FIELDS:
+            setattr(self, field, getattr(previous, field))
+    
     def to_dict(self) -> dict:
         """Serialize task to dictionary."""
         return {
@@ -52,6 +103,7 @@ class GenerationTask(db.Model):
             'progress': self.progress,
             'error_message': self.error_message,
             'provider': self.provider,
+            'stage': self.stage,
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'finished_at': self.finished_at.isoformat() if self.finished_at else None,
         }
@@ -17,6 +17,7 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     full_name = db.Column(db.String(255))
     is_active = db.Column(db.Boolean, default=True)
+    video_cache_enabled = db.Column(db.Boolean, default=True)  # reuse/share identical generations
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -38,6 +39,7 @@ class User(db.Model):
             'email': self.email,
             'full_name': self.full_name,
             'is_active': self.is_active,
+            'video_cache_enabled': self.video_cache_enabled,
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
     
@@ -3,6 +3,7 @@ Video Model
 """
 from datetime import datetime
 from enum import Enum
+from typing import Iterable, Optional
 
 from app.extensions import db
 
@@ -19,9 +20,14 @@ class Video(db.Model):
     """Video project model."""
     
     __tablename__ = 'videos'
+    __table_args__ = (
+        # list_videos: per-user keyset pages, with and without a status filter
+        db.Index('ix_videos_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_videos_user_status_created', 'user_id', 'status', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Prompt and content
     prompt = db.Column(db.Text, nullable=False)
@@ -43,6 +49,8 @@ class Video(db.Model):
     status = db.Column(db.String(20), default=VideoStatus.PENDING.value, index=True)
     video_url = db.Column(db.String(500))
     thumbnail_url = db.Column(db.String(500))
+    storyboard_url = db.Column(db.String(500))  # WebVTT index into the preview sprite
+    hls_url = db.Column(db.String(500))  # HLS master playlist (adaptive bitrate ladder)
     audio_url = db.Column(db.String(500))
     error_message = db.Column(db.Text)
     
@@ -53,8 +61,17 @@ class Video(db.Model):
     # Relationships
     generation_tasks = db.relationship('GenerationTask', backref='video', lazy='dynamic', cascade='all, delete-orphan')
     
-    def to_dict(self) -> dict:
-        """Serialize video to dictionary."""
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Serialize video to dictionary.
+        
+        Args:
+            fields: Only serialize these columns (sparse fieldset); only
+                those need to be loaded
+        """
+        if fields is not None:
+            return {name: self._serialize(name) for name in fields}
+        
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -71,11 +88,22 @@ class Video(db.Model):
             'status': self.status,
             'video_url': self.video_url,
             'thumbnail_url': self.thumbnail_url,
+            'storyboard_url': self.storyboard_url,
+            'hls_url': self.hls_url,
             'audio_url': self.audio_url,
             'error_message': self.error_message,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
     
+    def _serialize(self, name: str):
+        """JSON value of a single column, as in :meth:`to_dict`."""
+        value = getattr(self, name)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if name == 'seo_tags':
+            return value or []
+        return value
+    
     def __repr__(self):
         return f'<Video {self.id} - {self.status}>'
@@ -0,0 +1,40 @@
+"""
+Video Cache Entry Model
+"""
+from datetime import datetime
+
+from app.extensions import db
+
+
+class VideoCacheEntry(db.Model):
+    """Stored generation result, keyed on the generation fingerprint."""
+    
+    __tablename__ = 'video_cache_entries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    
+    # Stored artifact
+    file_path = db.Column(db.String(500), nullable=False)
+    size_bytes = db.Column(db.BigInteger, default=0)
+    provider = db.Column(db.String(50))
+    
+    # Usage (LRU eviction)
+    hits = db.Column(db.Integer, default=0)
+    last_accessed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self) -> dict:
+        """Serialize cache entry to dictionary."""
+        return {
+            'id': self.id,
+            'fingerprint': self.fingerprint,
+            'size_bytes': self.size_bytes,
+            'provider': self.provider,
+            'hits': self.hits,
+            'last_accessed_at': self.last_accessed_at.isoformat() if self.last_accessed_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<VideoCacheEntry {self.fingerprint[:12]}>'
@@ -4,5 +4,7 @@ API Routes
 from app.routes.auth import auth_bp
 from app.routes.video import video_bp
 from app.routes.health import health_bp
+from app.routes.webhooks import webhook_bp
+from app.routes.media import media_bp
 
-__all__ = ['auth_bp', 'video_bp', 'health_bp']
+__all__ = ['auth_bp', 'video_bp', 'health_bp', 'webhook_bp', 'media_bp']
@@ -121,6 +121,9 @@ def update_current_user():
     if 'full_name' in data:
         user.full_name = data['full_name'].strip()
     
+    if 'video_cache_enabled' in data:
+        user.video_cache_enabled = bool(data['video_cache_enabled'])
+    
     if 'password' in data:
         is_valid, message = validate_password(data['password'])
         if not is_valid:
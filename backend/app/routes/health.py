@@ -1,8 +1,14 @@
 """
 Health Check Routes
 """
-from flask import Blueprint, jsonify
+import redis
+from flask import Blueprint, current_app, jsonify
 from app.extensions import db
+from app.services.fair_scheduler import FairScheduler
+from app.services.llm_cache import get_llm_cache
+from app.utils.ffmpeg_scheduler import get_ffmpeg_scheduler, get_host_metrics
+from app.utils.http_client import get_pool_metrics
+from app.utils.queue_metrics import get_queue_wait_metrics
 
 health_bp = Blueprint('health', __name__)
 
@@ -31,3 +37,53 @@ def db_health_check():
             'database': 'disconnected',
             'error': str(e)
         }), 503
+
+
+@health_bp.route('/health/http', methods=['GET'])
+def http_pool_health_check():
+    """Outbound HTTP connection pool metrics for this process."""
+    return jsonify({
+        'status': 'healthy',
+        'pools': get_pool_metrics()
+    }), 200
+
+
+@health_bp.route('/health/llm-cache', methods=['GET'])
+def llm_cache_health_check():
+    """LLM cache hit/miss counters for this process."""
+    return jsonify({
+        'status': 'healthy',
+        'llm_cache': get_llm_cache().stats()
+    }), 200
+
+
+@health_bp.route('/health/ffmpeg', methods=['GET'])
+def ffmpeg_health_check():
+    """FFmpeg slot limits and queue-wait totals across worker processes."""
+    scheduler = get_ffmpeg_scheduler()
+    return jsonify({
+        'status': 'healthy',
+        'max_jobs': scheduler.max_jobs,
+        'threads_per_job': scheduler.threads_per_job,
+        'reserved_slots': scheduler.reserved_slots,
+        'queue_wait': get_host_metrics()
+    }), 200
+
+
+@health_bp.route('/health/queues', methods=['GET'])
+def queues_health_check():
+    """Celery queue-wait per queue (tier) and the fair-share backlog."""
+    try:
+        backlog = FairScheduler.from_config(current_app.config).backlog()
+    except redis.RedisError:
+        backlog = {}
+    
+    return jsonify({
+        'status': 'healthy',
+        'batch_dispatch': current_app.config['BATCH_DISPATCH'],
+        'queue_wait': get_queue_wait_metrics(),
+        'fair_share': {
+            'users': sum(1 for waiting in backlog.values() if waiting),
+            'backlog': sum(backlog.values())
+        }
+    }), 200
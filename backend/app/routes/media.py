@@ -0,0 +1,140 @@
+"""
+Media Routes
+
+Authenticated delivery of generated files from VIDEO_OUTPUT_DIR.
+"""
+import os
+from typing import Optional
+from urllib.parse import urlparse
+
+from flask import Blueprint, current_app, jsonify, make_response, request, send_from_directory
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.security import safe_join
+
+from app.models.video import Video
+
+media_bp = Blueprint('media', __name__)
+
+MEDIA_COOKIE = 'media_token'
+
+
+def _media_serializer() -> URLSafeTimedSerializer:
+    """Signer for media cookies."""
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='media')
+
+
+def _media_path(video_id: int) -> str:
+    """URL path of a video's media directory (the media cookie's scope)."""
+    prefix = urlparse(current_app.config['MEDIA_URL_PREFIX']).path.rstrip('/')
+    return f"{prefix}/{video_id}/"
+
+
+def _media_user_id(video_id: int) -> Optional[str]:
+    """
+    Identify the caller from an ``Authorization`` header or the video's
+    media cookie.
+    
+    Returns:
+        User ID, or None if neither is present and valid
+    """
+    if verify_jwt_in_request(optional=True, locations=['headers']):
+        return get_jwt_identity()
+    
+    token = request.cookies.get(MEDIA_COOKIE)
+    if not token:
+        return None
+    
+    try:
+        claims = _media_serializer().loads(token, max_age=current_app.config['MEDIA_TOKEN_TTL'])
+    except BadSignature:  # includes SignatureExpired
+        return None
+    
+    if claims.get('video_id') != video_id:
+        return None
+    return claims.get('user_id')
+
+
+@media_bp.route('/<int:video_id>/session', methods=['POST'])
+@jwt_required()
+def create_media_session(video_id):
+    """
+    Issue a media cookie for one of the current user's videos.
+    
+    The cookie is signed, expires after ``MEDIA_TOKEN_TTL`` seconds and is
+    scoped to ``<MEDIA_URL_PREFIX>/<video_id>/``, so native HLS players and
+    the storyboard sprite referenced from the WebVTT index are authorized
+    without an ``Authorization`` header or a token in the URL.
+    """
+    current_user_id = get_jwt_identity()
+    
+    video = Video.query.filter_by(id=video_id, user_id=current_user_id).first()
+    
+    if not video:
+        return jsonify({'error': 'Video not found'}), 404
+    
+    ttl = current_app.config['MEDIA_TOKEN_TTL']
+    path = _media_path(video_id)
+    token = _media_serializer().dumps({'video_id': video_id, 'user_id': current_user_id})
+    
+    response = jsonify({'path': path, 'expires_in': ttl})
+    response.set_cookie(
+        MEDIA_COOKIE,
+        token,
+        max_age=ttl,
+        path=path,
+        secure=current_app.config['MEDIA_COOKIE_SECURE'],
+        httponly=True,
+        samesite=current_app.config['MEDIA_COOKIE_SAMESITE']
+    )
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@media_bp.route('/<int:video_id>/<path:filename>', methods=['GET'])
+def get_media(video_id, filename):
+    """
+    Serve a generated file (video, thumbnail, storyboard, HLS playlist or
+    segment) for one of the current user's videos.
+    
+    Authorized by an ``Authorization`` header or by the media cookie from
+    ``POST /<video_id>/session`` (for players that cannot set headers;
+    tokens are never accepted in the URL, which would put them in access
+    logs). Responses support Range/206, ``ETag``/``If-None-Match`` and
+    ``Last-Modified``; the file body is handed to the WSGI server's file
+    wrapper (``sendfile``). With ``MEDIA_ACCEL_REDIRECT`` set, the body is
+    offloaded to nginx via ``X-Accel-Redirect`` instead.
+    """
+    current_user_id = _media_user_id(video_id)
+    
+    if current_user_id is None:
+        return jsonify({'error': 'Authorization required'}), 401
+    
+    video = Video.query.filter_by(id=video_id, user_id=current_user_id).first()
+    
+    if not video:
+        return jsonify({'error': 'Video not found'}), 404
+    
+    video_dir = os.path.abspath(os.path.join(current_app.config['VIDEO_OUTPUT_DIR'], str(video_id)))
+    file_path = safe_join(video_dir, filename)
+    
+    if not file_path or not os.path.isfile(file_path):
+        return jsonify({'error': 'File not found'}), 404
+    
+    max_age = current_app.config['MEDIA_CACHE_MAX_AGE']
+    accel_prefix = current_app.config['MEDIA_ACCEL_REDIRECT']
+    
+    if accel_prefix:
+        # nginx serves the bytes (ranges, validators, sendfile) from an internal location
+        response = make_response('', 200)
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{video_id}/{filename}"
+        del response.headers['Content-Type']  # let nginx derive it from the file
+    else:
+        response = send_from_directory(video_dir, filename, conditional=True, etag=True, max_age=max_age)
+    
+    # Per-user content: cacheable by the browser, not by shared caches
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    
+    return response
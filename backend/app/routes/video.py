@@ -1,17 +1,32 @@
 """
 Video Routes
 """
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from typing import Callable
+
+from celery import group
+from celery.utils import uuid
+from flask import Blueprint, Response, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.orm import load_only
 
 from app.extensions import db
 from app.models.video import Video, VideoStatus
 from app.models.generation_task import GenerationTask
+from app.services.fair_scheduler import FairScheduler
+from app.services.progress_events import ProgressEvents, get_stream_limiter, progress_snapshot
+from app.services.progress_tracker import ProgressTracker
 from app.services.text_to_video_service import TextToVideoService
-from app.tasks.video_tasks import generate_video_task
+from app.tasks.video_tasks import QUEUE_BATCH, generate_video_task
+from app.utils.ffmpeg_scheduler import request_cancel
+from app.utils.pagination import decode_cursor, encode_cursor, estimate_count
+from app.utils.validators import validate_prompt, validate_resolution
 
 video_bp = Blueprint('video', __name__)
 
+MAX_PAGE_SIZE = 100
+
 
 @video_bp.route('', methods=['POST'])
 @jwt_required()
@@ -51,19 +66,19 @@ def create_video():
     db.session.add(video)
     db.session.commit()
     
-    # Queue background task
-    task = generate_video_task.delay(video.id)
-    
-    # Save task reference
+    # Save task reference before queueing so the task can join on it
     gen_task = GenerationTask(
         video_id=video.id,
-        celery_task_id=task.id,
+        celery_task_id=uuid(),
         task_type='video_generation',
         status='pending'
     )
     db.session.add(gen_task)
     db.session.commit()
     
+    # Queue background task
+    generate_video_task.apply_async((video.id,), task_id=gen_task.celery_task_id)
+    
     return jsonify({
         'video_id': video.id,
         'status': video.status,
@@ -71,32 +86,238 @@ def create_video():
     }), 202
 
 
+def _batch_item(item) -> dict:
+    """
+    Validate one batch item into Video column values.
+    
+    Raises:
+        ValueError: If the item is invalid
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Item must be an object')
+    
+    prompt = item.get('prompt')
+    if not isinstance(prompt, str):
+        raise ValueError('Prompt is required')
+    prompt = prompt.strip()
+    is_valid, message = validate_prompt(prompt)
+    if not is_valid:
+        raise ValueError(message)
+    
+    style = item.get('style', 'cinematic')
+    if not isinstance(style, str) or not style or len(style) > 50:
+        raise ValueError('Style must be a string of at most 50 characters')
+    
+    duration = item.get('duration', 6)
+    if isinstance(duration, bool) or not isinstance(duration, int) or duration < 1:
+        raise ValueError('Duration must be a positive integer')
+    
+    resolution = item.get('resolution', '1024x576')
+    if not isinstance(resolution, str) or not validate_resolution(resolution):
+        raise ValueError('Resolution must be WIDTHxHEIGHT within 256x256 and 1920x1080')
+    
+    voice_id = item.get('voice_id')
+    if voice_id is not None and (not isinstance(voice_id, str) or len(voice_id) > 100):
+        raise ValueError('Voice ID must be a string of at most 100 characters')
+    
+    script = item.get('script')
+    if script is not None and not isinstance(script, str):
+        raise ValueError('Script must be a string')
+    
+    return {
+        'prompt': prompt,
+        'style': style,
+        'duration': min(duration, current_app.config['MAX_VIDEO_DURATION']),
+        'resolution': resolution,
+        'voice_id': voice_id,
+        'script': script,
+        'status': VideoStatus.PENDING.value
+    }
+
+
+@video_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_videos_batch():
+    """
+    Create many video generation requests at once.
+    
+    Valid items are inserted in one transaction (one multi-row INSERT for
+    videos and one for their task rows) and queued on the batch tier: as a
+    single Celery group, or with ``BATCH_DISPATCH=fair`` into the user's
+    fair-share backlog. Invalid items are reported by index and skipped.
+    If queueing fails, the created videos are marked failed (retryable)
+    and a 503 is returned.
+    
+    Request body:
+    {
+        "videos": [
+            {"prompt": "A cinematic shot of a futuristic city at sunset", "duration": 6},
+            {"prompt": "Waves crashing on a rocky shore", "style": "documentary"}
+        ]
+    }
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    
+    items = data.get('videos')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'videos must be a non-empty list'}), 400
+    
+    max_items = current_app.config['VIDEO_BATCH_MAX_ITEMS']
+    if len(items) > max_items:
+        return jsonify({'error': f'At most {max_items} videos per batch'}), 413
+    
+    results = [None] * len(items)
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            rows.append((index, _batch_item(item)))
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'rejected', 'error': str(e)}
+    
+    if rows:
+        video_ids = db.session.scalars(
+            insert(Video).returning(Video.id, sort_by_parameter_order=True),
+            [{'user_id': current_user_id, **values} for _, values in rows]
+        ).all()
+        
+        # Task IDs are generated up front so task rows exist before anything is queued
+        task_ids = [uuid() for _ in rows]
+        db.session.execute(insert(GenerationTask), [
+            {
+                'video_id': video_id,
+                'celery_task_id': task_id,
+                'task_type': 'video_generation',
+                'status': 'pending'
+            }
+            for video_id, task_id in zip(video_ids, task_ids)
+        ])
+        db.session.commit()
+        
+        try:
+            if current_app.config['BATCH_DISPATCH'] == 'fair':
+                FairScheduler.from_config(current_app.config).submit(current_user_id, zip(video_ids, task_ids))
+            else:
+                group(
+                    generate_video_task.si(video_id).set(task_id=task_id)
+                    for video_id, task_id in zip(video_ids, task_ids)
+                ).apply_async(queue=QUEUE_BATCH)
+        except Exception:
+            current_app.logger.exception('Failed to queue batch of %d videos', len(video_ids))
+            # Rows are committed; fail them so they don't stay pending (the retry route requeues them)
+            error = 'Could not queue generation; retry later'
+            db.session.execute(
+                update(Video).where(Video.id.in_(video_ids))
+                .values(status=VideoStatus.FAILED.value, error_message=error)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.execute(
+                update(GenerationTask).where(GenerationTask.celery_task_id.in_(task_ids))
+                .values(status='failed', error_message=error, finished_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            
+            for (index, _), video_id in zip(rows, video_ids):
+                results[index] = {
+                    'index': index,
+                    'video_id': video_id,
+                    'status': VideoStatus.FAILED.value,
+                    'error': error
+                }
+            return jsonify({
+                'created': 0,
+                'rejected': len(items) - len(rows),
+                'failed': len(rows),
+                'results': results,
+                'error': error
+            }), 503
+        
+        for (index, _), video_id, task_id in zip(rows, video_ids, task_ids):
+            results[index] = {
+                'index': index,
+                'video_id': video_id,
+                'task_id': task_id,
+                'status': VideoStatus.PENDING.value
+            }
+    
+    return jsonify({
+        'created': len(rows),
+        'rejected': len(items) - len(rows),
+        'results': results,
+        'message': 'Video generation started' if rows else 'No valid videos in batch'
+    }), 202 if rows else 400
+
+
 @video_bp.route('', methods=['GET'])
 @jwt_required()
 def list_videos():
-    """List all videos for current user."""
+    """
+    List videos for current user, newest first.
+    
+    Query parameters:
+        limit: Page size (default 20, max 100; ``per_page`` is accepted too)
+        cursor: ``next_cursor`` from the previous page (``page`` beyond 1 is
+            rejected with a 400; offset pages were replaced by cursors)
+        status: Filter by status
+        fields: Comma-separated columns to return (e.g. ``id,status,thumbnail_url``)
+        count: ``estimate`` or ``exact`` to include ``total`` (omitted by default)
+    """
     current_user_id = get_jwt_identity()
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    limit = request.args.get('limit', request.args.get('per_page', 20, type=int), type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
     status = request.args.get('status')
+    count = request.args.get('count')
+    
+    fields = None
+    if request.args.get('fields'):
+        fields = [name.strip() for name in request.args['fields'].split(',') if name.strip()]
+        unknown = set(fields) - set(Video.__table__.columns.keys())
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+    
+    if count not in (None, 'estimate', 'exact'):
+        return jsonify({'error': 'count must be estimate or exact'}), 400
+    
+    if request.args.get('page', 1, type=int) != 1:
+        return jsonify({'error': 'page is no longer supported; pass next_cursor from the previous response as cursor'}), 400
     
     query = Video.query.filter_by(user_id=current_user_id)
     
     if status:
         query = query.filter_by(status=status)
     
-    query = query.order_by(Video.created_at.desc())
+    filtered = query
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = decode_cursor(cursor)
+        if not position:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(tuple_(Video.created_at, Video.id) < position)
     
-    return jsonify({
-        'videos': [v.to_dict() for v in pagination.items],
-        'total': pagination.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': pagination.pages
-    }), 200
+    if fields:
+        # Load only the requested columns (plus the cursor key)
+        query = query.options(load_only(*(getattr(Video, name) for name in {'id', 'created_at', *fields})))
+    
+    rows = query.order_by(Video.created_at.desc(), Video.id.desc()).limit(limit + 1).all()
+    videos, has_more = rows[:limit], len(rows) > limit
+    
+    response = {
+        'videos': [v.to_dict(fields) for v in videos],
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': encode_cursor(videos[-1].created_at, videos[-1].id) if has_more else None
+    }
+    
+    if count:
+        if not cursor and not has_more:
+            response['total'] = len(videos)
+        else:
+            response['total'] = filtered.count() if count == 'exact' else estimate_count(filtered)
+    
+    return jsonify(response), 200
 
 
 @video_bp.route('/<int:video_id>', methods=['GET'])
@@ -118,10 +339,118 @@ def get_video(video_id):
     response = video.to_dict()
     if latest_task:
         response['task'] = latest_task.to_dict()
+        if latest_task.status in ('pending', 'processing'):
+            response['task'].update(_live_progress(video.id))
     
     return jsonify(response), 200
 
 
+def _live_progress(video_id: int) -> dict:
+    """In-flight progress from Redis (newer than the row between transitions)."""
+    state = ProgressTracker().get(video_id)
+    return {name: state[name] for name in ('progress', 'poll_attempts', 'last_polled_at') if name in state}
+
+
+def _event_stream(build_snapshot: Callable[[], dict], **channel) -> Response:
+    """
+    Open an unbuffered SSE response, holding a stream slot until it closes.
+    
+    The channel is subscribed before ``build_snapshot`` runs, so no change
+    committed in between is lost. When every slot of this process is taken
+    the response only carries a ``retry`` hint and a ``busy`` event, so
+    ``EventSource`` reconnects later instead of tying up another thread.
+    """
+    config = current_app.config
+    headers = {
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # nginx: flush each event
+    }
+    
+    limiter = get_stream_limiter(config['SSE_MAX_STREAMS'])
+    if not limiter.acquire():
+        busy = f"retry: {config['SSE_RETRY_MS']}\n\nevent: busy\ndata: {{}}\n\n"
+        return Response(busy, mimetype='text/event-stream', headers=headers)
+    
+    events = ProgressEvents(
+        max_lifetime=config['SSE_MAX_STREAM_SECONDS'],
+        retry_ms=config['SSE_RETRY_MS']
+    )
+    pubsub = events.subscribe(**channel)
+    try:
+        snapshot = build_snapshot()
+    except Exception:
+        if pubsub is not None:
+            pubsub.close()
+        limiter.release()
+        raise
+    
+    stream = events.stream(pubsub, snapshot, video_id=channel.get('video_id'))
+    response = Response(stream, mimetype='text/event-stream', headers=headers)
+    response.call_on_close(limiter.release)
+    return response
+
+
+@video_bp.route('/<int:video_id>/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def video_events(video_id):
+    """
+    Stream status and progress updates for a video (Server-Sent Events).
+    
+    Sends a ``snapshot`` event with the current state, then a ``progress``
+    event (changed fields only) on every status or progress change, and
+    closes once the video is completed or failed. ``EventSource`` clients
+    pass the token as ``?jwt=``.
+    """
+    current_user_id = get_jwt_identity()
+    
+    owned = db.session.query(Video.id).filter_by(id=video_id, user_id=current_user_id).first()
+    
+    if not owned:
+        return jsonify({'error': 'Video not found'}), 404
+    
+    def build_snapshot():
+        video = db.session.get(Video, video_id)
+        latest_task = video.generation_tasks.order_by(
+            GenerationTask.created_at.desc()
+        ).first()
+        
+        snapshot = progress_snapshot(video, latest_task)
+        if latest_task and latest_task.status in ('pending', 'processing'):
+            snapshot.update(_live_progress(video.id))
+        return snapshot
+    
+    return _event_stream(build_snapshot, video_id=video_id)
+
+
+@video_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def user_events():
+    """
+    Stream status and progress updates for all of the current user's
+    videos over one connection (Server-Sent Events).
+    
+    The ``snapshot`` event lists videos that are still pending or
+    processing; ``progress`` events carry ``video_id``.
+    """
+    current_user_id = get_jwt_identity()
+    
+    def build_snapshot():
+        active = Video.query.filter_by(user_id=current_user_id).filter(
+            Video.status.in_([VideoStatus.PENDING.value, VideoStatus.PROCESSING.value])
+        ).order_by(Video.created_at.desc(), Video.id.desc()).limit(MAX_PAGE_SIZE).all()
+        
+        live = ProgressTracker().get_many(video.id for video in active)
+        videos = []
+        for video in active:
+            entry = progress_snapshot(video)
+            if 'progress' in live.get(video.id, {}):
+                entry['progress'] = live[video.id]['progress']
+            videos.append(entry)
+        return {'videos': videos}
+    
+    return _event_stream(build_snapshot, user_id=current_user_id)
+
+
 @video_bp.route('/<int:video_id>', methods=['DELETE'])
 @jwt_required()
 def delete_video(video_id):
@@ -136,13 +465,22 @@ def delete_video(video_id):
     db.session.delete(video)
     db.session.commit()
     
+    # Stop any FFmpeg work still running for it on the workers
+    request_cancel(video_id)
+    
     return jsonify({'message': 'Video deleted'}), 200
 
 
 @video_bp.route('/<int:video_id>/retry', methods=['POST'])
 @jwt_required()
 def retry_video(video_id):
-    """Retry failed video generation."""
+    """
+    Retry failed video generation.
+    
+    Completed stages (script, provider submission, download and
+    post-processing) are carried over, so the retry resumes instead of
+    paying for a new prediction.
+    """
     current_user_id = get_jwt_identity()
     
     video = Video.query.filter_by(id=video_id, user_id=current_user_id).first()
@@ -158,18 +496,24 @@ def retry_video(video_id):
     video.error_message = None
     db.session.commit()
     
-    # Queue new task
-    task = generate_video_task.delay(video.id)
-    
     gen_task = GenerationTask(
         video_id=video.id,
-        celery_task_id=task.id,
+        celery_task_id=uuid(),
         task_type='video_generation',
         status='pending'
     )
+    
+    # Resume from the last completed stage of the previous attempt
+    previous = video.generation_tasks.order_by(GenerationTask.created_at.desc()).first()
+    if previous:
+        gen_task.resume_from(previous)
+    
     db.session.add(gen_task)
     db.session.commit()
     
+    # Queue new task
+    generate_video_task.apply_async((video.id,), task_id=gen_task.celery_task_id)
+    
     return jsonify({
         'video_id': video.id,
         'status': video.status,
@@ -180,7 +524,14 @@ def retry_video(video_id):
 @video_bp.route('/<int:video_id>/script', methods=['POST'])
 @jwt_required()
 def generate_script(video_id):
-    """Generate or regenerate script for video."""
+    """
+    Generate or regenerate script for video.
+    
+    Request body (optional):
+    {
+        "regenerate": true  // bypass the script cache
+    }
+    """
     current_user_id = get_jwt_identity()
     
     video = Video.query.filter_by(id=video_id, user_id=current_user_id).first()
@@ -188,9 +539,16 @@ def generate_script(video_id):
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
+    data = request.get_json(silent=True) or {}
+    
     try:
         service = TextToVideoService()
-        script = service.generate_script(video.prompt, video.style, video.duration)
+        script = service.generate_script(
+            video.prompt,
+            video.style,
+            video.duration,
+            bypass_cache=bool(data.get('regenerate'))
+        )
         
         video.script = script
         db.session.commit()
@@ -206,7 +564,14 @@ def generate_script(video_id):
 @video_bp.route('/<int:video_id>/seo', methods=['POST'])
 @jwt_required()
 def generate_seo(video_id):
-    """Generate SEO metadata for video."""
+    """
+    Generate SEO metadata for video.
+    
+    Request body (optional):
+    {
+        "regenerate": true  // bypass the SEO cache
+    }
+    """
     current_user_id = get_jwt_identity()
     
     video = Video.query.filter_by(id=video_id, user_id=current_user_id).first()
@@ -214,9 +579,15 @@ def generate_seo(video_id):
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
+    data = request.get_json(silent=True) or {}
+    
     try:
         service = TextToVideoService()
-        seo = service.generate_seo(video.prompt, video.script)
+        seo = service.generate_seo(
+            video.prompt,
+            video.script,
+            bypass_cache=bool(data.get('regenerate'))
+        )
         
         video.seo_title = seo.get('title')
         video.seo_description = seo.get('description')
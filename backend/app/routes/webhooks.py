@@ -0,0 +1,55 @@
+"""
+Provider Webhook Routes
+"""
+from flask import Blueprint, request, jsonify, current_app
+
+from app.services.ai_provider_service import ReplicateProvider
+from app.tasks.video_tasks import apply_provider_results
+from app.utils.webhooks import verify_webhook
+
+webhook_bp = Blueprint('webhooks', __name__)
+
+
+@webhook_bp.route('/replicate', methods=['POST'])
+def replicate_webhook():
+    """
+    Receive a signed Replicate prediction callback.
+    
+    Completes the matching Video/GenerationTask as soon as the prediction
+    finishes; polling only remains as a slow fallback sweeper.
+    """
+    secret = current_app.config.get('REPLICATE_WEBHOOK_SECRET')
+    body = request.get_data(as_text=True)
+    
+    if not secret or not verify_webhook(
+        secret,
+        request.headers,
+        body,
+        current_app.config['WEBHOOK_TOLERANCE']
+    ):
+        return jsonify({'error': 'Invalid signature'}), 401
+    
+    payload = request.get_json(silent=True) or {}
+    
+    task_id = payload.get('id')
+    if not task_id:
+        return jsonify({'error': 'Prediction ID is required'}), 400
+    
+    result = ReplicateProvider.status_result(
+        task_id,
+        payload.get('status'),
+        payload.get('output'),
+        payload.get('error')
+    )
+    
+    if result['status'] not in ('succeeded', 'failed'):
+        return jsonify({'received': True, 'status': result['status']}), 200
+    
+    applied = apply_provider_results([result])
+    
+    return jsonify({
+        'received': True,
+        'status': result['status'],
+        'completed': applied['completed'],
+        'failed': applied['failed']
+    }), 200
@@ -4,5 +4,11 @@ Services
 from app.services.prompt_engine import PromptEngine
 from app.services.ai_provider_service import AIProviderService
 from app.services.text_to_video_service import TextToVideoService
+from app.services.status_poller import StatusPoller
+from app.services.llm_cache import LLMCache
+from app.services.result_cache import VideoResultCache
+from app.services.inflight_registry import InFlightRegistry
+from app.services.progress_events import ProgressEvents
+from app.services.fair_scheduler import FairScheduler
 
-__all__ = ['PromptEngine', 'AIProviderService', 'TextToVideoService']
+__all__ = ['PromptEngine', 'AIProviderService', 'TextToVideoService', 'StatusPoller', 'LLMCache', 'VideoResultCache', 'InFlightRegistry', 'ProgressEvents', 'FairScheduler']
@@ -4,18 +4,42 @@ AI Provider Service
 Handles integration with various AI providers for video, audio, and text generation.
 """
 import os
+import json
 import time
+import uuid
+import asyncio
+import logging
+import threading
 import requests
+import tempfile
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 
+import httpx
 import openai
+import redis
 import replicate
 
+from app.services.llm_cache import LLMCache, get_llm_cache
+from app.utils.redis_client import get_redis
+from app.utils.http_client import (
+    AsyncMeteredTransport,
+    MeteredTransport,
+    get_httpx_timeout,
+    get_max_retries,
+    get_session,
+    get_timeout,
+)
+from app.utils.webhooks import sign_webhook
+
+logger = logging.getLogger(__name__)
+
 
 class BaseVideoProvider(ABC):
     """Base class for video generation providers."""
     
+    MODEL_ID = None
+    
     @abstractmethod
     def generate(self, prompt: str, duration: int, resolution: str) -> Dict[str, Any]:
         """Generate video from prompt."""
@@ -25,15 +49,27 @@ class BaseVideoProvider(ABC):
     def check_status(self, task_id: str) -> Dict[str, Any]:
         """Check generation status."""
         pass
+    
+    async def check_status_async(self, task_id: str) -> Dict[str, Any]:
+        """Check generation status from an asyncio event loop."""
+        return await asyncio.to_thread(self.check_status, task_id)
 
 
 class ReplicateProvider(BaseVideoProvider):
     """Replicate.com provider for Stable Video Diffusion."""
     
     MODEL_ID = "stability-ai/stable-video-diffusion:3f0457e4619daac51203dedb472816fd4af51f3149fa7a9e0b5ffcf1b8172438"
+    API_URL = "https://api.replicate.com/v1"
     
     def __init__(self):
-        self.client = replicate.Client(api_token=os.getenv('REPLICATE_API_TOKEN'))
+        self.api_token = os.getenv('REPLICATE_API_TOKEN')
+        self.webhook_url = os.getenv('REPLICATE_WEBHOOK_URL')
+        self.client = replicate.Client(
+            api_token=self.api_token,
+            timeout=get_httpx_timeout(),
+            transport=MeteredTransport()
+        )
+        self._async_client = None
     
     def generate(self, prompt: str, duration: int, resolution: str) -> Dict[str, Any]:
         """Generate video using Stable Video Diffusion on Replicate."""
@@ -44,6 +80,14 @@ class ReplicateProvider(BaseVideoProvider):
             # Calculate frames (SVD typically uses 25 fps)
             num_frames = min(duration * 25, 100)  # Max 100 frames
             
+            # Ask Replicate to call us back on completion instead of polling
+            webhook_params = {}
+            if self.webhook_url:
+                webhook_params = {
+                    'webhook': self.webhook_url,
+                    'webhook_events_filter': ['completed'],
+                }
+            
             prediction = self.client.predictions.create(
                 model=self.MODEL_ID,
                 input={
@@ -52,13 +96,15 @@ class ReplicateProvider(BaseVideoProvider):
                     "height": height,
                     "num_frames": num_frames,
                     "fps": 25,
-                }
+                },
+                **webhook_params
             )
             
             return {
                 'task_id': prediction.id,
                 'status': prediction.status,
-                'provider': 'replicate'
+                'provider': 'replicate',
+                'webhook': bool(self.webhook_url)
             }
         except Exception as e:
             return {
@@ -67,52 +113,151 @@ class ReplicateProvider(BaseVideoProvider):
                 'provider': 'replicate'
             }
     
+    @staticmethod
+    def status_result(task_id: str, status: str, output: Any = None, error: Any = None) -> Dict[str, Any]:
+        """Build a normalized status result from a prediction."""
+        if status == 'canceled':
+            status = 'failed'
+            error = error or 'Prediction canceled'
+        
+        result = {
+            'task_id': task_id,
+            'status': status,
+            'provider': 'replicate'
+        }
+        
+        if status == 'succeeded':
+            result['video_url'] = output
+        elif status == 'failed':
+            result['error'] = error
+        
+        return result
+    
     def check_status(self, task_id: str) -> Dict[str, Any]:
         """Check Replicate prediction status."""
         try:
             prediction = self.client.predictions.get(task_id)
-            
-            result = {
+            return self.status_result(task_id, prediction.status, prediction.output, prediction.error)
+        except Exception as e:
+            # Transient errors keep the prediction in flight for the next check
+            return {
                 'task_id': task_id,
-                'status': prediction.status,
+                'status': 'unknown',
+                'error': str(e),
                 'provider': 'replicate'
             }
-            
-            if prediction.status == 'succeeded':
-                result['video_url'] = prediction.output
-            elif prediction.status == 'failed':
-                result['error'] = prediction.error
-            
-            return result
+    
+    async def check_status_async(self, task_id: str) -> Dict[str, Any]:
+        """Check Replicate prediction status without blocking the event loop."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.API_URL,
+                headers={'Authorization': f'Bearer {self.api_token}'},
+                timeout=get_httpx_timeout(),
+                transport=AsyncMeteredTransport()
+            )
+        
+        try:
+            response = await self._async_client.get(f'/predictions/{task_id}')
+            response.raise_for_status()
+            prediction = response.json()
+            return self.status_result(
+                task_id,
+                prediction.get('status'),
+                prediction.get('output'),
+                prediction.get('error')
+            )
         except Exception as e:
+            # Transient errors keep the prediction in flight for the next sweep
             return {
                 'task_id': task_id,
-                'status': 'failed',
+                'status': 'unknown',
                 'error': str(e),
                 'provider': 'replicate'
             }
 
 
 class MockProvider(BaseVideoProvider):
-    """Mock provider for testing."""
+    """
+    Mock provider for testing.
+    
+    When ``REPLICATE_WEBHOOK_URL`` is set it behaves like a local fake
+    Replicate: after ``latency`` seconds it POSTs a signed completion
+    callback to the webhook receiver.
+    """
+    
+    MODEL_ID = 'mock'
+    VIDEO_URL = 'https://sample-videos.com/video123/mp4/720/big_buck_bunny_720p_1mb.mp4'
+    
+    def __init__(self, latency: float = None):
+        # Simulated provider round-trip time in seconds
+        if latency is None:
+            latency = float(os.getenv('MOCK_PROVIDER_LATENCY', '0'))
+        self.latency = latency
+        self.webhook_url = os.getenv('REPLICATE_WEBHOOK_URL')
+        self.webhook_secret = os.getenv('REPLICATE_WEBHOOK_SECRET')
     
     def generate(self, prompt: str, duration: int, resolution: str) -> Dict[str, Any]:
         """Simulate video generation."""
-        task_id = f"mock_{int(time.time())}"
+        task_id = f"mock_{uuid.uuid4().hex}"
+        
+        if self.webhook_url:
+            timer = threading.Timer(self.latency or 1.0, self.send_webhook, args=(task_id,))
+            timer.daemon = True
+            timer.start()
+        
         return {
             'task_id': task_id,
             'status': 'processing',
-            'provider': 'mock'
+            'provider': 'mock',
+            'webhook': bool(self.webhook_url)
         }
     
-    def check_status(self, task_id: str) -> Dict[str, Any]:
-        """Simulate status check - always returns completed."""
+    def send_webhook(self, task_id: str, status: str = 'succeeded') -> Optional[int]:
+        """POST a signed Replicate-style completion callback."""
+        body = json.dumps({
+            'id': task_id,
+            'status': status,
+            'output': self.VIDEO_URL if status == 'succeeded' else None,
+            'error': 'Mock prediction failed' if status == 'failed' else None,
+        })
+        webhook_id = f"msg_{uuid.uuid4().hex}"
+        timestamp = str(int(time.time()))
+        
+        headers = {
+            'Content-Type': 'application/json',
+            'webhook-id': webhook_id,
+            'webhook-timestamp': timestamp,
+            'webhook-signature': sign_webhook(self.webhook_secret or '', webhook_id, timestamp, body),
+        }
+        
+        try:
+            response = get_session().post(self.webhook_url, data=body, headers=headers, timeout=get_timeout())
+            return response.status_code
+        except requests.RequestException as e:
+            logger.warning('Mock webhook delivery failed: %s', e)
+            return None
+    
+    def _completed_result(self, task_id: str) -> Dict[str, Any]:
+        """Build a completed status result."""
         return {
             'task_id': task_id,
             'status': 'succeeded',
-            'video_url': 'https://sample-videos.com/video123/mp4/720/big_buck_bunny_720p_1mb.mp4',
+            'video_url': self.VIDEO_URL,
             'provider': 'mock'
         }
+    
+    def check_status(self, task_id: str) -> Dict[str, Any]:
+        """Simulate status check - always returns completed."""
+        if self.latency:
+            time.sleep(self.latency)
+        return self._completed_result(task_id)
+    
+    async def check_status_async(self, task_id: str) -> Dict[str, Any]:
+        """Simulate an async status check with the configured latency."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._completed_result(task_id)
 
 
 class AIProviderService:
@@ -123,52 +268,144 @@ class AIProviderService:
         'mock': MockProvider,
     }
     
+    LLM_MODEL = "gpt-4"
+    
+    # Process-wide provider and API client instances. Reusing them keeps
+    # HTTP connections alive across tasks instead of a new TCP/TLS
+    # handshake per call.
+    _video_providers: Dict[str, BaseVideoProvider] = {}
+    _openai_clients: Dict[str, openai.OpenAI] = {}
+    
     def __init__(self, provider: str = None):
         provider = provider or os.getenv('AI_VIDEO_PROVIDER', 'replicate')
         
         if provider not in self.PROVIDERS:
             raise ValueError(f"Unknown provider: {provider}")
         
-        self.video_provider = self.PROVIDERS[provider]()
+        self.video_provider = self.get_video_provider(provider)
         self.provider_name = provider
     
-    def generate_video(self, prompt: str, duration: int = 6, resolution: str = '1024x576') -> Dict[str, Any]:
-        """Generate video from text prompt."""
-        return self.video_provider.generate(prompt, duration, resolution)
+    @classmethod
+    def get_video_provider(cls, provider: str) -> BaseVideoProvider:
+        """Get the shared video provider instance for this process."""
+        if provider not in cls._video_providers:
+            cls._video_providers[provider] = cls.PROVIDERS[provider]()
+        return cls._video_providers[provider]
+    
+    @classmethod
+    def get_openai_client(cls, api_key: str) -> openai.OpenAI:
+        """Get the shared OpenAI client for this process."""
+        if api_key not in cls._openai_clients:
+            cls._openai_clients[api_key] = openai.OpenAI(
+                api_key=api_key,
+                timeout=get_httpx_timeout(),
+                max_retries=get_max_retries(),
+                http_client=httpx.Client(
+                    timeout=get_httpx_timeout(),
+                    transport=MeteredTransport()
+                )
+            )
+        return cls._openai_clients[api_key]
+    
+    @classmethod
+    def reset_clients(cls) -> None:
+        """Drop shared providers and clients (e.g. after a worker fork)."""
+        cls._video_providers.clear()
+        cls._openai_clients.clear()
+    
+    def generate_video(
+        self,
+        prompt: str,
+        duration: int = 6,
+        resolution: str = '1024x576',
+        idempotency_key: str = None
+    ) -> Dict[str, Any]:
+        """
+        Generate video from text prompt.
+        
+        With an ``idempotency_key`` the submission is recorded in Redis, and
+        a repeated call with the same key returns the recorded prediction
+        instead of starting (and paying for) a new one.
+        """
+        if not idempotency_key:
+            return self.video_provider.generate(prompt, duration, resolution)
+        
+        key = f"idempotency:video:{idempotency_key}"
+        try:
+            recorded = get_redis().get(key)
+        except redis.RedisError as e:
+            logger.warning('Idempotency lookup failed: %s', e)
+            recorded = None
+        
+        if recorded:
+            return json.loads(recorded)
+        
+        result = self.video_provider.generate(prompt, duration, resolution)
+        
+        if result.get('task_id') and not result.get('error'):
+            try:
+                get_redis().set(key, json.dumps(result), ex=int(os.getenv('IDEMPOTENCY_KEY_TTL', '86400')))
+            except redis.RedisError as e:
+                logger.warning('Idempotency record failed: %s', e)
+        
+        return result
     
     def check_video_status(self, task_id: str) -> Dict[str, Any]:
         """Check video generation status."""
         return self.video_provider.check_status(task_id)
     
     @staticmethod
-    def generate_script(prompt: str, style: str, duration: int) -> str:
-        """Generate video script using OpenAI."""
+    def generate_script(prompt: str, style: str, duration: int, bypass_cache: bool = False) -> str:
+        """
+        Generate video script using OpenAI.
+        
+        Results are cached on (prompt, style, duration, model, system
+        prompt); pass ``bypass_cache`` to force a fresh generation.
+        """
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             return f"[Auto-generated script for: {prompt}]"
         
-        client = openai.OpenAI(api_key=api_key)
+        system_prompt = f"You are a video script writer. Write a {duration}-second video script in a {style} style. Be concise and visual."
         
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"You are a video script writer. Write a {duration}-second video script in a {style} style. Be concise and visual."
-                },
-                {
-                    "role": "user",
-                    "content": f"Write a video script for: {prompt}"
-                }
-            ],
-            max_tokens=500
-        )
+        def create() -> str:
+            client = AIProviderService.get_openai_client(api_key)
+            
+            response = client.chat.completions.create(
+                model=AIProviderService.LLM_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_prompt
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Write a video script for: {prompt}"
+                    }
+                ],
+                max_tokens=500
+            )
+            
+            return response.choices[0].message.content
         
-        return response.choices[0].message.content
+        key = LLMCache.make_key(
+            kind='script',
+            prompt=prompt,
+            style=style,
+            duration=duration,
+            model=AIProviderService.LLM_MODEL,
+            system_prompt=system_prompt
+        )
+        return get_llm_cache().get_or_create(key, create, bypass=bypass_cache)
     
     @staticmethod
-    def generate_seo(prompt: str, script: str = None) -> Dict[str, Any]:
-        """Generate SEO metadata using OpenAI."""
+    def generate_seo(prompt: str, script: str = None, bypass_cache: bool = False) -> Dict[str, Any]:
+        """
+        Generate SEO metadata using OpenAI.
+        
+        Results are cached on (prompt, script, model, system prompt); pass
+        ``bypass_cache`` to force a fresh generation.
+        """
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             return {
@@ -177,36 +414,56 @@ class AIProviderService:
                 'tags': prompt.split()[:10]
             }
         
-        client = openai.OpenAI(api_key=api_key)
+        system_prompt = """Generate SEO metadata for a video. Return JSON with:
+                    - title: Engaging title under 60 characters
+                    - description: Description under 160 characters
+                    - tags: Array of 5-10 relevant tags"""
         
         content = f"Video topic: {prompt}"
         if script:
             content += f"\n\nScript: {script}"
         
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """Generate SEO metadata for a video. Return JSON with:
-                    - title: Engaging title under 60 characters
-                    - description: Description under 160 characters
-                    - tags: Array of 5-10 relevant tags"""
-                },
-                {
-                    "role": "user",
-                    "content": content
-                }
-            ],
-            response_format={"type": "json_object"}
-        )
+        def create() -> Dict[str, Any]:
+            client = AIProviderService.get_openai_client(api_key)
+            
+            response = client.chat.completions.create(
+                model=AIProviderService.LLM_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_prompt
+                    },
+                    {
+                        "role": "user",
+                        "content": content
+                    }
+                ],
+                response_format={"type": "json_object"}
+            )
+            
+            return json.loads(response.choices[0].message.content)
         
-        import json
-        return json.loads(response.choices[0].message.content)
+        key = LLMCache.make_key(
+            kind='seo',
+            content=content,
+            model=AIProviderService.LLM_MODEL,
+            system_prompt=system_prompt
+        )
+        return get_llm_cache().get_or_create(key, create, bypass=bypass_cache)
     
     @staticmethod
-    def generate_voice(text: str, voice_id: str = 'default') -> Optional[str]:
-        """Generate voice audio using ElevenLabs."""
+    def generate_voice(text: str, voice_id: str = 'default', output_dir: Optional[str] = None) -> Optional[str]:
+        """
+        Generate voice audio using ElevenLabs.
+        
+        Args:
+            text: Narration text
+            voice_id: ElevenLabs voice ID
+            output_dir: Directory for the audio file (system temp dir by default)
+            
+        Returns:
+            Path of a uniquely named MP3 file, or None on failure
+        """
         api_key = os.getenv('ELEVENLABS_API_KEY')
         if not api_key:
             return None
@@ -227,13 +484,12 @@ class AIProviderService:
             }
         }
         
-        response = requests.post(url, json=data, headers=headers)
+        response = get_session().post(url, json=data, headers=headers, timeout=get_timeout())
         
         if response.status_code == 200:
-            # Save audio file and return path
-            audio_path = f"/tmp/audio_{int(time.time())}.mp3"
-            with open(audio_path, 'wb') as f:
+            # Unique file per call: narration branches of several videos run concurrently
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3', prefix='audio_', dir=output_dir) as f:
                 f.write(response.content)
-            return audio_path
+            return f.name
         
         return None
@@ -0,0 +1,272 @@
+"""
+Fair Scheduler Service
+
+Per-user backlogs of batch generation tasks in Redis, released to the
+Celery batch queue round-robin across users so one large submission
+cannot starve everyone else.
+"""
+import json
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def parse_weights(value: Optional[str]) -> Dict[int, int]:
+    """
+    Parse ``"<user_id>:<weight>,..."`` into a weight mapping.
+    
+    Malformed entries are skipped.
+    """
+    weights = {}
+    for entry in (value or '').split(','):
+        user_id, _, weight = entry.strip().partition(':')
+        try:
+            weights[int(user_id)] = max(1, int(weight))
+        except ValueError:
+            continue
+    return weights
+
+
+class FairScheduler:
+    """
+    Weighted round-robin dispatcher for batch generation tasks.
+    
+    ``submit`` appends tasks to a per-user list (``fair:user:<id>``). The
+    dispatcher keeps at most ``queue_depth`` messages in the Celery batch
+    queue: each cycle it tops the queue up, taking up to ``weight`` tasks
+    from every user with a backlog in turn, starting after the user served
+    last. A user submitting later therefore waits for at most one round,
+    not for everything queued before them.
+    
+    Taken tasks are moved (``LMOVE``) to ``fair:processing`` and removed
+    only once published, so a failed publish or a crashed dispatcher puts
+    them back instead of losing them. Run a single dispatcher.
+    """
+    
+    USERS_KEY = 'fair:users'
+    BACKLOG_KEY = 'fair:user:{}'
+    CURSOR_KEY = 'fair:cursor'
+    PROCESSING_KEY = 'fair:processing'
+    
+    def __init__(
+        self,
+        queue: str,
+        weights: Optional[Dict[int, int]] = None,
+        default_weight: int = 1,
+        queue_depth: int = 8
+    ):
+        self.queue = queue
+        self.weights = weights or {}
+        self.default_weight = max(1, default_weight)
+        self.queue_depth = queue_depth
+        self.redis = get_redis()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'FairScheduler':
+        """Build a scheduler from Flask config."""
+        from app.tasks.video_tasks import QUEUE_BATCH
+        
+        return cls(
+            queue=QUEUE_BATCH,
+            weights=parse_weights(config['FAIR_SHARE_WEIGHTS']),
+            default_weight=config['FAIR_SHARE_DEFAULT_WEIGHT'],
+            queue_depth=config['FAIR_SHARE_QUEUE_DEPTH']
+        )
+    
+    def weight(self, user_id: int) -> int:
+        """Tasks a user may release per round."""
+        return self.weights.get(user_id, self.default_weight)
+    
+    def submit(self, user_id: int, tasks: Iterable[Tuple[int, str]]) -> None:
+        """
+        Add generation tasks to a user's backlog.
+        
+        Args:
+            user_id: Owner of the videos
+            tasks: (video_id, celery_task_id) pairs, in submission order
+            
+        Raises:
+            redis.RedisError: If the backlog could not be written
+        """
+        now = time.time()
+        entries = [
+            json.dumps({'user_id': user_id, 'video_id': video_id, 'task_id': task_id, 'submitted_at': now})
+            for video_id, task_id in tasks
+        ]
+        if not entries:
+            return
+        
+        pipe = self.redis.pipeline()
+        pipe.rpush(self.BACKLOG_KEY.format(user_id), *entries)
+        pipe.sadd(self.USERS_KEY, user_id)
+        pipe.execute()
+    
+    def backlog(self) -> Dict[int, int]:
+        """Number of waiting tasks per user."""
+        user_ids = sorted(int(user_id) for user_id in self.redis.smembers(self.USERS_KEY))
+        
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.llen(self.BACKLOG_KEY.format(user_id))
+        
+        return dict(zip(user_ids, pipe.execute()))
+    
+    def plan(self, backlog: Dict[int, int], slots: int, after: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Split free queue slots across users by weighted round-robin.
+        
+        Args:
+            backlog: Waiting tasks per user
+            slots: Free slots in the batch queue
+            after: User served last (the next round starts after them)
+            
+        Returns:
+            (user_id, count) pairs in dispatch order, one per user and round
+        """
+        order = sorted(user_id for user_id, waiting in backlog.items() if waiting > 0)
+        if after is not None:
+            order = [u for u in order if u > after] + [u for u in order if u <= after]
+        
+        remaining = {user_id: backlog[user_id] for user_id in order}
+        steps = []
+        
+        while slots > 0 and any(remaining.values()):
+            for user_id in order:
+                count = min(self.weight(user_id), remaining[user_id], slots)
+                if count <= 0:
+                    continue
+                
+                steps.append((user_id, count))
+                remaining[user_id] -= count
+                slots -= count
+                if slots == 0:
+                    break
+        
+        return steps
+    
+    def queued(self) -> int:
+        """Messages currently waiting in the Celery batch queue."""
+        from app.tasks.video_tasks import celery_app
+        
+        with celery_app.connection_or_acquire() as conn:
+            queue = celery_app.amqp.queues[self.queue].bind(conn.default_channel)
+            return queue.queue_declare().message_count
+    
+    def _take(self, user_id: int, count: int) -> List[str]:
+        """Move up to ``count`` backlog entries to the processing list."""
+        key = self.BACKLOG_KEY.format(user_id)
+        
+        pipe = self.redis.pipeline()
+        for _ in range(count):
+            pipe.lmove(key, self.PROCESSING_KEY, 'LEFT', 'RIGHT')
+        pipe.llen(key)
+        *entries, left = pipe.execute()
+        
+        if not left:
+            # Drained; re-add if a submit raced with the removal
+            self.redis.srem(self.USERS_KEY, user_id)
+            if self.redis.llen(key):
+                self.redis.sadd(self.USERS_KEY, user_id)
+        
+        return [entry for entry in entries if entry]
+    
+    def _requeue(self, user_id: int, entries: List[str]) -> None:
+        """Put processing entries back at the head of a user's backlog, in order."""
+        pipe = self.redis.pipeline()
+        pipe.lpush(self.BACKLOG_KEY.format(user_id), *reversed(entries))
+        for entry in entries:
+            pipe.lrem(self.PROCESSING_KEY, 1, entry)
+        pipe.sadd(self.USERS_KEY, user_id)
+        pipe.execute()
+    
+    def recover(self) -> int:
+        """
+        Return entries left in the processing list by a crashed dispatcher
+        to their users' backlogs.
+        
+        A task published right before the crash is published again under
+        the same Celery task ID; generation resumes from its checkpoints.
+        
+        Returns:
+            Number of recovered entries
+        """
+        by_user: Dict[int, List[str]] = {}
+        for entry in self.redis.lrange(self.PROCESSING_KEY, 0, -1):
+            user_id = json.loads(entry).get('user_id')
+            if user_id is None:
+                logger.warning('Dropping fair-share entry without user_id: %s', entry)
+                self.redis.lrem(self.PROCESSING_KEY, 1, entry)
+                continue
+            by_user.setdefault(user_id, []).append(entry)
+        
+        for user_id, entries in by_user.items():
+            self._requeue(user_id, entries)
+        
+        return sum(len(entries) for entries in by_user.values())
+    
+    def dispatch_once(self) -> Dict[str, int]:
+        """
+        Release one round of backlog into the batch queue.
+        
+        Returns:
+            Dictionary with cycle statistics
+        """
+        from app.tasks.video_tasks import generate_video_task
+        
+        slots = self.queue_depth - self.queued()
+        backlog = self.backlog()
+        if slots <= 0 or not backlog:
+            return {'dispatched': 0, 'users': len(backlog), 'backlog': sum(backlog.values())}
+        
+        cursor = self.redis.get(self.CURSOR_KEY)
+        plan = self.plan(backlog, slots, int(cursor) if cursor else None)
+        
+        dispatched = 0
+        for user_id, count in plan:
+            entries = self._take(user_id, count)
+            for index, raw in enumerate(entries):
+                entry = json.loads(raw)
+                try:
+                    generate_video_task.apply_async(
+                        (entry['video_id'],),
+                        task_id=entry['task_id'],
+                        queue=self.queue,
+                        headers={'submitted_at': entry['submitted_at']}
+                    )
+                except Exception:
+                    # Not published: this entry and the rest go back to the backlog
+                    self._requeue(user_id, entries[index:])
+                    raise
+                
+                self.redis.lrem(self.PROCESSING_KEY, 1, raw)
+                dispatched += 1
+        
+        if plan:
+            self.redis.set(self.CURSOR_KEY, plan[-1][0])
+        
+        return {
+            'dispatched': dispatched,
+            'users': len(backlog),
+            'backlog': sum(backlog.values()) - dispatched
+        }
+    
+    def run_forever(self, interval: float) -> None:
+        """Dispatch until interrupted, one cycle every ``interval`` seconds."""
+        recovered = self.recover()
+        if recovered:
+            logger.warning('Recovered %d unacknowledged fair-share entries', recovered)
+        
+        while True:
+            started = time.monotonic()
+            try:
+                stats = self.dispatch_once()
+                if stats['dispatched']:
+                    logger.info('Fair-share dispatch cycle: %s', stats)
+            except Exception:
+                logger.exception('Fair-share dispatch cycle failed')
+            
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
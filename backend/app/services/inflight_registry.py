@@ -0,0 +1,120 @@
+"""
+In-Flight Registry Service
+
+Single-flight coalescing of identical generation requests across workers.
+"""
+import logging
+from typing import Any, Dict
+
+import redis
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Delete the key only if it still holds the expected value
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class InFlightRegistry:
+    """
+    Redis-backed registry of in-flight provider predictions by fingerprint.
+    
+    The first request for a fingerprint claims it and submits the
+    prediction; identical requests arriving while it runs attach to the
+    published ``provider_task_id`` instead of starting their own.
+    """
+    
+    KEY_PREFIX = 'inflight:'
+    PENDING = 'pending'
+    
+    # SET NX attempts before giving up when the key keeps vanishing between SET and GET
+    CLAIM_ATTEMPTS = 3
+    
+    def __init__(self, claim_ttl: int = 120, inflight_ttl: int = 600):
+        self.claim_ttl = claim_ttl
+        self.inflight_ttl = inflight_ttl
+        self.redis = get_redis()
+    
+    def _key(self, fingerprint: str) -> str:
+        return f"{self.KEY_PREFIX}{fingerprint}"
+    
+    def claim(self, fingerprint: str, owner_id: str) -> Dict[str, Any]:
+        """
+        Claim a fingerprint or return the in-flight prediction holding it.
+        
+        Args:
+            fingerprint: Generation fingerprint
+            owner_id: Celery task ID of the claiming request
+            
+        Returns:
+            Dictionary with ``owner`` and, when attaching, the ``provider``
+            and ``provider_task_id`` of the in-flight prediction. Redis
+            errors fail open (the caller submits its own prediction).
+        """
+        key = self._key(fingerprint)
+        value = None
+        
+        try:
+            for _ in range(self.CLAIM_ATTEMPTS):
+                if self.redis.set(key, f"{self.PENDING}:{owner_id}", nx=True, ex=self.claim_ttl):
+                    return {'owner': True}
+                
+                value = self.redis.get(key)
+                if value:
+                    break
+                # Released between SET and GET - try again
+        except redis.RedisError as e:
+            logger.warning('In-flight claim failed: %s', e)
+            return {'owner': True}
+        
+        if not value:
+            # Lost every race; submit without coalescing rather than spin
+            logger.info('In-flight claim for %s kept racing; not coalescing', fingerprint)
+            return {'owner': True}
+        
+        provider, _, task_id = value.partition(':')
+        
+        if provider == self.PENDING:
+            # Owner is still submitting; re-entering with the same task ID is ours
+            return {'owner': task_id == owner_id}
+        
+        return {
+            'owner': False,
+            'provider': provider,
+            'provider_task_id': task_id
+        }
+    
+    def publish(self, fingerprint: str, provider: str, provider_task_id: str) -> None:
+        """Publish the submitted prediction so identical requests can attach."""
+        try:
+            self.redis.set(
+                self._key(fingerprint),
+                f"{provider}:{provider_task_id}",
+                ex=self.inflight_ttl
+            )
+        except redis.RedisError as e:
+            logger.warning('In-flight publish failed: %s', e)
+    
+    def release(self, fingerprint: str, provider: str = None, provider_task_id: str = None, owner_id: str = None) -> bool:
+        """
+        Release a fingerprint held by a finished prediction or a failed claim.
+        
+        Only deletes the key if it still refers to the given prediction or
+        owner, so a newer claim is never dropped.
+        """
+        if owner_id:
+            expected = f"{self.PENDING}:{owner_id}"
+        else:
+            expected = f"{provider}:{provider_task_id}"
+        
+        try:
+            return bool(self.redis.eval(_RELEASE_SCRIPT, 1, self._key(fingerprint), expected))
+        except redis.RedisError as e:
+            logger.warning('In-flight release failed: %s', e)
+            return False
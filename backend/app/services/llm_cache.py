@@ -0,0 +1,168 @@
+"""
+LLM Cache Service
+
+Content-addressed cache for generated scripts and SEO metadata, with an
+in-process LRU tier in front of a shared Redis tier.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import redis
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """Two-tier (local LRU + Redis) cache for LLM completions."""
+    
+    KEY_PREFIX = 'llm_cache:'
+    
+    def __init__(
+        self,
+        use_redis: bool = True,
+        ttl: int = 86400,
+        max_entries: int = 1024,
+        enabled: bool = True
+    ):
+        self.use_redis = use_redis
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._local: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'bypasses': 0}
+    
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """
+        Build a normalized content hash for the request parts.
+        
+        Strings are whitespace-normalized so trivially different prompts
+        (extra spaces, trailing newlines) share an entry.
+        """
+        normalized = {
+            name: ' '.join(value.split()) if isinstance(value, str) else value
+            for name, value in parts.items()
+        }
+        payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        """Shared Redis tier (``get_redis()``), or None when only the local tier is used."""
+        return get_redis() if self.use_redis else None
+    
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def _get_local(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            
+            self._local.move_to_end(key)
+            return value
+    
+    def _set_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl, value)
+            self._local.move_to_end(key)
+            
+            # Size-based eviction: drop least recently used entries
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a cached value in the local tier, then Redis."""
+        value = self._get_local(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+        
+        try:
+            raw = self.redis.get(self.KEY_PREFIX + key) if self.redis else None
+        except redis.RedisError as e:
+            logger.warning('LLM cache read failed: %s', e)
+            raw = None
+        
+        if raw is None:
+            self._count('misses')
+            return None
+        
+        value = json.loads(raw)
+        self._set_local(key, value)
+        self._count('redis_hits')
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in both tiers."""
+        self._set_local(key, value)
+        
+        try:
+            if self.redis:
+                self.redis.set(self.KEY_PREFIX + key, json.dumps(value), ex=self.ttl)
+        except redis.RedisError as e:
+            logger.warning('LLM cache write failed: %s', e)
+    
+    def get_or_create(self, key: str, factory: Callable[[], Any], bypass: bool = False) -> Any:
+        """
+        Return the cached value for ``key`` or compute and store it.
+        
+        Args:
+            key: Cache key from :meth:`make_key`
+            factory: Callable producing the value on a miss
+            bypass: Skip the lookup and refresh the entry (e.g. "regenerate")
+        """
+        if not self.enabled:
+            return factory()
+        
+        if bypass:
+            self._count('bypasses')
+        else:
+            value = self.get(key)
+            if value is not None:
+                return value
+        
+        value = factory()
+        self.set(key, value)
+        return value
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['local_entries'] = len(self._local)
+        
+        lookups = stats['local_hits'] + stats['redis_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['local_hits'] + stats['redis_hits']) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get the process-wide LLM cache."""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache(
+            ttl=int(os.getenv('LLM_CACHE_TTL', '86400')),
+            max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1024')),
+            enabled=os.getenv('LLM_CACHE_ENABLED', 'True').lower() == 'true'
+        )
+    return _llm_cache
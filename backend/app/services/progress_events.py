@@ -0,0 +1,273 @@
+"""
+Progress Events Service
+
+Redis pub/sub fan-out of video status and progress changes to
+Server-Sent Events streams.
+"""
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+import redis
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models.video import Video, VideoStatus
+from app.models.generation_task import GenerationTask
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Attributes whose changes are pushed to clients
+VIDEO_EVENT_FIELDS = (
+    'status',
+    'video_url',
+    'thumbnail_url',
+    'storyboard_url',
+    'hls_url',
+    'error_message',
+)
+TASK_EVENT_FIELDS = ('status', 'progress')
+
+FINAL_STATUSES = (VideoStatus.COMPLETED.value, VideoStatus.FAILED.value)
+
+
+class StreamLimiter:
+    """
+    Caps concurrent SSE streams in a web process.
+    
+    Each open stream holds a gunicorn thread for its lifetime, so streams
+    past the cap are refused instead of starving regular API requests.
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> bool:
+        """Take a stream slot; False when all slots are in use."""
+        with self._lock:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+    
+    def release(self) -> None:
+        """Return a stream slot."""
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_stream_limiter(limit: int) -> StreamLimiter:
+    """Process-wide stream limiter (created on first use)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = StreamLimiter(limit)
+        return _limiter
+
+
+class ProgressEvents:
+    """
+    Publishes progress events on per-video and per-user channels.
+    
+    Events are partial: each carries ``video_id`` plus the fields that
+    changed (``status``, ``progress``, ``task_status``, URLs), so clients
+    merge them into their current state.
+    """
+    
+    VIDEO_CHANNEL = 'events:video:{}'
+    USER_CHANNEL = 'events:user:{}'
+    
+    def __init__(self, heartbeat: int = 15, max_lifetime: int = 300, retry_ms: int = 3000):
+        self.heartbeat = heartbeat
+        self.max_lifetime = max_lifetime
+        self.retry_ms = retry_ms
+        self.redis = get_redis()
+    
+    def publish(self, payload: Dict[str, Any], user_id: Optional[int] = None) -> None:
+        """
+        Publish an event for a video (best effort).
+        
+        Args:
+            payload: Event data including ``video_id``
+            user_id: Owner, to also reach the per-user stream
+        """
+        message = json.dumps({**payload, 'ts': time.time()})
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.publish(self.VIDEO_CHANNEL.format(payload['video_id']), message)
+            if user_id is not None:
+                pipe.publish(self.USER_CHANNEL.format(user_id), message)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug('Progress event publish failed: %s', e)
+    
+    def subscribe(self, video_id: Optional[int] = None, user_id: Optional[int] = None):
+        """
+        Subscribe to one video's or one user's channel.
+        
+        Call this before reading the snapshot passed to :meth:`stream`, so
+        events committed in between are delivered instead of lost.
+        
+        Returns:
+            Subscribed ``PubSub``, or None if Redis is unavailable
+        """
+        channel = self.VIDEO_CHANNEL.format(video_id) if video_id is not None else self.USER_CHANNEL.format(user_id)
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(channel)
+        except redis.RedisError as e:
+            logger.warning('Progress event subscribe failed: %s', e)
+            pubsub.close()
+            return None
+        return pubsub
+    
+    def stream(
+        self,
+        pubsub,
+        snapshot: Optional[Dict[str, Any]] = None,
+        video_id: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Server-Sent Events stream for one video (``video_id``) or all of a
+        user's videos.
+        
+        Sends a ``retry`` hint and ``snapshot`` first, then every event
+        received on ``pubsub`` (from :meth:`subscribe`), with comment
+        heartbeats while idle. A single-video stream ends once the video
+        reaches a final status; any stream ends after ``max_lifetime``
+        seconds, or on a Redis error, and ``EventSource`` reconnects to a
+        fresh snapshot after ``retry_ms``.
+        
+        Yields:
+            SSE-formatted messages
+        """
+        deadline = time.monotonic() + self.max_lifetime
+        
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            
+            if snapshot is not None:
+                yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+                if video_id is not None and snapshot.get('status') in FINAL_STATUSES:
+                    return
+            
+            if pubsub is None:
+                # Redis is down: the snapshot is all we have, reconnect for the next one
+                return
+            
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                
+                message = pubsub.get_message(timeout=min(self.heartbeat, remaining))
+                if message is None:
+                    yield ': keepalive\n\n'
+                    continue
+                
+                yield f"event: progress\ndata: {message['data']}\n\n"
+                
+                if video_id is not None and json.loads(message['data']).get('status') in FINAL_STATUSES:
+                    return
+        except redis.RedisError as e:
+            logger.warning('Progress event stream failed: %s', e)
+        finally:
+            if pubsub is not None:
+                pubsub.close()
+
+
+def progress_snapshot(video: Video, task_record: Optional[GenerationTask] = None) -> Dict[str, Any]:
+    """Full current state of a video in event form."""
+    snapshot = {'video_id': video.id}
+    snapshot.update({name: getattr(video, name) for name in VIDEO_EVENT_FIELDS})
+    if task_record:
+        snapshot.update({'task_status': task_record.status, 'progress': task_record.progress})
+    return snapshot
+
+
+def _changed(obj, fields) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in fields)
+
+
+def _collect_video_event(mapper, connection, video: Video) -> None:
+    """Record a flushed Video status/URL change for publishing after commit."""
+    session = object_session(video)
+    if session is None or not _changed(video, VIDEO_EVENT_FIELDS):
+        return
+    
+    pending = session.info.setdefault('progress_events', {})
+    entry = pending.setdefault(video.id, {'user_id': video.user_id, 'payload': {'video_id': video.id}})
+    entry['user_id'] = video.user_id
+    entry['payload'].update({name: getattr(video, name) for name in VIDEO_EVENT_FIELDS})
+
+
+def _collect_task_event(mapper, connection, task_record: GenerationTask) -> None:
+    """Record a flushed GenerationTask status/progress change for publishing after commit."""
+    session = object_session(task_record)
+    if session is None or not _changed(task_record, TASK_EVENT_FIELDS):
+        return
+    
+    pending = session.info.setdefault('progress_events', {})
+    entry = pending.setdefault(task_record.video_id, {'user_id': None, 'payload': {'video_id': task_record.video_id}})
+    entry['payload'].update({
+        'task_status': task_record.status,
+        'progress': task_record.progress,
+        'started_at': task_record.started_at.isoformat() if task_record.started_at else None
+    })
+    
+    if entry['user_id'] is None:
+        # Owner from the identity map (tasks load the video first); no extra query
+        video = session.identity_map.get(inspect(Video).identity_key_from_primary_key((task_record.video_id,)))
+        entry['user_id'] = video.user_id if video is not None else None
+
+
+def _publish_events(session: Session) -> None:
+    """Mirror committed changes into the progress hashes and publish them."""
+    from app.services.progress_tracker import ProgressTracker
+    
+    pending = session.info.pop('progress_events', None)
+    if not pending:
+        return
+    
+    tracker = ProgressTracker()
+    for video_id, entry in pending.items():
+        fields = {name: value for name, value in entry['payload'].items() if name != 'video_id'}
+        tracker.update(video_id, fields, entry['user_id'])
+
+
+def _discard_events(session: Session, previous_transaction) -> None:
+    session.info.pop('progress_events', None)
+
+
+_registered = False
+
+
+def register_progress_events() -> None:
+    """
+    Publish status/progress changes whenever they are committed (idempotent).
+    
+    Changes are collected by mapper events on ``Video`` and ``GenerationTask``
+    only, so flushes touching other models do no work, and the commit hook
+    returns immediately for sessions that recorded nothing.
+    """
+    global _registered
+    if _registered:
+        return
+    
+    for event_name in ('after_insert', 'after_update'):
+        event.listen(Video, event_name, _collect_video_event)
+        event.listen(GenerationTask, event_name, _collect_task_event)
+    event.listen(Session, 'after_commit', _publish_events)
+    event.listen(Session, 'after_soft_rollback', _discard_events)
+    _registered = True
@@ -0,0 +1,98 @@
+"""
+Progress Tracker Service
+
+Live generation progress kept in Redis hashes, so status polls do not
+write to the database between state transitions.
+"""
+import os
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+import redis
+
+from app.services.progress_events import ProgressEvents
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Hash fields decoded as integers (everything else stays a string)
+INT_FIELDS = ('progress', 'poll_attempts', 'user_id')
+
+
+class ProgressTracker:
+    """
+    Per-video progress hash (``progress:video:<id>``) with a TTL.
+    
+    Holds the latest ``status``, ``task_status``, ``progress`` and poll
+    state (``poll_attempts``, ``last_polled_at``, ``started_at``). Committed
+    transitions are mirrored in automatically (see ``progress_events``);
+    intermediate progress is written here only and copied onto the
+    GenerationTask row at the next transition.
+    """
+    
+    KEY_PREFIX = 'progress:video:'
+    
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl or int(os.getenv('PROGRESS_TTL', '3600'))
+        self.redis = get_redis()
+    
+    def _key(self, video_id: int) -> str:
+        return f"{self.KEY_PREFIX}{video_id}"
+    
+    def update(self, video_id: int, fields: Dict[str, Any], user_id: Optional[int] = None, publish: bool = True) -> None:
+        """
+        Merge fields into a video's progress hash and push them to SSE clients.
+        
+        Args:
+            video_id: Video ID
+            fields: Changed fields (None values are removed)
+            user_id: Owner, to also reach the per-user stream
+            publish: Also publish a progress event
+        """
+        values = {name: value for name, value in fields.items() if value is not None}
+        removed = [name for name, value in fields.items() if value is None]
+        if user_id is not None:
+            values['user_id'] = user_id
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            if values:
+                pipe.hset(self._key(video_id), mapping=values)
+            if removed:
+                pipe.hdel(self._key(video_id), *removed)
+            pipe.expire(self._key(video_id), self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning('Progress update failed for video %s: %s', video_id, e)
+        
+        if publish:
+            ProgressEvents().publish({'video_id': video_id, **fields}, user_id)
+    
+    @staticmethod
+    def _decode(raw: Dict[str, str]) -> Dict[str, Any]:
+        return {name: int(value) if name in INT_FIELDS else value for name, value in raw.items()}
+    
+    def get(self, video_id: int) -> Dict[str, Any]:
+        """Live progress of a video (empty if unknown, expired or Redis is down)."""
+        try:
+            return self._decode(self.redis.hgetall(self._key(video_id)))
+        except redis.RedisError as e:
+            logger.warning('Progress read failed for video %s: %s', video_id, e)
+            return {}
+    
+    def get_many(self, video_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Live progress of several videos in one round trip."""
+        video_ids = list(video_ids)
+        if not video_ids:
+            return {}
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for video_id in video_ids:
+                pipe.hgetall(self._key(video_id))
+            rows = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning('Progress read failed: %s', e)
+            return {}
+        
+        return {video_id: self._decode(raw) for video_id, raw in zip(video_ids, rows) if raw}
@@ -0,0 +1,218 @@
+"""
+Video Result Cache Service
+
+Reuses stored generation results for identical requests (same prepared
+prompt, generation parameters and provider model) instead of paying for
+a new provider run.
+"""
+import os
+import shutil
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.video_cache_entry import VideoCacheEntry
+from app.services.llm_cache import LLMCache
+
+logger = logging.getLogger(__name__)
+
+
+class VideoResultCache:
+    """Fingerprint-keyed cache of generated videos stored in VIDEO_OUTPUT_DIR/cache."""
+    
+    def __init__(self, output_dir: str, ttl: int, max_bytes: int):
+        self.output_dir = output_dir
+        self.cache_dir = os.path.join(output_dir, 'cache')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'VideoResultCache':
+        """Build a cache from Flask config."""
+        return cls(
+            output_dir=config['VIDEO_OUTPUT_DIR'],
+            ttl=config['VIDEO_CACHE_TTL'],
+            max_bytes=config['VIDEO_CACHE_MAX_BYTES']
+        )
+    
+    @staticmethod
+    def fingerprint(
+        prepared: Dict[str, str],
+        duration: int,
+        resolution: str,
+        provider: str,
+        model_id: Optional[str]
+    ) -> str:
+        """
+        Compute the generation fingerprint.
+        
+        Args:
+            prepared: Output of ``PromptEngine.prepare_prompt``
+            duration: Video duration in seconds
+            resolution: Video resolution
+            provider: Provider name
+            model_id: Provider model ID
+            
+        Returns:
+            Hex digest identifying identical generation requests
+        """
+        return LLMCache.make_key(
+            kind='video',
+            enhanced=prepared['enhanced'],
+            negative=prepared['negative'],
+            duration=duration,
+            resolution=resolution,
+            provider=provider,
+            model_id=model_id
+        )
+    
+    def _expired(self, entry: VideoCacheEntry) -> bool:
+        return entry.created_at < datetime.utcnow() - timedelta(seconds=self.ttl)
+    
+    def _delete(self, entry: VideoCacheEntry) -> None:
+        try:
+            os.remove(entry.file_path)
+        except FileNotFoundError:
+            pass
+        db.session.delete(entry)
+    
+    def lookup(self, fingerprint: str) -> Optional[VideoCacheEntry]:
+        """
+        Find a live cache entry and record the hit (caller commits).
+        
+        Expired entries and entries whose file is gone are dropped.
+        """
+        entry = VideoCacheEntry.query.filter_by(fingerprint=fingerprint).first()
+        if not entry:
+            return None
+        
+        if self._expired(entry) or not os.path.exists(entry.file_path):
+            self._delete(entry)
+            return None
+        
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_accessed_at = datetime.utcnow()
+        return entry
+    
+    @staticmethod
+    def link(source_path: str, dest_path: str) -> str:
+        """
+        Hard-link a stored file to a per-video path.
+        
+        A hard link costs no extra disk and survives removal of the source;
+        a copy is made when the paths are on different filesystems.
+        """
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        
+        try:
+            os.link(source_path, dest_path)
+        except OSError:
+            shutil.copyfile(source_path, dest_path)
+        
+        return dest_path
+    
+    @classmethod
+    def materialize(cls, entry: VideoCacheEntry, dest_path: str) -> str:
+        """Link the cached artifact to a per-video path (see :meth:`link`)."""
+        return cls.link(entry.file_path, dest_path)
+    
+    def store(self, fingerprint: str, source_path: str, provider: str = None) -> VideoCacheEntry:
+        """
+        Record a finished generation in the cache.
+        
+        The archived provider output (``source.mp4``) is linked into the
+        cache (see :meth:`link`) rather than downloaded again; provider URLs
+        also expire.
+        """
+        existing = VideoCacheEntry.query.filter_by(fingerprint=fingerprint).first()
+        if existing and os.path.exists(existing.file_path):
+            return existing
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_path = self.link(source_path, os.path.join(self.cache_dir, f'{fingerprint}.mp4'))
+        size = os.path.getsize(file_path)
+        
+        if existing:
+            existing.file_path = file_path
+            existing.size_bytes = size
+            existing.created_at = datetime.utcnow()
+            db.session.commit()
+            return existing
+        
+        entry = VideoCacheEntry(
+            fingerprint=fingerprint,
+            file_path=file_path,
+            size_bytes=size,
+            provider=provider
+        )
+        db.session.add(entry)
+        
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Stored concurrently by another worker
+            db.session.rollback()
+            entry = VideoCacheEntry.query.filter_by(fingerprint=fingerprint).first()
+        
+        return entry
+    
+    @staticmethod
+    def _owned_bytes(path: str) -> int:
+        """
+        Bytes freed by removing a cache file.
+        
+        Files hard-linked to a per-video output are shared: removing the
+        cache link frees nothing, so they count as zero.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        return stat.st_size if stat.st_nlink == 1 else 0
+    
+    def disk_usage(self) -> int:
+        """Bytes held only by the cache directory (shared hard links excluded)."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        return sum(self._owned_bytes(os.path.join(self.cache_dir, name)) for name in os.listdir(self.cache_dir))
+    
+    def evict(self) -> int:
+        """
+        Evict expired entries, then least recently used entries until the
+        cache directory fits the size budget.
+        
+        Only entries whose file the cache owns alone are evicted for the
+        budget; shared ones free no space and are left to the TTL.
+        
+        Returns:
+            Number of evicted entries
+        """
+        evicted = 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        
+        for entry in VideoCacheEntry.query.filter(VideoCacheEntry.created_at < cutoff).all():
+            self._delete(entry)
+            evicted += 1
+        db.session.commit()
+        
+        usage = self.disk_usage()
+        if usage > self.max_bytes:
+            for entry in VideoCacheEntry.query.order_by(VideoCacheEntry.last_accessed_at.asc()).all():
+                if usage <= self.max_bytes:
+                    break
+                freed = self._owned_bytes(entry.file_path)
+                if not freed:
+                    continue
+                self._delete(entry)
+                usage -= freed
+                evicted += 1
+            db.session.commit()
+        
+        if evicted:
+            logger.info('Evicted %d video cache entries', evicted)
+        
+        return evicted
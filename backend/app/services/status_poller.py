@@ -0,0 +1,153 @@
+"""
+Status Poller Service
+
+Long-running poller that checks every in-flight provider prediction
+concurrently on a single asyncio event loop and writes finished results
+back to the database in bulk.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.generation_task import GenerationTask
+from app.services.ai_provider_service import AIProviderService, BaseVideoProvider
+
+logger = logging.getLogger(__name__)
+
+
+class StatusPoller:
+    """
+    Batched status checker for all in-flight predictions.
+    
+    One process replaces the per-video ``poll_video_status`` tasks: each
+    cycle loads the in-progress GenerationTask rows, checks them with at
+    most ``max_concurrency`` HTTP calls in flight, and commits all finished
+    results in a single transaction. With webhooks enabled, each prediction
+    is checked at most once per ``VIDEO_WEBHOOK_FALLBACK_INTERVAL``
+    (``next_check`` holds the earliest next check per provider task ID).
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        providers: Optional[Dict[str, BaseVideoProvider]] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.providers = providers or {}
+        self.next_check: Dict[str, datetime] = {}
+    
+    def get_provider(self, name: str) -> BaseVideoProvider:
+        """Get (and cache) the video provider instance for a provider name."""
+        if name not in self.providers:
+            self.providers[name] = AIProviderService(name).video_provider
+        return self.providers[name]
+    
+    async def check_many(self, predictions: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Check many predictions concurrently.
+        
+        Args:
+            predictions: List of (provider name, provider task ID) pairs
+            
+        Returns:
+            List of status results in the same order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def check(provider_name: str, task_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_provider(provider_name).check_status_async(task_id)
+        
+        return await asyncio.gather(*(check(name, task_id) for name, task_id in predictions))
+    
+    def load_in_flight(self, limit: int) -> List[Tuple[str, str, datetime]]:
+        """Load (provider, provider_task_id, started_at) for in-progress tasks."""
+        rows = db.session.query(
+            GenerationTask.provider,
+            GenerationTask.provider_task_id,
+            GenerationTask.started_at
+        ).filter(
+            GenerationTask.status == 'processing',
+            GenerationTask.provider_task_id.isnot(None)
+        ).order_by(GenerationTask.id).limit(limit).all()
+        
+        return [tuple(row) for row in rows]
+    
+    def poll_once(self, loop: asyncio.AbstractEventLoop) -> Dict[str, int]:
+        """
+        Run a single poll cycle.
+        
+        Returns:
+            Dictionary with cycle statistics
+        """
+        from app.tasks.video_tasks import apply_provider_results
+        
+        config = current_app.config
+        default_provider = config['AI_VIDEO_PROVIDER']
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=config['VIDEO_POLL_TIMEOUT'])
+        
+        # With webhooks enabled only sweep predictions the callback missed,
+        # each at most once per fallback interval
+        fallback = None
+        if config.get('REPLICATE_WEBHOOK_URL'):
+            fallback = timedelta(seconds=config['VIDEO_WEBHOOK_FALLBACK_INTERVAL'])
+        
+        rows = self.load_in_flight(config['STATUS_POLLER_BATCH_SIZE'])
+        
+        # Forget predictions that are no longer in flight
+        in_flight = {task_id for _, task_id, _ in rows}
+        self.next_check = {task_id: due for task_id, due in self.next_check.items() if task_id in in_flight}
+        
+        results = []
+        pending = []
+        for provider, task_id, started_at in rows:
+            if started_at and started_at < cutoff:
+                results.append({
+                    'task_id': task_id,
+                    'status': 'failed',
+                    'error': 'Generation timed out'
+                })
+            elif fallback is None:
+                pending.append((provider or default_provider, task_id))
+            elif started_at and started_at < now - fallback and self.next_check.get(task_id, now) <= now:
+                pending.append((provider or default_provider, task_id))
+                self.next_check[task_id] = now + fallback
+        
+        if pending:
+            results.extend(loop.run_until_complete(self.check_many(pending)))
+        
+        applied = apply_provider_results(results)
+        
+        # Drop the identity map so the next cycle sees fresh rows
+        db.session.remove()
+        
+        return {
+            'in_flight': len(rows),
+            'checked': len(pending),
+            'completed': len(applied['completed']),
+            'failed': len(applied['failed']),
+        }
+    
+    def run_forever(self, interval: float) -> None:
+        """Poll until interrupted, starting a new cycle every ``interval`` seconds."""
+        loop = asyncio.new_event_loop()
+        
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    stats = self.poll_once(loop)
+                    logger.info('Status poll cycle: %s', stats)
+                except Exception:
+                    logger.exception('Status poll cycle failed')
+                    db.session.remove()
+                
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            loop.close()
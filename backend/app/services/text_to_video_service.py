@@ -4,11 +4,14 @@ Text-to-Video Service
 Main orchestrator for the video generation pipeline.
 """
 import os
+import shutil
 from typing import Dict, Any, Optional
 
 from app.services.prompt_engine import PromptEngine
 from app.services.ai_provider_service import AIProviderService
+from app.services.result_cache import VideoResultCache
 from app.utils.ffmpeg_utils import FFmpegProcessor
+from app.utils.http_client import iter_download
 
 
 class TextToVideoService:
@@ -27,7 +30,7 @@ class TextToVideoService:
     def __init__(self, provider: str = None):
         self.ai_service = AIProviderService(provider)
         self.ffmpeg = FFmpegProcessor()
-        self.output_dir = os.getenv('VIDEO_OUTPUT_DIR', 'app/static/videos')
+        self.output_dir = os.getenv('VIDEO_OUTPUT_DIR', 'media')
         
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
@@ -39,7 +42,9 @@ class TextToVideoService:
         duration: int = 6,
         resolution: str = '1024x576',
         voice_id: str = None,
-        script: str = None
+        script: str = None,
+        with_script: bool = True,
+        idempotency_key: str = None
     ) -> Dict[str, Any]:
         """
         Full video creation pipeline.
@@ -51,6 +56,9 @@ class TextToVideoService:
             resolution: Video resolution
             voice_id: ElevenLabs voice ID (optional)
             script: Custom script (optional)
+            with_script: Generate a script if none is provided (the task
+                pipeline generates it in a parallel branch instead)
+            idempotency_key: Key deduplicating provider submissions across retries
             
         Returns:
             Dictionary with task info and status
@@ -59,14 +67,15 @@ class TextToVideoService:
         prepared = PromptEngine.prepare_prompt(prompt, style)
         
         # Step 2: Generate or use provided script
-        if not script:
+        if not script and with_script:
             script = self.generate_script(prompt, style, duration)
         
         # Step 3: Generate video
         video_result = self.ai_service.generate_video(
             prompt=prepared['enhanced'],
             duration=duration,
-            resolution=resolution
+            resolution=resolution,
+            idempotency_key=idempotency_key
         )
         
         return {
@@ -78,51 +87,263 @@ class TextToVideoService:
             'error': video_result.get('error')
         }
     
+    def fingerprint(
+        self,
+        prompt: str,
+        style: str = 'cinematic',
+        duration: int = 6,
+        resolution: str = '1024x576'
+    ) -> str:
+        """Fingerprint of a generation request (result cache key)."""
+        prepared = PromptEngine.prepare_prompt(prompt, style)
+        return VideoResultCache.fingerprint(
+            prepared,
+            duration,
+            resolution,
+            self.ai_service.provider_name,
+            self.ai_service.video_provider.MODEL_ID
+        )
+    
+    def video_dir(self, video_id: int) -> str:
+        """Per-video output directory."""
+        path = os.path.join(self.output_dir, str(video_id))
+        os.makedirs(path, exist_ok=True)
+        return path
+    
+    @staticmethod
+    def media_url(video_id: int, filename: str) -> str:
+        """Public URL for a file in the per-video output directory."""
+        prefix = os.getenv('MEDIA_URL_PREFIX', '/api/media')
+        return f"{prefix}/{video_id}/{filename}"
+    
     def check_status(self, task_id: str) -> Dict[str, Any]:
         """Check video generation status."""
         return self.ai_service.check_video_status(task_id)
     
-    def generate_script(self, prompt: str, style: str, duration: int) -> str:
+    def generate_script(self, prompt: str, style: str, duration: int, bypass_cache: bool = False) -> str:
         """Generate video script."""
-        return AIProviderService.generate_script(prompt, style, duration)
+        return AIProviderService.generate_script(prompt, style, duration, bypass_cache=bypass_cache)
     
-    def generate_seo(self, prompt: str, script: str = None) -> Dict[str, Any]:
+    def generate_seo(self, prompt: str, script: str = None, bypass_cache: bool = False) -> Dict[str, Any]:
         """Generate SEO metadata."""
-        return AIProviderService.generate_seo(prompt, script)
+        return AIProviderService.generate_seo(prompt, script, bypass_cache=bypass_cache)
     
-    def generate_audio(self, text: str, voice_id: str) -> Optional[str]:
-        """Generate voice audio."""
-        return AIProviderService.generate_voice(text, voice_id)
+    def generate_audio(self, text: str, voice_id: str, video_id: Optional[int] = None) -> Optional[str]:
+        """Generate voice audio (into the video's output directory when given)."""
+        output_dir = self.video_dir(video_id) if video_id is not None else None
+        return AIProviderService.generate_voice(text, voice_id, output_dir)
     
     def post_process(
         self,
         video_path: str,
         audio_path: str = None,
-        output_format: str = 'mp4'
-    ) -> str:
+        output_format: str = 'mp4',
+        output_path: str = None,
+        resolution: str = None,
+        with_thumbnail: bool = True
+    ) -> Dict[str, Optional[str]]:
         """
-        Post-process video with FFmpeg.
+        Post-process video with FFmpeg in a single pass.
+        
+        One decode feeds the audio mux, the x264 faststart encode, the
+        thumbnail and the optional resize. Videos of at least
+        ``PARALLEL_ENCODE_MIN_SECONDS`` are instead encoded in chunks
+        across FFmpeg processes (see ``optimize_video_parallel``).
         
         Args:
             video_path: Path to source video
             audio_path: Path to audio file (optional)
             output_format: Output format
+            output_path: Path for processed video (defaults to ``processed_<name>``)
+            resolution: Target resolution, e.g. ``1280x720`` (optional)
+            with_thumbnail: Also extract a thumbnail JPEG
             
         Returns:
-            Path to processed video
+            Dictionary with processed video and thumbnail paths
         """
-        output_path = os.path.join(
-            self.output_dir,
-            f"processed_{os.path.basename(video_path)}"
-        )
+        if not output_path:
+            name = os.path.splitext(os.path.basename(video_path))[0]
+            output_path = os.path.join(self.output_dir, f"processed_{name}.{output_format}")
+        
+        thumbnail_path = f"{os.path.splitext(output_path)[0]}_thumb.jpg" if with_thumbnail else None
         
-        if audio_path:
-            # Merge audio with video
-            return self.ffmpeg.merge_audio(video_path, audio_path, output_path)
+        if self._encode_in_parallel(video_path):
+            self.ffmpeg.optimize_video_parallel(
+                video_path,
+                output_path,
+                audio_path=audio_path,
+                **self._size_options(resolution)
+            )
+            if thumbnail_path:
+                self.ffmpeg.extract_thumbnail(output_path, thumbnail_path)
         else:
-            # Just optimize/convert
-            return self.ffmpeg.optimize_video(video_path, output_path)
+            self.ffmpeg.render_outputs(
+                video_path,
+                output_path,
+                thumbnail_path=thumbnail_path,
+                audio_path=audio_path,
+                **self._size_options(resolution)
+            )
+        
+        return {
+            'video_path': output_path,
+            'thumbnail_path': thumbnail_path if thumbnail_path and os.path.exists(thumbnail_path) else None
+        }
+    
+    def _encode_in_parallel(self, video_path: str) -> bool:
+        """Whether a video is long enough for the split-encode-concat path."""
+        min_seconds = float(os.getenv('PARALLEL_ENCODE_MIN_SECONDS', '30'))
+        return min_seconds > 0 and self.ffmpeg.probe(video_path)['duration'] >= min_seconds
+    
+    @staticmethod
+    def _size_options(resolution: Optional[str]) -> Dict[str, int]:
+        """Width/height options for a ``WxH`` resolution string."""
+        if not resolution:
+            return {}
+        width, height = map(int, resolution.split('x'))
+        return {'width': width, 'height': height}
+    
+    def _output_urls(self, video_id: int, video_path: str, thumbnail_path: Optional[str]) -> Dict[str, Optional[str]]:
+        return {
+            'video_url': self.media_url(video_id, os.path.basename(video_path)),
+            'thumbnail_url': self.media_url(video_id, os.path.basename(thumbnail_path)) if thumbnail_path else None
+        }
     
     def generate_thumbnail(self, video_path: str) -> str:
         """Extract thumbnail from video."""
         return self.ffmpeg.extract_thumbnail(video_path)
+    
+    def generate_storyboard(self, video_id: int, video_path: str) -> Dict[str, Any]:
+        """
+        Generate the scrub-preview sprite sheet and WebVTT index.
+        
+        Returns:
+            Dictionary with the public WebVTT URL and sprite geometry
+        """
+        video_dir = self.video_dir(video_id)
+        
+        storyboard = self.ffmpeg.generate_storyboard(
+            video_path,
+            os.path.join(video_dir, 'storyboard.jpg'),
+            os.path.join(video_dir, 'storyboard.vtt'),
+            count=int(os.getenv('STORYBOARD_FRAMES', '20')),
+            columns=int(os.getenv('STORYBOARD_COLUMNS', '5')),
+            sprite_url=self.media_url(video_id, 'storyboard.jpg')
+        )
+        storyboard['storyboard_url'] = self.media_url(video_id, 'storyboard.vtt')
+        
+        return storyboard
+    
+    def package_hls(self, video_id: int, video_path: str) -> Dict[str, Any]:
+        """
+        Package the delivery video as an HLS adaptive bitrate ladder.
+        
+        The ladder is written to a scratch directory and swapped into
+        ``hls/`` when complete, so a re-run never serves a half-written
+        playlist.
+        
+        Returns:
+            Dictionary with the public master playlist URL and renditions
+        """
+        video_dir = self.video_dir(video_id)
+        hls_dir = os.path.join(video_dir, 'hls')
+        tmp_dir = os.path.join(video_dir, 'hls.part')
+        
+        ladder = [
+            tuple(int(value) for value in rung.split(':'))
+            for rung in os.getenv('HLS_LADDER', '1080:5000,720:2800,480:1400,360:800').split(',')
+        ]
+        renditions = self.ffmpeg.hls_ladder(
+            self.ffmpeg.probe(video_path)['height'],
+            ladder,
+            max_renditions=int(os.getenv('HLS_MAX_RENDITIONS', '4'))
+        )
+        
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        self.ffmpeg.package_hls(
+            video_path,
+            tmp_dir,
+            renditions,
+            segment_seconds=int(os.getenv('HLS_SEGMENT_SECONDS', '4')),
+            segment_type=os.getenv('HLS_SEGMENT_TYPE', 'mpegts')
+        )
+        shutil.rmtree(hls_dir, ignore_errors=True)
+        os.rename(tmp_dir, hls_dir)
+        
+        return {
+            'hls_url': self.media_url(video_id, 'hls/master.m3u8'),
+            'renditions': [f'{height}p' for height, _ in renditions]
+        }
+    
+    def save_audio(self, video_id: int, audio_path: str) -> str:
+        """Move generated narration into the per-video output directory."""
+        dest_path = os.path.join(self.video_dir(video_id), 'narration.mp3')
+        shutil.move(audio_path, dest_path)
+        return dest_path
+    
+    def ingest_output(self, video_id: int, source_url: str, resolution: str = None) -> Dict[str, str]:
+        """
+        Download the provider output and post-process it in a single pass.
+        
+        The download is streamed into FFmpeg and teed to ``source.mp4``
+        (the archival copy), so processing starts before the download ends
+        and the file is written to disk once. An existing ``source.mp4``
+        (e.g. from the result cache) is processed from disk instead.
+        
+        Returns:
+            Dictionary with the archived source path and the public video
+            and thumbnail URLs
+        """
+        video_dir = self.video_dir(video_id)
+        source_path = os.path.join(video_dir, 'source.mp4')
+        
+        if os.path.exists(source_path):
+            outputs = self.finalize_outputs(video_id, source_path, resolution)
+        else:
+            audio_path = os.path.join(video_dir, 'narration.mp3')
+            output_path = os.path.join(video_dir, 'video.mp4')
+            thumbnail_path = os.path.join(video_dir, 'video_thumb.jpg')
+            
+            self.ffmpeg.process_stream(
+                iter_download(source_url),
+                output_path,
+                archive_path=source_path,
+                thumbnail_path=thumbnail_path,
+                audio_path=audio_path if os.path.exists(audio_path) else None,
+                **self._size_options(resolution)
+            )
+            
+            outputs = self._output_urls(
+                video_id,
+                output_path,
+                thumbnail_path if os.path.exists(thumbnail_path) else None
+            )
+        
+        outputs['source_path'] = source_path
+        return outputs
+    
+    def finalize_outputs(self, video_id: int, source_path: str, resolution: str = None) -> Dict[str, str]:
+        """
+        Join step of the pipeline: merge narration, encode for delivery
+        and extract a thumbnail in one FFmpeg run.
+        
+        Args:
+            video_id: Video ID
+            source_path: Downloaded provider output
+            resolution: Target resolution (optional)
+            
+        Returns:
+            Dictionary with the public video and thumbnail URLs
+        """
+        video_dir = self.video_dir(video_id)
+        audio_path = os.path.join(video_dir, 'narration.mp3')
+        
+        processed = self.post_process(
+            source_path,
+            audio_path=audio_path if os.path.exists(audio_path) else None,
+            output_path=os.path.join(video_dir, 'video.mp4'),
+            resolution=resolution
+        )
+        
+        return self._output_urls(video_id, processed['video_path'], processed['thumbnail_path'])
@@ -3,14 +3,37 @@ Video Generation Celery Tasks
 """
 import os
 import time
+import uuid
+import logging
+from contextlib import contextmanager
 from datetime import datetime
-from celery import Celery
+from typing import Any, Dict, List, Optional
+
+import redis
+from celery import Celery, chain, group
+from celery.exceptions import Retry
+from celery.signals import before_task_publish, task_prerun, worker_process_init, worker_process_shutdown
+from flask import current_app
+from kombu import Queue
+from sqlalchemy import update
+from sqlalchemy.orm import selectinload
 
 from app import create_app
 from app.extensions import db
 from app.models.video import Video, VideoStatus
 from app.models.generation_task import GenerationTask
+from app.services.ai_provider_service import AIProviderService
+from app.services.inflight_registry import InFlightRegistry
+from app.services.progress_tracker import ProgressTracker
+from app.services.prompt_engine import PromptEngine
+from app.services.result_cache import VideoResultCache
 from app.services.text_to_video_service import TextToVideoService
+from app.utils.ffmpeg_scheduler import cancel_scope, kill_running_jobs
+from app.utils.http_client import reset_http_clients
+from app.utils.queue_metrics import record_queue_wait
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
 
 # Initialize Celery
 celery_app = Celery(
@@ -30,10 +53,465 @@ celery_app.conf.update(
     task_soft_time_limit=540,  # Soft limit at 9 minutes
 )
 
+# Queues by task type; generation is split into an interactive and a batch tier
+QUEUE_INTERACTIVE = 'generate.interactive'
+QUEUE_BATCH = 'generate.batch'
+QUEUE_POLL = 'poll'
+QUEUE_PIPELINE = 'pipeline'
+
+# Longest a coalesced video waits for another to ingest the shared output (seconds)
+INGEST_LOCK_TIMEOUT = 600
+
+celery_app.conf.update(
+    task_queues=tuple(
+        Queue(name, routing_key=name)
+        for name in (QUEUE_INTERACTIVE, QUEUE_BATCH, QUEUE_POLL, QUEUE_PIPELINE)
+    ),
+    task_default_queue=QUEUE_PIPELINE,
+    task_routes={
+        # Batch submissions pass queue=QUEUE_BATCH explicitly
+        'app.tasks.video_tasks.generate_video_task': {'queue': QUEUE_INTERACTIVE},
+        'app.tasks.video_tasks.poll_video_status': {'queue': QUEUE_POLL},
+    },
+    worker_prefetch_multiplier=1,  # don't reserve batch work ahead of interactive work
+)
+
+
+# Worker-process singletons (created once per process, reused by every task)
+_flask_app = None
+_video_service = None
+
 
 def get_flask_app():
-    """Get Flask app context."""
-    return create_app()
+    """Get the Flask app for this process, creating it on first use."""
+    global _flask_app
+    if _flask_app is None:
+        _flask_app = create_app()
+    return _flask_app
+
+
+def get_video_service() -> TextToVideoService:
+    """Get the TextToVideoService for this process, creating it on first use."""
+    global _video_service
+    if _video_service is None:
+        _video_service = TextToVideoService()
+    return _video_service
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """
+    Set up per-process singletons after the prefork pool forks a child.
+    
+    Connections inherited from the parent must not be shared, so the
+    engine pool and provider clients are recreated in the child and then
+    reused for the lifetime of the process.
+    """
+    global _video_service
+    
+    app = get_flask_app()
+    with app.app_context():
+        db.engine.dispose(close=False)
+        
+        reset_http_clients()
+        AIProviderService.reset_clients()
+        _video_service = None
+        get_video_service()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Kill FFmpeg children of the exiting pool process (atexit does not run there)."""
+    killed = kill_running_jobs()
+    if killed:
+        logger.warning('Killed %d running FFmpeg job(s) on worker shutdown', killed)
+
+
+@before_task_publish.connect
+def stamp_enqueued_at(headers=None, **kwargs):
+    """Stamp when the task becomes runnable (publish time, or its ETA when delayed)."""
+    if headers is None:
+        return
+    
+    eta = headers.get('eta')
+    headers['enqueued_at'] = max(time.time(), datetime.fromisoformat(eta).timestamp()) if eta else time.time()
+
+
+@task_prerun.connect
+def measure_queue_wait(task=None, **kwargs):
+    """
+    Record how long the task waited in its queue.
+    
+    First runs of fair-share dispatched tasks count from batch submission
+    (``submitted_at``), so time spent in the per-user backlog is included.
+    """
+    request = task.request
+    queue = (request.delivery_info or {}).get('routing_key')
+    started_from = (not request.retries and request.get('submitted_at')) or request.get('enqueued_at')
+    
+    if started_from and queue and not request.is_eager:
+        record_queue_wait(queue, time.time() - started_from)
+
+
+def _same_queue(task) -> Dict[str, str]:
+    """Options that re-enqueue on the queue the running task came from."""
+    queue = (task.request.delivery_info or {}).get('routing_key')
+    return {'queue': queue} if queue else {}
+
+
+def _poll_countdown(attempt: int, fallback: bool = False) -> int:
+    """
+    Seconds to wait before the next status check.
+    
+    Uses exponential backoff, or the slow fallback interval when the
+    provider reports completion through a webhook.
+    """
+    config = current_app.config
+    if fallback:
+        return config['VIDEO_WEBHOOK_FALLBACK_INTERVAL']
+    
+    interval = config['VIDEO_POLL_INTERVAL'] * config['VIDEO_POLL_BACKOFF'] ** attempt
+    return int(min(interval, config['VIDEO_POLL_MAX_INTERVAL']))
+
+
+def _flush_poll_state(task_record: GenerationTask, state: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Copy poll state kept in Redis onto the task row at a state transition
+    (caller commits).
+    
+    Args:
+        task_record: Task row
+        state: Progress hash, if already loaded
+    """
+    if state is None:
+        state = ProgressTracker().get(task_record.video_id)
+    
+    if state.get('progress') is not None:
+        task_record.progress = state['progress']
+    if state.get('poll_attempts'):
+        task_record.poll_attempts = state['poll_attempts']
+    if state.get('last_polled_at'):
+        task_record.last_polled_at = datetime.fromisoformat(state['last_polled_at'])
+
+
+def _mark_completed(video: Video, task_record: GenerationTask, video_url: str) -> None:
+    """Mark video and its task record as completed (caller commits)."""
+    video.video_url = video_url
+    video.status = VideoStatus.COMPLETED.value
+    
+    if task_record:
+        task_record.status = 'completed'
+        task_record.progress = 100
+        task_record.finished_at = datetime.utcnow()
+
+
+def _mark_failed(video: Video, task_record: GenerationTask, error: str) -> None:
+    """Mark video and its task record as failed (caller commits)."""
+    video.status = VideoStatus.FAILED.value
+    video.error_message = error or 'Generation failed'
+    
+    if task_record:
+        task_record.status = 'failed'
+        task_record.error_message = error
+        task_record.finished_at = datetime.utcnow()
+
+
+def _result_cache_enabled(video: Video) -> bool:
+    """Whether the result cache applies to this video (global switch + user opt-out)."""
+    return bool(current_app.config['VIDEO_CACHE_ENABLED']) and video.user.video_cache_enabled is not False
+
+
+@contextmanager
+def _pipeline_stage(name: str, video_id: int):
+    """
+    Unit of work for one pipeline stage transition.
+    
+    Field updates made inside the block are committed together on exit, so
+    each externally visible state is written (and published) once and in
+    order. On error nothing of the stage is persisted.
+    
+    Args:
+        name: Stage name (for logging)
+        video_id: Video ID
+    """
+    try:
+        yield
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    logger.debug('Video %s: %s', video_id, name)
+
+
+def _start_pipeline(video: Video, task_record: GenerationTask) -> None:
+    """
+    Start the narration branch of the generation DAG.
+    
+    The media branch (provider prediction) runs in ``generate_video_task``;
+    script -> voice and SEO run alongside it as a Celery canvas. Both
+    branches count down ``pending_branches`` and the last one to finish
+    enqueues ``finalize_video_task`` (audio merge + thumbnail), so the
+    counter must be committed before this is called.
+    """
+    chain(
+        generate_script_task.si(video.id, task_record.id),
+        group(
+            chain(generate_voice_task.si(video.id), join_pipeline_branch.si(task_record.id)),
+            generate_seo_task.si(video.id)
+        )
+    ).apply_async()
+
+
+def _join_branch(task_record_id: int) -> int:
+    """
+    Count down a finished pipeline branch and finalize after the last one.
+    
+    Returns:
+        Number of branches still running
+    """
+    remaining = db.session.execute(
+        update(GenerationTask)
+        .where(GenerationTask.id == task_record_id, GenerationTask.pending_branches > 0)
+        .values(pending_branches=GenerationTask.pending_branches - 1)
+        .returning(GenerationTask.pending_branches)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.session.commit()
+    
+    if remaining == 0:
+        finalize_video_task.delay(task_record_id)
+    elif remaining:
+        # Don't wait forever on a branch whose task crashed or was lost
+        watch_pipeline_join.apply_async((task_record_id,), countdown=current_app.config['VIDEO_JOIN_TIMEOUT'])
+    
+    return remaining or 0
+
+
+def _media_ready(video: Video, task_record: GenerationTask, video_url: str) -> bool:
+    """
+    Record the provider output (caller commits).
+    
+    Videos running as a pipeline wait for the join step; others are
+    completed directly.
+    
+    Returns:
+        True if the media branch still has to be joined
+    """
+    if task_record and task_record.pending_branches is not None:
+        video.video_url = video_url
+        task_record.status = 'finalizing'
+        task_record.progress = 90
+        return True
+    
+    _mark_completed(video, task_record, video_url)
+    return False
+
+
+def _resume_prediction(task, video: Video, task_record: GenerationTask) -> Optional[Dict[str, Any]]:
+    """
+    Resume from a prediction submitted by an earlier attempt.
+    
+    Returns:
+        Task result if the prediction is still usable, or None if it failed
+        and a new one has to be submitted
+        
+    Raises:
+        Retry: If the provider could not be reached; the checkpoint is kept
+    """
+    provider_task_id = task_record.provider_task_id
+    result = get_video_service().check_status(provider_task_id)
+    status = result.get('status')
+    
+    if status == 'unknown':
+        # Transient provider error - never pay for a second prediction on a guess
+        raise task.retry(countdown=_poll_countdown(0))
+    
+    if status == 'failed':
+        task_record.provider_task_id = None
+        task_record.submitted_at = None
+        task_record.idempotency_key = None
+        db.session.commit()
+        return None
+    
+    if status == 'succeeded':
+        apply_provider_results([result])
+    elif current_app.config['VIDEO_STATUS_POLLER'] == 'task':
+        poll_video_status.apply_async(
+            (video.id, provider_task_id, task.request.id),
+            countdown=_poll_countdown(0)
+        )
+    
+    return {
+        'video_id': video.id,
+        'status': video.status,
+        'task_id': provider_task_id,
+        'resumed': True
+    }
+
+
+@contextmanager
+def _coalesced_ingest(video: Video, task_record: GenerationTask):
+    """
+    Download a coalesced prediction's output once for all attached videos.
+    
+    Videos sharing a ``provider_task_id`` ingest one at a time under a Redis
+    lock. The first downloads; the others hard-link its archived source into
+    their own directory, which ``ingest_output`` then processes from disk.
+    Lock errors fall back to downloading independently.
+    """
+    if not task_record.provider_task_id or not current_app.config['VIDEO_COALESCE_ENABLED']:
+        yield
+        return
+    
+    lock = get_redis().lock(
+        f'ingest:{task_record.provider_task_id}',
+        timeout=INGEST_LOCK_TIMEOUT,
+        blocking_timeout=INGEST_LOCK_TIMEOUT
+    )
+    try:
+        locked = lock.acquire()
+    except redis.RedisError as e:
+        logger.warning('Ingest lock for video %s failed: %s', video.id, e)
+        locked = False
+    
+    try:
+        siblings = GenerationTask.query.filter(
+            GenerationTask.provider_task_id == task_record.provider_task_id,
+            GenerationTask.id != task_record.id,
+            GenerationTask.downloaded_at.isnot(None)
+        ).order_by(GenerationTask.downloaded_at).all()
+        
+        source = next((s.output_path for s in siblings if s.output_path and os.path.exists(s.output_path)), None)
+        if source:
+            service = get_video_service()
+            VideoResultCache.link(source, os.path.join(service.video_dir(video.id), 'source.mp4'))
+        
+        yield
+    finally:
+        if locked:
+            try:
+                lock.release()
+            except redis.RedisError:
+                pass
+
+
+def _coalescing_enabled(video: Video) -> bool:
+    """Whether identical in-flight requests may share this video's prediction."""
+    return bool(current_app.config['VIDEO_COALESCE_ENABLED']) and video.user.video_cache_enabled is not False
+
+
+def _attach_or_wait(task, video: Video, task_record: GenerationTask, claim: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Follow an identical in-flight prediction instead of submitting a new one.
+    
+    If the owning request is still submitting, the task is re-enqueued under
+    the same Celery task ID and claims again shortly.
+    """
+    provider_task_id = claim.get('provider_task_id')
+    
+    if not provider_task_id:
+        task.apply_async((video.id,), task_id=task.request.id, countdown=2, **_same_queue(task))
+        return {
+            'video_id': video.id,
+            'status': 'waiting'
+        }
+    
+    video.enhanced_prompt = PromptEngine.prepare_prompt(video.prompt, video.style)['enhanced']
+    if task_record:
+        task_record.provider = claim.get('provider')
+        task_record.provider_task_id = provider_task_id
+    db.session.commit()
+    
+    # The owner's status checks complete this row too; ours is only a fallback
+    if current_app.config['VIDEO_STATUS_POLLER'] == 'task':
+        poll_video_status.apply_async(
+            (video.id, provider_task_id, task.request.id),
+            {'fallback': True},
+            countdown=_poll_countdown(0, fallback=True)
+        )
+    
+    return {
+        'video_id': video.id,
+        'status': 'processing',
+        'task_id': provider_task_id,
+        'coalesced': True
+    }
+
+
+def apply_provider_results(results: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """
+    Write finished provider results back to the database in one transaction.
+    
+    Args:
+        results: Status results as returned by ``check_status``
+        
+    Returns:
+        Dictionary with completed and failed video IDs
+    """
+    finished = {
+        r['task_id']: r for r in results
+        if r.get('task_id') and r.get('status') in ('succeeded', 'failed')
+    }
+    applied = {'completed': [], 'failed': []}
+    if not finished:
+        return applied
+    
+    records = GenerationTask.query.options(
+        selectinload(GenerationTask.video)
+    ).filter(
+        GenerationTask.provider_task_id.in_(list(finished))
+    ).all()
+    
+    poll_states = ProgressTracker().get_many(
+        task_record.video_id for task_record in records
+        if current_app.config['VIDEO_STATUS_POLLER'] == 'task'
+    )
+    
+    joins = []
+    for task_record in records:
+        video = task_record.video
+        if video.status != VideoStatus.PROCESSING.value or task_record.status not in ('pending', 'processing'):
+            # Finished, superseded by a retry, or already waiting on the join
+            continue
+        
+        _flush_poll_state(task_record, poll_states.get(video.id, {}))
+        result = finished[task_record.provider_task_id]
+        if result['status'] == 'succeeded':
+            if _media_ready(video, task_record, result.get('video_url')):
+                joins.append(task_record.id)
+            applied['completed'].append(video.id)
+        else:
+            _mark_failed(video, task_record, result.get('error'))
+            applied['failed'].append(video.id)
+    
+    db.session.commit()
+    
+    # Let new identical requests submit again once a prediction has finished
+    released = set()
+    for task_record in records:
+        key = (task_record.fingerprint, task_record.provider_task_id)
+        if current_app.config['VIDEO_COALESCE_ENABLED'] and task_record.fingerprint and key not in released:
+            InFlightRegistry().release(
+                task_record.fingerprint,
+                task_record.provider,
+                task_record.provider_task_id
+            )
+            released.add(key)
+    
+    for task_record_id in joins:
+        _join_branch(task_record_id)
+    
+    # Generate SEO outside of the status-checking path (results are cached once ingested)
+    for task_record in records:
+        video = task_record.video
+        if video.id not in applied['completed']:
+            continue
+        
+        if task_record.pending_branches is None and not video.seo_title:
+            generate_seo_task.delay(video.id)
+    
+    return applied
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -41,14 +519,20 @@ def generate_video_task(self, video_id: int):
     """
     Main video generation task.
     
+    Runs the media branch of the pipeline DAG; the narration branch
+    (script -> voice, plus SEO) runs in parallel and both are joined
+    for audio merge and thumbnail extraction.
+    
     Flow:
-    1. Enhance prompt
-    2. Generate script if needed
+    1. Start the narration branch (script -> voice, SEO) in parallel
+    2. Enhance prompt
     3. Start video generation
-    4. Poll for completion
-    5. Post-process
-    6. Generate SEO
-    7. Update database
+    4. Schedule non-blocking status polling
+    5. Join branches, post-process and update database
+    
+    Database writes are grouped per stage (``started``, ``submitted``)
+    instead of committed field by field; the only other commit persists a
+    replacement idempotency key before a resubmission.
     """
     app = get_flask_app()
     
@@ -57,77 +541,160 @@ def generate_video_task(self, video_id: int):
         if not video:
             return {'error': 'Video not found'}
         
-        # Update task record
         task_record = GenerationTask.query.filter_by(
             video_id=video_id,
             celery_task_id=self.request.id
         ).first()
         
-        if task_record:
-            task_record.status = 'processing'
-            task_record.started_at = datetime.utcnow()
-            db.session.commit()
-        
         try:
-            # Update video status
-            video.status = VideoStatus.PROCESSING.value
-            db.session.commit()
-            
             # Initialize service
-            service = TextToVideoService()
-            
-            # Generate script if not provided
-            if not video.script:
-                video.script = service.generate_script(
-                    video.prompt,
-                    video.style,
-                    video.duration
-                )
-                db.session.commit()
+            service = get_video_service()
             
-            # Start video generation
-            result = service.create_video(
-                prompt=video.prompt,
-                style=video.style,
-                duration=video.duration,
-                resolution=video.resolution,
-                script=video.script
+            fingerprint = service.fingerprint(
+                video.prompt,
+                video.style,
+                video.duration,
+                video.resolution
             )
             
-            if result.get('error'):
-                raise Exception(result['error'])
+            # Started: task and video status, branch counter, fingerprint and
+            # submission key in one commit, before any work leaves this task
+            start_pipeline = False
+            with _pipeline_stage('started', video_id):
+                video.status = VideoStatus.PROCESSING.value
+                
+                if task_record:
+                    task_record.status = 'processing'
+                    task_record.started_at = datetime.utcnow()
+                    task_record.fingerprint = fingerprint
+                    if not task_record.idempotency_key:
+                        task_record.idempotency_key = uuid.uuid4().hex
+                    
+                    # Narration runs alongside the provider prediction (once per task row)
+                    if task_record.pending_branches is None:
+                        task_record.pending_branches = 2
+                        start_pipeline = True
             
-            # Save enhanced prompt
-            video.enhanced_prompt = result.get('enhanced_prompt')
-            db.session.commit()
+            if start_pipeline:
+                _start_pipeline(video, task_record)
+            elif not task_record and not video.script:
+                # No task row to join on - generate the script up front
+                with _pipeline_stage('script', video_id):
+                    video.script = service.generate_script(
+                        video.prompt,
+                        video.style,
+                        video.duration
+                    )
             
-            # Update task with provider info
             if task_record:
-                task_record.provider = result.get('provider')
-                task_record.provider_task_id = result.get('task_id')
-                db.session.commit()
+                # Resume a prediction submitted before a retry or worker crash
+                if task_record.provider_task_id and task_record.provider != 'cache':
+                    resumed = _resume_prediction(self, video, task_record)
+                    if resumed:
+                        return resumed
+            
+            # Reuse a stored result for an identical request
+            if _result_cache_enabled(video):
+                cache = VideoResultCache.from_config(current_app.config)
+                entry = cache.lookup(fingerprint)
+                
+                if entry:
+                    filename = 'source.mp4'
+                    cache.materialize(entry, os.path.join(service.video_dir(video.id), filename))
+                    
+                    video.enhanced_prompt = PromptEngine.prepare_prompt(video.prompt, video.style)['enhanced']
+                    if task_record:
+                        task_record.provider = 'cache'
+                    joined = _media_ready(video, task_record, service.media_url(video.id, filename))
+                    db.session.commit()
+                    
+                    if joined:
+                        _join_branch(task_record.id)
+                    elif not video.seo_title:
+                        generate_seo_task.delay(video_id)
+                    
+                    return {
+                        'video_id': video_id,
+                        'status': video.status,
+                        'cached': True
+                    }
+            
+            # Attach to an identical prediction already in flight
+            registry = None
+            if _coalescing_enabled(video):
+                config = current_app.config
+                registry = InFlightRegistry(
+                    claim_ttl=config['VIDEO_COALESCE_CLAIM_TTL'],
+                    inflight_ttl=config['VIDEO_POLL_TIMEOUT']
+                )
+                claim = registry.claim(fingerprint, self.request.id)
+                
+                if not claim['owner']:
+                    return _attach_or_wait(self, video, task_record, claim)
+            
+            # Persist the submission key first so a retry never pays twice
+            # (already done when starting, unless a failed resume cleared it)
+            idempotency_key = None
+            if task_record:
+                if not task_record.idempotency_key:
+                    task_record.idempotency_key = uuid.uuid4().hex
+                    db.session.commit()
+                idempotency_key = task_record.idempotency_key
+            
+            # Start video generation
+            try:
+                result = service.create_video(
+                    prompt=video.prompt,
+                    style=video.style,
+                    duration=video.duration,
+                    resolution=video.resolution,
+                    script=video.script,
+                    with_script=False,
+                    idempotency_key=idempotency_key
+                )
+                
+                if result.get('error'):
+                    raise Exception(result['error'])
+            except Exception:
+                if registry:
+                    registry.release(fingerprint, owner_id=self.request.id)
+                raise
+            
+            # Submitted: enhanced prompt and provider info in one commit
+            with _pipeline_stage('submitted', video_id):
+                video.enhanced_prompt = result.get('enhanced_prompt')
+                
+                if task_record:
+                    task_record.provider = result.get('provider')
+                    task_record.provider_task_id = result.get('task_id')
+                    task_record.submitted_at = datetime.utcnow()
             
-            # Poll for completion
             provider_task_id = result.get('task_id')
-            if provider_task_id:
-                poll_video_status.delay(video_id, provider_task_id, self.request.id)
+            if registry and provider_task_id:
+                registry.publish(fingerprint, result.get('provider'), provider_task_id)
+            
+            # Schedule first status check (re-schedules itself until done).
+            # In 'service' mode the centralized StatusPoller picks it up instead;
+            # with webhooks enabled the check only runs as a slow fallback sweep.
+            if provider_task_id and current_app.config['VIDEO_STATUS_POLLER'] == 'task':
+                webhook = bool(result.get('webhook'))
+                poll_video_status.apply_async(
+                    (video_id, provider_task_id, self.request.id),
+                    {'fallback': webhook},
+                    countdown=_poll_countdown(0, fallback=webhook)
+                )
             
             return {
                 'video_id': video_id,
                 'status': 'processing',
                 'task_id': provider_task_id
             }
-            
+        
+        except Retry:
+            raise
         except Exception as e:
             # Handle failure
-            video.status = VideoStatus.FAILED.value
-            video.error_message = str(e)
-            
-            if task_record:
-                task_record.status = 'failed'
-                task_record.error_message = str(e)
-                task_record.finished_at = datetime.utcnow()
-            
+            _mark_failed(video, task_record, str(e))
             db.session.commit()
             
             # Retry if applicable
@@ -142,11 +709,26 @@ def generate_video_task(self, video_id: int):
 
 
 @celery_app.task(bind=True)
-def poll_video_status(self, video_id: int, provider_task_id: str, original_task_id: str):
+def poll_video_status(
+    self,
+    video_id: int,
+    provider_task_id: str,
+    original_task_id: str,
+    attempt: int = 0,
+    fallback: bool = False
+):
     """
-    Poll provider for video generation status.
+    Check provider status once and reschedule if still running.
+    
+    Each run holds a worker slot only for a single ``check_status`` call.
+    While the prediction is in progress the task re-enqueues itself with
+    ``apply_async(countdown=...)`` using exponential backoff. Poll state
+    (attempt count, last poll time, progress) lives in the Redis progress
+    hash and is written to the GenerationTask row only when the status
+    changes, so in-progress polls do not write to the database.
     
-    Polls every 10 seconds until complete or failed.
+    With ``fallback`` set the prediction reports completion via webhook and
+    this task only sweeps at ``VIDEO_WEBHOOK_FALLBACK_INTERVAL``.
     """
     app = get_flask_app()
     
@@ -155,83 +737,369 @@ def poll_video_status(self, video_id: int, provider_task_id: str, original_task_
         if not video:
             return {'error': 'Video not found'}
         
-        service = TextToVideoService()
-        max_polls = 60  # Max 10 minutes of polling
-        poll_interval = 10  # seconds
+        if video.status != VideoStatus.PROCESSING.value:
+            # Already finalized (or reset by a retry) - nothing left to poll
+            return {'video_id': video_id, 'status': video.status}
+        
+        tracker = ProgressTracker()
+        state = tracker.get(video_id)
+        
+        # The task row is only loaded when the progress hash is missing or on a transition
+        def load_task_record():
+            return GenerationTask.query.filter_by(celery_task_id=original_task_id).first()
+        
+        task_record = None
+        if 'task_status' not in state:
+            task_record = load_task_record()
+            if task_record:
+                state['task_status'] = task_record.status
+                if task_record.started_at:
+                    state['started_at'] = task_record.started_at.isoformat()
+        
+        if state.get('task_status') == 'finalizing':
+            # Prediction already delivered - the pipeline join takes over
+            return {'video_id': video_id, 'status': 'finalizing'}
         
-        for i in range(max_polls):
-            result = service.check_status(provider_task_id)
-            status = result.get('status')
+        service = get_video_service()
+        result = service.check_status(provider_task_id)
+        status = result.get('status')
+        
+        if status in ('succeeded', 'failed'):
+            applied = apply_provider_results([result])
             
-            if status == 'succeeded':
-                # Video is ready
-                video.video_url = result.get('video_url')
-                video.status = VideoStatus.COMPLETED.value
-                
-                # Generate SEO if not present
-                if not video.seo_title:
-                    seo = service.generate_seo(video.prompt, video.script)
-                    video.seo_title = seo.get('title')
-                    video.seo_description = seo.get('description')
-                    video.seo_tags = seo.get('tags', [])
-                
-                # Update task record
-                task_record = GenerationTask.query.filter_by(
-                    celery_task_id=original_task_id
-                ).first()
-                if task_record:
-                    task_record.status = 'completed'
-                    task_record.progress = 100
-                    task_record.finished_at = datetime.utcnow()
-                
+            if video_id not in applied['completed'] + applied['failed']:
+                # No task row carries this prediction ID - update the video directly
+                task_record = task_record or load_task_record()
+                if status == 'succeeded':
+                    _mark_completed(video, task_record, result.get('video_url'))
+                else:
+                    _mark_failed(video, task_record, result.get('error'))
                 db.session.commit()
                 
-                return {
-                    'video_id': video_id,
-                    'status': 'completed',
-                    'video_url': video.video_url
-                }
+                if status == 'succeeded' and not video.seo_title:
+                    generate_seo_task.delay(video_id)
             
-            elif status == 'failed':
-                video.status = VideoStatus.FAILED.value
-                video.error_message = result.get('error', 'Generation failed')
-                
-                task_record = GenerationTask.query.filter_by(
-                    celery_task_id=original_task_id
-                ).first()
-                if task_record:
-                    task_record.status = 'failed'
-                    task_record.error_message = result.get('error')
-                    task_record.finished_at = datetime.utcnow()
-                
-                db.session.commit()
-                
-                return {
-                    'video_id': video_id,
-                    'status': 'failed',
-                    'error': result.get('error')
-                }
+            return {
+                'video_id': video_id,
+                'status': video.status,
+                'video_url': video.video_url,
+                'error': result.get('error')
+            }
+        
+        # Still processing - record poll state in Redis and reschedule
+        timeout = current_app.config['VIDEO_POLL_TIMEOUT']
+        started_at = datetime.fromisoformat(state['started_at']) if state.get('started_at') else video.created_at
+        elapsed = (datetime.utcnow() - started_at).total_seconds()
+        
+        if elapsed >= timeout:
+            task_record = task_record or load_task_record()
+            if task_record:
+                _flush_poll_state(task_record, state)
+            _mark_failed(video, task_record, 'Generation timed out')
+            db.session.commit()
             
-            else:
-                # Still processing - update progress estimate
-                task_record = GenerationTask.query.filter_by(
-                    celery_task_id=original_task_id
-                ).first()
-                if task_record:
-                    task_record.progress = min(90, (i + 1) * 100 // max_polls)
-                    db.session.commit()
+            return {
+                'video_id': video_id,
+                'status': 'failed',
+                'error': 'Generation timed out'
+            }
+        
+        attempt = max(attempt, state.get('poll_attempts', 0)) + 1
+        tracker.update(video_id, {
+            'poll_attempts': attempt,
+            'last_polled_at': datetime.utcnow().isoformat(),
+            'progress': min(90, int(elapsed * 100 // timeout))
+        }, user_id=video.user_id)
+        
+        countdown = _poll_countdown(attempt, fallback=fallback)
+        poll_video_status.apply_async(
+            (video_id, provider_task_id, original_task_id),
+            {'attempt': attempt, 'fallback': fallback},
+            countdown=countdown
+        )
+        
+        return {
+            'video_id': video_id,
+            'status': 'processing',
+            'next_poll_in': countdown
+        }
+
+
+@celery_app.task
+def generate_script_task(video_id: int, task_record_id: int = None):
+    """
+    Pipeline branch: generate the script if not provided.
+    
+    Failures are logged rather than raised so the rest of the narration
+    branch (and the pipeline join) still runs.
+    """
+    app = get_flask_app()
+    
+    with app.app_context():
+        video = Video.query.get(video_id)
+        if not video:
+            return {'error': 'Video not found'}
+        
+        if not video.script:
+            try:
+                video.script = get_video_service().generate_script(
+                    video.prompt,
+                    video.style,
+                    video.duration
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning('Script generation failed for video %s: %s', video_id, e)
+        
+        task_record = GenerationTask.query.get(task_record_id) if task_record_id else None
+        if task_record and video.script and not task_record.script_done_at:
+            task_record.script_done_at = datetime.utcnow()
+            db.session.commit()
+        
+        return {'video_id': video_id, 'script': bool(video.script)}
+
+
+@celery_app.task
+def generate_voice_task(video_id: int):
+    """Pipeline branch: narrate the script when a voice is selected."""
+    app = get_flask_app()
+    
+    with app.app_context():
+        video = Video.query.get(video_id)
+        if not video:
+            return {'error': 'Video not found'}
+        
+        if not video.voice_id or not video.script or video.audio_url:
+            return {'video_id': video_id, 'audio_url': video.audio_url}
+        
+        service = get_video_service()
+        try:
+            audio_path = service.generate_audio(video.script, video.voice_id, video_id)
+            if audio_path:
+                audio_path = service.save_audio(video_id, audio_path)
+                video.audio_url = service.media_url(video_id, os.path.basename(audio_path))
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning('Voice generation failed for video %s: %s', video_id, e)
+        
+        return {'video_id': video_id, 'audio_url': video.audio_url}
+
+
+@celery_app.task
+def generate_seo_task(video_id: int):
+    """Generate SEO metadata for a video if not already present."""
+    app = get_flask_app()
+    
+    with app.app_context():
+        video = Video.query.get(video_id)
+        if not video:
+            return {'error': 'Video not found'}
+        
+        if video.seo_title:
+            return {'video_id': video_id, 'seo_title': video.seo_title}
+        
+        service = get_video_service()
+        seo = service.generate_seo(video.prompt, video.script)
+        video.seo_title = seo.get('title')
+        video.seo_description = seo.get('description')
+        video.seo_tags = seo.get('tags', [])
+        db.session.commit()
+        
+        return {'video_id': video_id, 'seo_title': video.seo_title}
+
+
+@celery_app.task
+def join_pipeline_branch(task_record_id: int):
+    """Count down a finished pipeline branch (finalizes after the last one)."""
+    app = get_flask_app()
+    
+    with app.app_context():
+        return {'pending_branches': _join_branch(task_record_id)}
+
+
+@celery_app.task
+def watch_pipeline_join(task_record_id: int):
+    """
+    Finalize a video whose narration branch never joined.
+    
+    Scheduled ``VIDEO_JOIN_TIMEOUT`` seconds after a branch joins while
+    another is still running. If the provider output is in (``finalizing``)
+    and the join is still open that long after submission, the missing
+    branch is given up on and the video is finalized without it.
+    """
+    app = get_flask_app()
+    
+    with app.app_context():
+        task_record = GenerationTask.query.get(task_record_id)
+        if not task_record or task_record.status != 'finalizing' or not task_record.pending_branches:
+            return {'forced': False}
+        
+        submitted_at = task_record.submitted_at or task_record.started_at or task_record.created_at
+        if (datetime.utcnow() - submitted_at).total_seconds() < current_app.config['VIDEO_JOIN_TIMEOUT']:
+            return {'forced': False}
+        
+        forced = db.session.execute(
+            update(GenerationTask)
+            .where(
+                GenerationTask.id == task_record_id,
+                GenerationTask.status == 'finalizing',
+                GenerationTask.pending_branches > 0
+            )
+            .values(pending_branches=0)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        
+        if forced:
+            logger.warning('Pipeline join timed out for video %s; finalizing without narration', task_record.video_id)
+            finalize_video_task.delay(task_record_id)
+        
+        return {'forced': bool(forced)}
+
+
+@celery_app.task
+def finalize_video_task(task_record_id: int):
+    """
+    Pipeline join: merge narration into the provider output and extract
+    a thumbnail, then complete the video.
+    
+    Post-processing failures are logged and the raw provider output is
+    delivered instead.
+    """
+    app = get_flask_app()
+    
+    with app.app_context():
+        task_record = GenerationTask.query.get(task_record_id)
+        if not task_record:
+            return {'error': 'Task not found'}
+        
+        video = task_record.video
+        if video.status != VideoStatus.PROCESSING.value:
+            return {'video_id': video.id, 'status': video.status}
+        
+        service = get_video_service()
+        video_url = video.video_url
+        # Deleting the video cancels its FFmpeg jobs
+        with cancel_scope(video.id):
+            try:
+                # Each stage is checkpointed and skipped when resuming
+                downloaded = task_record.downloaded_at and os.path.exists(task_record.output_path or '')
                 
-                time.sleep(poll_interval)
+                if task_record.post_processed_at and downloaded:
+                    video_url = service.media_url(video.id, 'video.mp4')
+                else:
+                    if downloaded:
+                        outputs = service.finalize_outputs(video.id, task_record.output_path, video.resolution)
+                    else:
+                        with _coalesced_ingest(video, task_record):
+                            # Download streamed through FFmpeg (archive + processed copy in one pass)
+                            outputs = service.ingest_output(video.id, video.video_url, video.resolution)
+                            task_record.output_path = outputs['source_path']
+                            task_record.downloaded_at = datetime.utcnow()
+                            # Visible to coalesced videos waiting on the lock
+                            db.session.commit()
+                    
+                    video_url = outputs['video_url']
+                    video.thumbnail_url = outputs['thumbnail_url']
+                    task_record.post_processed_at = datetime.utcnow()
+            except Exception as e:
+                logger.warning('Post-processing failed for video %s: %s', video.id, e)
         
-        # Timeout
-        video.status = VideoStatus.FAILED.value
-        video.error_message = 'Generation timed out'
+        _mark_completed(video, task_record, video_url)
         db.session.commit()
         
+        # Cache the archived download; cache hits are already stored
+        cacheable = task_record.fingerprint and task_record.provider != 'cache' and _result_cache_enabled(video)
+        if cacheable and task_record.downloaded_at:
+            cache_video_result.delay(task_record.id)
+        
+        if task_record.post_processed_at:
+            generate_storyboard_task.delay(video.id)
+            if current_app.config['HLS_ENABLED']:
+                package_hls_task.delay(video.id)
+        
         return {
-            'video_id': video_id,
-            'status': 'failed',
-            'error': 'Generation timed out'
+            'video_id': video.id,
+            'status': video.status,
+            'video_url': video.video_url
+        }
+
+
+@celery_app.task
+def generate_storyboard_task(video_id: int):
+    """Build the scrub-preview sprite sheet and WebVTT index for a finished video."""
+    app = get_flask_app()
+    
+    with app.app_context():
+        video = Video.query.get(video_id)
+        if not video:
+            return {'error': 'Video not found'}
+        
+        service = get_video_service()
+        video_path = os.path.join(service.video_dir(video_id), 'video.mp4')
+        if not os.path.exists(video_path):
+            return {'error': 'No local output'}
+        
+        with cancel_scope(video_id):
+            storyboard = service.generate_storyboard(video_id, video_path)
+        video.storyboard_url = storyboard['storyboard_url']
+        db.session.commit()
+        
+        return {'video_id': video_id, 'storyboard_url': video.storyboard_url}
+
+
+@celery_app.task
+def package_hls_task(video_id: int):
+    """Package a finished video as an HLS adaptive bitrate ladder."""
+    app = get_flask_app()
+    
+    with app.app_context():
+        video = Video.query.get(video_id)
+        if not video:
+            return {'error': 'Video not found'}
+        
+        service = get_video_service()
+        video_path = os.path.join(service.video_dir(video_id), 'video.mp4')
+        if not os.path.exists(video_path):
+            return {'error': 'No local output'}
+        
+        with cancel_scope(video_id):
+            packaged = service.package_hls(video_id, video_path)
+        video.hls_url = packaged['hls_url']
+        db.session.commit()
+        
+        return {'video_id': video_id, 'hls_url': video.hls_url, 'renditions': packaged['renditions']}
+
+
+@celery_app.task
+def cache_video_result(task_record_id: int):
+    """
+    Store a finished generation in the result cache and enforce its budget.
+    
+    Queued by ``finalize_video_task`` once the provider output has been
+    archived as ``source.mp4``, which the cache links instead of downloading.
+    """
+    app = get_flask_app()
+    
+    with app.app_context():
+        task_record = GenerationTask.query.get(task_record_id)
+        if not task_record or not task_record.fingerprint:
+            return {'error': 'Task not found'}
+        
+        source_path = task_record.output_path
+        if not source_path or not os.path.exists(source_path):
+            return {'error': 'No local output to cache'}
+        
+        cache = VideoResultCache.from_config(current_app.config)
+        entry = cache.store(task_record.fingerprint, source_path, task_record.provider)
+        evicted = cache.evict()
+        
+        return {
+            'fingerprint': entry.fingerprint,
+            'size_bytes': entry.size_bytes,
+            'evicted': evicted
         }
 
 
@@ -255,4 +1123,7 @@ def cleanup_old_videos():
         
         db.session.commit()
         
-        return {'deleted': len(old_failed)}
+        # Expire and trim the result cache
+        evicted = VideoResultCache.from_config(current_app.config).evict()
+        
+        return {'deleted': len(old_failed), 'cache_evicted': evicted}
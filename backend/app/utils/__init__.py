@@ -3,5 +3,6 @@ Utility Functions
 """
 from app.utils.validators import validate_email, validate_password
 from app.utils.ffmpeg_utils import FFmpegProcessor
+from app.utils.webhooks import sign_webhook, verify_webhook
 
-__all__ = ['validate_email', 'validate_password', 'FFmpegProcessor']
+__all__ = ['validate_email', 'validate_password', 'FFmpegProcessor', 'sign_webhook', 'verify_webhook']
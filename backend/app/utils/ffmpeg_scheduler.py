@@ -0,0 +1,368 @@
+"""
+FFmpeg Job Scheduler
+
+Bounds how many FFmpeg processes run at once on a host, orders waiting
+jobs by priority class, records queue-wait metrics and cancels the jobs
+of deleted videos across processes.
+"""
+import os
+import time
+import fcntl
+import heapq
+import atexit
+import signal
+import logging
+import tempfile
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+import redis
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Priority classes (lower runs first)
+PRIORITY_HIGH = 0    # thumbnails
+PRIORITY_NORMAL = 1  # stream copy, audio merge
+PRIORITY_LOW = 2     # full re-encodes
+
+PRIORITY_NAMES = {
+    PRIORITY_HIGH: 'high',
+    PRIORITY_NORMAL: 'normal',
+    PRIORITY_LOW: 'low',
+}
+
+# Cancellation flags set by the API (e.g. on delete), polled by running jobs
+CANCEL_KEY = 'ffmpeg:cancel:{}'
+CANCEL_TTL = 3600  # seconds
+CANCEL_CHECK_SECONDS = 1.0
+
+_current_tag: ContextVar[Optional[str]] = ContextVar('ffmpeg_tag', default=None)
+
+
+class FFmpegCancelled(Exception):
+    """Raised when a job is cancelled while waiting for a slot."""
+
+
+def request_cancel(tag) -> None:
+    """
+    Ask every process to cancel FFmpeg jobs tagged ``tag`` (best effort).
+    
+    Args:
+        tag: Job tag, the video ID
+    """
+    try:
+        get_redis().set(CANCEL_KEY.format(tag), 1, ex=CANCEL_TTL)
+    except redis.RedisError as e:
+        logger.warning('FFmpeg cancel request for %s failed: %s', tag, e)
+
+
+def cancel_requested(tag) -> bool:
+    """Whether cancellation was requested for ``tag`` (False if Redis is unavailable)."""
+    if tag is None:
+        return False
+    try:
+        return bool(get_redis().exists(CANCEL_KEY.format(tag)))
+    except redis.RedisError as e:
+        logger.debug('FFmpeg cancel check failed: %s', e)
+        return False
+
+
+@contextmanager
+def cancel_scope(tag) -> Iterator[None]:
+    """Tag the FFmpeg jobs started in this block (and context) with ``tag``."""
+    token = _current_tag.set(str(tag))
+    try:
+        yield
+    finally:
+        _current_tag.reset(token)
+
+
+def current_tag() -> Optional[str]:
+    """Tag of the enclosing :func:`cancel_scope`, if any."""
+    return _current_tag.get()
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class FFmpegJob:
+    """A scheduled FFmpeg run; holds the child process so it can be killed."""
+    
+    def __init__(self, job_id: int, priority: int, tag: Optional[str] = None):
+        self.id = job_id
+        self.priority = priority
+        self.tag = tag
+        self.process = None
+        self.cancelled = False
+        self.queued_at = time.monotonic()
+        self.wait_seconds = 0.0
+        self._checked_at = 0.0
+    
+    @property
+    def popen_kwargs(self) -> dict:
+        """
+        Extra ``subprocess.Popen`` arguments for the child.
+        
+        The child leads its own process group (no ``preexec_fn``, which is
+        unsafe in a threaded parent), so :meth:`kill` can signal the group.
+        """
+        return {'start_new_session': True} if os.name == 'posix' else {}
+    
+    def attach(self, process) -> None:
+        """Register the running child process."""
+        self.process = process
+    
+    def cancel_requested(self) -> bool:
+        """
+        Check for a cancel request on the job's tag, killing the child if so.
+        
+        Redis is consulted at most every ``CANCEL_CHECK_SECONDS``.
+        """
+        if self.cancelled or self.tag is None:
+            return self.cancelled
+        
+        now = time.monotonic()
+        if now - self._checked_at < CANCEL_CHECK_SECONDS:
+            return False
+        self._checked_at = now
+        
+        if cancel_requested(self.tag):
+            self.cancelled = True
+            self.kill()
+        return self.cancelled
+    
+    def kill(self) -> None:
+        """Kill the child process (and its process group) if it is still running."""
+        if not self.process or self.process.poll() is not None:
+            return
+        
+        if os.name == 'posix':
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            self.process.kill()
+
+
+class FFmpegScheduler:
+    """
+    Host-wide FFmpeg slot scheduler.
+    
+    Slots are ``flock``-ed files under ``lock_dir`` so the limit holds
+    across Celery worker processes, and locks are released by the kernel
+    if a worker dies. ``reserved_slots`` are kept free for high-priority
+    jobs so thumbnails are not stuck behind a wave of re-encodes; within a
+    process, waiting jobs are served in priority order.
+    """
+    
+    METRICS_KEY = 'ffmpeg:metrics'
+    
+    def __init__(
+        self,
+        max_jobs: int,
+        threads_per_job: int,
+        lock_dir: str,
+        reserved_slots: int = 1
+    ):
+        self.max_jobs = max(1, max_jobs)
+        self.threads_per_job = max(1, threads_per_job)
+        self.lock_dir = lock_dir
+        self.reserved_slots = min(reserved_slots, self.max_jobs - 1)
+        
+        self._cond = threading.Condition()
+        self._waiting: List[tuple] = []
+        self._running: Dict[int, FFmpegJob] = {}
+        self._ids = itertools.count(1)
+        self._metrics = {
+            name: {'jobs': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        
+        os.makedirs(self.lock_dir, exist_ok=True)
+    
+    @classmethod
+    def from_env(cls) -> 'FFmpegScheduler':
+        """Build a scheduler sized from the available cores."""
+        threads = int(os.getenv('FFMPEG_THREADS', '2'))
+        max_jobs = int(os.getenv('FFMPEG_MAX_JOBS', '0')) or max(1, available_cores() // threads)
+        
+        return cls(
+            max_jobs=max_jobs,
+            threads_per_job=threads,
+            lock_dir=os.getenv('FFMPEG_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'ffmpeg-slots')),
+            reserved_slots=int(os.getenv('FFMPEG_RESERVED_SLOTS', '1'))
+        )
+    
+    def _slots_for(self, priority: int) -> range:
+        if priority == PRIORITY_HIGH:
+            return range(self.max_jobs)
+        return range(self.reserved_slots, self.max_jobs)
+    
+    def _try_acquire_slot(self, priority: int) -> Optional[int]:
+        """Lock a free host slot for this priority, returning its descriptor."""
+        for slot in self._slots_for(priority):
+            fd = os.open(os.path.join(self.lock_dir, f'slot-{slot}'), os.O_CREAT | os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+    
+    def _record_wait(self, job: FFmpegJob) -> None:
+        name = PRIORITY_NAMES[job.priority]
+        
+        with self._cond:
+            stats = self._metrics[name]
+            stats['jobs'] += 1
+            stats['wait_seconds'] += job.wait_seconds
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], job.wait_seconds)
+        
+        # Aggregate across worker processes (best effort)
+        try:
+            pipe = get_redis().pipeline()
+            pipe.hincrby(self.METRICS_KEY, f'{name}:jobs', 1)
+            pipe.hincrbyfloat(self.METRICS_KEY, f'{name}:wait_seconds', job.wait_seconds)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug('FFmpeg metrics update failed: %s', e)
+        
+        if job.wait_seconds >= 1:
+            logger.info('FFmpeg %s job waited %.1fs for a slot', name, job.wait_seconds)
+    
+    @contextmanager
+    def job(self, priority: int = PRIORITY_NORMAL, tag: Optional[str] = None) -> Iterator[FFmpegJob]:
+        """
+        Wait for a slot and hold it for the duration of the block.
+        
+        Args:
+            priority: Priority class (``PRIORITY_HIGH``/``NORMAL``/``LOW``)
+            tag: Cancellation tag (defaults to the enclosing :func:`cancel_scope`)
+            
+        Yields:
+            The job; attach the child process so it is killed with the block
+            
+        Raises:
+            FFmpegCancelled: If the tag is cancelled while waiting for a slot
+        """
+        job = FFmpegJob(next(self._ids), priority, tag or current_tag())
+        entry = (priority, job.id, job)
+        fd = None
+        
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while fd is None:
+                    if job.cancel_requested():
+                        raise FFmpegCancelled(f'FFmpeg job {job.tag} cancelled')
+                    
+                    # Only the highest-priority waiter in this process competes for a slot
+                    if self._waiting[0] is entry:
+                        fd = self._try_acquire_slot(priority)
+                    if fd is None:
+                        self._cond.wait(0.05)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+            
+            self._running[job.id] = job
+        
+        job.wait_seconds = time.monotonic() - job.queued_at
+        self._record_wait(job)
+        
+        try:
+            yield job
+        finally:
+            # Never leave a child running after an error or timeout
+            job.kill()
+            if job.process:
+                job.process.wait()
+            
+            with self._cond:
+                self._running.pop(job.id, None)
+                self._cond.notify_all()
+            
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+    
+    def kill_running(self) -> int:
+        """
+        Kill the children of all running jobs in this process.
+        
+        Children run in their own sessions and outlive the worker, so this
+        is called when the worker process exits.
+        
+        Returns:
+            Number of jobs whose child was signalled
+        """
+        with self._cond:
+            jobs = list(self._running.values())
+        
+        for job in jobs:
+            job.kill()
+        
+        return len(jobs)
+    
+    def metrics(self) -> dict:
+        """Slot usage and queue-wait metrics for this process."""
+        with self._cond:
+            classes = {name: dict(stats) for name, stats in self._metrics.items()}
+            running = len(self._running)
+            waiting = len(self._waiting)
+        
+        for stats in classes.values():
+            stats['avg_wait_seconds'] = round(stats['wait_seconds'] / stats['jobs'], 3) if stats['jobs'] else 0.0
+        
+        return {
+            'max_jobs': self.max_jobs,
+            'threads_per_job': self.threads_per_job,
+            'reserved_slots': self.reserved_slots,
+            'running': running,
+            'waiting': waiting,
+            'classes': classes
+        }
+
+
+def get_host_metrics() -> Dict[str, float]:
+    """Queue-wait totals aggregated across worker processes."""
+    try:
+        raw = get_redis().hgetall(FFmpegScheduler.METRICS_KEY)
+    except redis.RedisError as e:
+        logger.warning('FFmpeg metrics read failed: %s', e)
+        return {}
+    
+    return {key: float(value) for key, value in raw.items()}
+
+
+_scheduler: Optional[FFmpegScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_ffmpeg_scheduler() -> FFmpegScheduler:
+    """Get the FFmpeg scheduler for this process."""
+    global _scheduler
+    
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FFmpegScheduler.from_env()
+        return _scheduler
+
+
+@atexit.register
+def kill_running_jobs() -> int:
+    """Kill FFmpeg children still running in this process (on exit)."""
+    if _scheduler is None:
+        return 0
+    return _scheduler.kill_running()
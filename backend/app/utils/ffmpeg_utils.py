@@ -4,8 +4,27 @@ FFmpeg Utility Functions
 Post-processing utilities for video manipulation.
 """
 import os
+import time
+import shutil
+import tempfile
+import threading
 import subprocess
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from app.utils.ffmpeg_scheduler import (
+    CANCEL_CHECK_SECONDS,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    FFmpegJob,
+    current_tag,
+    get_ffmpeg_scheduler,
+)
+from app.utils.media_probe import MediaInfo, get_probe_cache
+
+# Default HLS ladder: (height, video kbps), highest first
+DEFAULT_HLS_LADDER = ((1080, 5000), (720, 2800), (480, 1400), (360, 800))
 
 
 class FFmpegProcessor:
@@ -14,21 +33,307 @@ class FFmpegProcessor:
     def __init__(self):
         self.ffmpeg_path = os.getenv('FFMPEG_PATH', 'ffmpeg')
         self.ffprobe_path = os.getenv('FFPROBE_PATH', 'ffprobe')
+        self.timeout = int(os.getenv('FFMPEG_TIMEOUT', '300'))  # per job, excluding queue wait
     
-    def _run_command(self, cmd: list) -> tuple:
-        """Run FFmpeg command and return output."""
+    def _with_threads(self, cmd: list, threads: int) -> list:
+        """Cap FFmpeg's encoder threads (inserted before the output path)."""
+        if cmd[0] != self.ffmpeg_path:
+            return cmd
+        return cmd[:-1] + ['-threads', str(threads), cmd[-1]]
+    
+    def _wait(self, job: FFmpegJob, wait: Callable[[float], Any]) -> Tuple[Any, Optional[str]]:
+        """
+        Wait for a job's child while polling for cancellation.
+        
+        Args:
+            job: Running job
+            wait: Waits up to the given seconds, raising ``TimeoutExpired``
+            
+        Returns:
+            (result of ``wait``, None), or (None, error) when the job was
+            cancelled (its child is killed) or ran past ``self.timeout``
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                return wait(CANCEL_CHECK_SECONDS), None
+            except subprocess.TimeoutExpired:
+                if job.cancel_requested():
+                    return None, 'Command cancelled'
+                if time.monotonic() >= deadline:
+                    return None, 'Command timed out'
+    
+    def _run_command(self, cmd: list, priority: int = PRIORITY_NORMAL, tag: Optional[str] = None) -> tuple:
+        """
+        Run FFmpeg command through the job scheduler and return output.
+        
+        Args:
+            cmd: Command line
+            priority: Scheduler priority class
+            tag: Cancellation tag (defaults to the enclosing ``cancel_scope``)
+        """
+        scheduler = get_ffmpeg_scheduler()
+        cmd = self._with_threads(cmd, scheduler.threads_per_job)
+        
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-            return result.returncode, result.stdout, result.stderr
+            with scheduler.job(priority, tag) as job:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    **job.popen_kwargs
+                )
+                job.attach(process)
+                
+                output, error = self._wait(job, lambda timeout: process.communicate(timeout=timeout))
+                if error:
+                    return -1, '', error
+                
+                stdout, stderr = output
+                return process.returncode, stdout, stderr
+        except Exception as e:
+            return -1, '', str(e)
+    
+    def _run_probe(self, cmd: list) -> tuple:
+        """
+        Run an FFprobe command directly and return output.
+        
+        Probes only read container headers and packets, so they bypass the
+        scheduler instead of waiting behind encodes for a slot.
+        """
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
         except subprocess.TimeoutExpired:
             return -1, '', 'Command timed out'
         except Exception as e:
             return -1, '', str(e)
+        
+        return result.returncode, result.stdout, result.stderr
+    
+    def _run_piped(
+        self,
+        cmd: list,
+        chunks: Iterable[bytes],
+        priority: int = PRIORITY_NORMAL
+    ) -> tuple:
+        """
+        Run FFmpeg reading its input from stdin.
+        
+        Chunks are written to the child as they arrive, so encoding starts
+        before the input is complete. Output pipes are drained on background
+        threads to avoid blocking the writer.
+        """
+        scheduler = get_ffmpeg_scheduler()
+        cmd = self._with_threads(cmd, scheduler.threads_per_job)
+        
+        with scheduler.job(priority) as job:
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    **job.popen_kwargs
+                )
+            except Exception as e:
+                return -1, '', str(e)
+            job.attach(process)
+            
+            output = {}
+            
+            def drain(name, pipe):
+                output[name] = pipe.read()
+            
+            readers = [
+                threading.Thread(target=drain, args=('stdout', process.stdout), daemon=True),
+                threading.Thread(target=drain, args=('stderr', process.stderr), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
+            
+            try:
+                for chunk in chunks:
+                    if job.cancel_requested():
+                        break
+                    process.stdin.write(chunk)
+            except BrokenPipeError:
+                # FFmpeg exited early; its stderr says why
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+            
+            if job.cancelled:
+                return -1, '', 'Command cancelled'
+            
+            _, error = self._wait(job, lambda timeout: process.wait(timeout=timeout))
+            if error:
+                return -1, '', error
+            
+            for reader in readers:
+                reader.join()
+            
+            return (
+                process.returncode,
+                output.get('stdout', b'').decode(errors='replace'),
+                output.get('stderr', b'').decode(errors='replace')
+            )
+    
+    def composite_command(
+        self,
+        input_path: str,
+        output_path: str,
+        thumbnail_path: Optional[str] = None,
+        audio_path: Optional[str] = None,
+        audio_volume: float = 1.0,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        thumbnail_time: float = 1.0,
+        crf: int = 23,
+        preset: str = 'medium'
+    ) -> list:
+        """
+        Build a single FFmpeg command with one decode and several outputs.
+        
+        The video is decoded once, optionally resized, then split between
+        an x264 faststart encode and a thumbnail JPEG; a narration track is
+        muxed in with its volume applied. The encoded output comes last so
+        ``-threads`` applies to the x264 encoder.
+        """
+        filters = []
+        video = '[0:v]'
+        
+        if width and height:
+            filters.append(f'{video}scale={width}:{height}[scaled]')
+            video = '[scaled]'
+        
+        if thumbnail_path:
+            filters.append(f'{video}split=2[vout][vthumb]')
+            filters.append(f'[vthumb]select=gte(t\\,{thumbnail_time})[thumb]')
+            video = '[vout]'
+        
+        if audio_path:
+            filters.append(f'[1:a]volume={audio_volume}[aout]')
+        
+        cmd = [self.ffmpeg_path, '-y', '-i', input_path]
+        if audio_path:
+            cmd += ['-i', audio_path]
+        
+        if filters:
+            cmd += ['-filter_complex', ';'.join(filters)]
+        
+        if thumbnail_path:
+            cmd += ['-map', '[thumb]', '-frames:v', '1', '-q:v', '2', thumbnail_path]
+        
+        cmd += ['-map', video if video != '[0:v]' else '0:v:0']
+        cmd += ['-map', '[aout]', '-shortest'] if audio_path else ['-map', '0:a?']
+        
+        return cmd + [
+            '-c:v', 'libx264',
+            '-crf', str(crf),
+            '-preset', preset,
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac',
+            '-b:a', '128k',
+            '-movflags', '+faststart',
+            output_path
+        ]
+    
+    def render_outputs(self, input_path: str, output_path: str, **options) -> str:
+        """
+        Produce the delivery video (and thumbnail) in a single FFmpeg run.
+        
+        Args:
+            input_path: Path to source video
+            output_path: Path for encoded video
+            **options: See :meth:`composite_command`
+            
+        Returns:
+            Path to encoded video
+        """
+        cmd = self.composite_command(input_path, output_path, **options)
+        returncode, _, stderr = self._run_command(cmd, priority=PRIORITY_LOW)
+        
+        if returncode != 0:
+            raise Exception(f"FFmpeg error: {stderr}")
+        
+        return output_path
+    
+    def process_stream(
+        self,
+        chunks: Iterable[bytes],
+        output_path: str,
+        archive_path: Optional[str] = None,
+        **options
+    ) -> str:
+        """
+        Process a video while it downloads.
+        
+        Chunks are piped into FFmpeg's stdin and, when ``archive_path`` is
+        given, teed to the archival copy in the same pass. Processing is
+        the single-pass composite of :meth:`render_outputs`.
+        
+        MP4 files with the index at the end cannot be demuxed from a pipe;
+        in that case the completed archival copy is processed instead.
+        
+        Args:
+            chunks: Iterable of video bytes (e.g. a streaming download)
+            output_path: Path for processed output
+            archive_path: Path for the untouched copy (optional)
+            **options: See :meth:`composite_command`
+            
+        Returns:
+            Path to processed video
+        """
+        chunks = iter(chunks)
+        archive = None
+        tmp_archive = f"{archive_path}.part" if archive_path else None
+        
+        def tee(source_chunks):
+            for chunk in source_chunks:
+                if archive:
+                    archive.write(chunk)
+                yield chunk
+        
+        try:
+            if tmp_archive:
+                archive = open(tmp_archive, 'wb')
+            returncode, _, stderr = self._run_piped(
+                self.composite_command('pipe:0', output_path, **options),
+                tee(chunks),
+                priority=PRIORITY_LOW
+            )
+            
+            if archive:
+                # Drain whatever FFmpeg did not consume so the archive is complete
+                for _ in tee(chunks):
+                    pass
+        except Exception:
+            if archive:
+                archive.close()
+                os.remove(tmp_archive)
+            raise
+        finally:
+            if archive and not archive.closed:
+                archive.close()
+        
+        if tmp_archive:
+            os.replace(tmp_archive, archive_path)
+        
+        if returncode != 0 and archive_path:
+            # Non-seekable input failed (e.g. moov atom at the end) - retry from disk
+            returncode, _, stderr = self._run_command(
+                self.composite_command(archive_path, output_path, **options),
+                priority=PRIORITY_LOW
+            )
+        
+        if returncode != 0:
+            raise Exception(f"FFmpeg error: {stderr}")
+        
+        return output_path
     
     def merge_audio(
         self,
@@ -102,13 +407,149 @@ class FFmpegProcessor:
             output_path
         ]
         
-        returncode, _, stderr = self._run_command(cmd)
+        returncode, _, stderr = self._run_command(cmd, priority=PRIORITY_LOW)
         
         if returncode != 0:
             raise Exception(f"FFmpeg error: {stderr}")
         
         return output_path
     
+    @staticmethod
+    def split_points(keyframes: List[float], duration: float, segments: int, min_segment_seconds: float = 10) -> List[float]:
+        """
+        Choose keyframe times that cut a video into roughly equal chunks.
+        
+        Args:
+            keyframes: Keyframe times in seconds
+            duration: Video duration in seconds
+            segments: Desired number of chunks
+            min_segment_seconds: Shortest chunk worth encoding separately
+            
+        Returns:
+            Sorted cut times (empty when the video should be encoded whole)
+        """
+        segments = min(segments, int(duration // min_segment_seconds))
+        candidates = [t for t in keyframes if 0 < t < duration]
+        points = []
+        
+        for i in range(1, segments):
+            if not candidates:
+                break
+            target = duration * i / segments
+            nearest = min(candidates, key=lambda t: abs(t - target))
+            if nearest not in points:
+                points.append(nearest)
+        
+        return sorted(points)
+    
+    def optimize_video_parallel(
+        self,
+        input_path: str,
+        output_path: str,
+        crf: int = 23,
+        preset: str = 'medium',
+        audio_path: Optional[str] = None,
+        audio_volume: float = 1.0,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        segments: Optional[int] = None,
+        min_segment_seconds: float = 10
+    ) -> str:
+        """
+        Split-encode-concat variant of :meth:`optimize_video` for long videos.
+        
+        The video stream is cut at keyframes with a stream copy, the chunks
+        are encoded concurrently (one FFmpeg process each, bounded by the
+        host-wide scheduler) with the same CRF and preset, and the results
+        are joined with the concat demuxer without re-encoding. Audio is
+        encoded once over the whole file in the join step, so there are no
+        gaps at chunk boundaries.
+        
+        Args:
+            input_path: Path to input video
+            output_path: Path for output file
+            crf: Constant Rate Factor (0-51, lower = better quality)
+            preset: Encoding speed preset
+            audio_path: Replacement audio track (optional; defaults to the input's)
+            audio_volume: Volume applied to ``audio_path``
+            width: Output width (optional, with ``height``)
+            height: Output height (optional, with ``width``)
+            segments: Number of chunks (defaults to the scheduler's slot count)
+            min_segment_seconds: Shortest chunk worth encoding separately
+            
+        Returns:
+            Path to optimized video
+        """
+        info = self.probe(input_path)
+        points = self.split_points(
+            info['keyframes'],
+            info['duration'],
+            segments or get_ffmpeg_scheduler().max_jobs,
+            min_segment_seconds
+        )
+        
+        work_dir = tempfile.mkdtemp(prefix='.encode-', dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            # 1. Cut the video stream at keyframes (stream copy)
+            cmd = [self.ffmpeg_path, '-y', '-i', input_path, '-map', '0:v:0', '-c', 'copy']
+            if points:
+                cmd += ['-f', 'segment', '-segment_times', ','.join(f'{t:.6f}' for t in points), '-reset_timestamps', '1']
+            cmd.append(os.path.join(work_dir, 'chunk_%03d.mkv' if points else 'chunk_000.mkv'))
+            
+            returncode, _, stderr = self._run_command(cmd)
+            if returncode != 0:
+                raise Exception(f"FFmpeg error: {stderr}")
+            
+            chunks = sorted(name[:-len('.mkv')] for name in os.listdir(work_dir) if name.startswith('chunk_'))
+            
+            # 2. Encode the chunks concurrently (pool threads don't inherit the cancel scope)
+            tag = current_tag()
+            
+            def encode(chunk):
+                cmd = [self.ffmpeg_path, '-y', '-i', os.path.join(work_dir, f'{chunk}.mkv')]
+                if width and height:
+                    cmd += ['-vf', f'scale={width}:{height}']
+                cmd += [
+                    '-c:v', 'libx264',
+                    '-crf', str(crf),
+                    '-preset', preset,
+                    '-pix_fmt', 'yuv420p',
+                    '-an',
+                    os.path.join(work_dir, f'{chunk}.mp4')
+                ]
+                return self._run_command(cmd, priority=PRIORITY_LOW, tag=tag)
+            
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                for returncode, _, stderr in pool.map(encode, chunks):
+                    if returncode != 0:
+                        raise Exception(f"FFmpeg error: {stderr}")
+            
+            list_path = os.path.join(work_dir, 'concat.txt')
+            with open(list_path, 'w') as f:
+                f.writelines(f"file '{chunk}.mp4'\n" for chunk in chunks)
+            
+            # 3. Join without re-encoding the video; encode the audio once
+            cmd = [self.ffmpeg_path, '-y', '-f', 'concat', '-safe', '0', '-i', list_path]
+            if audio_path:
+                cmd += ['-i', audio_path, '-map', '0:v', '-map', '1:a', '-filter:a', f'volume={audio_volume}', '-shortest']
+            else:
+                cmd += ['-i', input_path, '-map', '0:v', '-map', '1:a?']
+            cmd += [
+                '-c:v', 'copy',
+                '-c:a', 'aac',
+                '-b:a', '128k',
+                '-movflags', '+faststart',
+                output_path
+            ]
+            
+            returncode, _, stderr = self._run_command(cmd)
+            if returncode != 0:
+                raise Exception(f"FFmpeg error: {stderr}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        
+        return output_path
+    
     def extract_thumbnail(
         self,
         video_path: str,
@@ -118,6 +559,9 @@ class FFmpegProcessor:
         """
         Extract thumbnail frame from video.
         
+        Seeks on the input side, so FFmpeg jumps to the nearest keyframe
+        instead of decoding every frame up to the timestamp.
+        
         Args:
             video_path: Path to video file
             output_path: Path for thumbnail (auto-generated if None)
@@ -133,20 +577,211 @@ class FFmpegProcessor:
         cmd = [
             self.ffmpeg_path,
             '-y',
-            '-i', video_path,
             '-ss', timestamp,
+            '-i', video_path,
             '-vframes', '1',
             '-q:v', '2',
             output_path
         ]
         
-        returncode, _, stderr = self._run_command(cmd)
+        returncode, _, stderr = self._run_command(cmd, priority=PRIORITY_HIGH)
         
         if returncode != 0:
             raise Exception(f"FFmpeg error: {stderr}")
         
         return output_path
     
+    @staticmethod
+    def _vtt_time(seconds: float) -> str:
+        """Format seconds as a WebVTT timestamp."""
+        millis = int(round(seconds * 1000))
+        hours, millis = divmod(millis, 3600000)
+        minutes, millis = divmod(millis, 60000)
+        secs, millis = divmod(millis, 1000)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+    
+    def generate_storyboard(
+        self,
+        video_path: str,
+        sprite_path: str,
+        vtt_path: str,
+        count: int = 20,
+        columns: int = 5,
+        thumb_width: int = 160,
+        sprite_url: Optional[str] = None
+    ) -> dict:
+        """
+        Build a storyboard sprite sheet and WebVTT index for scrub previews.
+        
+        All frames come from a single FFmpeg run: ``fps`` samples N evenly
+        spaced frames, ``scale`` shrinks them and ``tile`` packs them into
+        one JPEG.
+        
+        Args:
+            video_path: Path to video file
+            sprite_path: Path for the sprite sheet JPEG
+            vtt_path: Path for the WebVTT index
+            count: Number of preview frames
+            columns: Frames per sprite row
+            thumb_width: Width of each frame in pixels
+            sprite_url: Sprite URL written to the index (defaults to its file name)
+            
+        Returns:
+            Dictionary with sprite/index paths and tile geometry
+        """
+        info = self.probe(video_path)
+        duration = info['duration']
+        
+        thumb_height = max(2, round(thumb_width * info['height'] / info['width'] / 2) * 2)
+        rows = -(-count // columns)
+        interval = duration / count
+        
+        cmd = [
+            self.ffmpeg_path,
+            '-y',
+            '-i', video_path,
+            '-vf', f'fps={count / duration:.6f},scale={thumb_width}:{thumb_height},tile={columns}x{rows}',
+            '-frames:v', '1',
+            '-an',
+            '-q:v', '3',
+            sprite_path
+        ]
+        
+        returncode, _, stderr = self._run_command(cmd)
+        
+        if returncode != 0:
+            raise Exception(f"FFmpeg error: {stderr}")
+        
+        sprite_ref = sprite_url or os.path.basename(sprite_path)
+        lines = ['WEBVTT', '']
+        for i in range(count):
+            x = (i % columns) * thumb_width
+            y = (i // columns) * thumb_height
+            lines += [
+                f"{self._vtt_time(i * interval)} --> {self._vtt_time(min(duration, (i + 1) * interval))}",
+                f"{sprite_ref}#xywh={x},{y},{thumb_width},{thumb_height}",
+                ''
+            ]
+        
+        with open(vtt_path, 'w') as f:
+            f.write('\n'.join(lines))
+        
+        return {
+            'sprite_path': sprite_path,
+            'vtt_path': vtt_path,
+            'count': count,
+            'columns': columns,
+            'rows': rows,
+            'thumb_width': thumb_width,
+            'thumb_height': thumb_height,
+            'interval': interval
+        }
+    
+    @staticmethod
+    def hls_ladder(source_height: int, ladder=DEFAULT_HLS_LADDER, max_renditions: int = 4) -> list:
+        """
+        Pick the renditions to package for a source of the given height.
+        
+        Rungs taller than the source are dropped (no upscaling). If the
+        source sits between rungs it becomes the top rung, with a bitrate
+        scaled by pixel count from the rung below. When capped, the top and
+        lowest rungs are always kept.
+        
+        Returns:
+            List of ``(height, video kbps)`` tuples, highest first
+        """
+        ladder = sorted(ladder, reverse=True)
+        rungs = [(height, kbps) for height, kbps in ladder if height <= source_height]
+        
+        if not rungs:
+            height, kbps = ladder[-1]
+            rungs = [(source_height, max(100, round(kbps * source_height ** 2 / height ** 2)))]
+        elif rungs[0][0] < source_height:
+            height, kbps = rungs[0]
+            rungs.insert(0, (source_height, round(kbps * source_height ** 2 / height ** 2)))
+        
+        if len(rungs) > max_renditions:
+            rungs = rungs[:max_renditions - 1] + rungs[-1:]
+        return rungs
+    
+    def package_hls(
+        self,
+        input_path: str,
+        output_dir: str,
+        renditions: list,
+        segment_seconds: int = 4,
+        segment_type: str = 'mpegts',
+        audio_bitrate: str = '128k'
+    ) -> str:
+        """
+        Package an HLS adaptive bitrate ladder from a single decode.
+        
+        The input is decoded once and ``split`` into one scaled branch per
+        rendition; each is encoded with capped VBR and keyframes forced on
+        segment boundaries so players can switch renditions cleanly.
+        Renditions land in ``<output_dir>/<height>p/`` next to
+        ``master.m3u8``.
+        
+        Args:
+            input_path: Path to source video
+            output_dir: Directory for playlists and segments
+            renditions: ``(height, video kbps)`` tuples (see :meth:`hls_ladder`)
+            segment_seconds: Target segment duration
+            segment_type: ``mpegts`` or ``fmp4`` (CMAF segments)
+            audio_bitrate: AAC bitrate per rendition
+            
+        Returns:
+            Path to the master playlist
+        """
+        has_audio = bool(self.probe(input_path)['audio_codec'])
+        count = len(renditions)
+        
+        outputs = ''.join(f'[v{i}]' for i in range(count))
+        filters = [f'[0:v]split={count}{outputs}'] + [
+            f'[v{i}]scale=-2:{height}[v{i}out]' for i, (height, _) in enumerate(renditions)
+        ]
+        
+        cmd = [self.ffmpeg_path, '-y', '-i', input_path, '-filter_complex', ';'.join(filters)]
+        stream_map = []
+        
+        for i, (height, kbps) in enumerate(renditions):
+            cmd += ['-map', f'[v{i}out]']
+            cmd += [
+                f'-b:v:{i}', f'{kbps}k',
+                f'-maxrate:v:{i}', f'{round(kbps * 1.07)}k',
+                f'-bufsize:v:{i}', f'{round(kbps * 1.5)}k'
+            ]
+            if has_audio:
+                cmd += ['-map', '0:a:0', f'-b:a:{i}', audio_bitrate]
+                stream_map.append(f'v:{i},a:{i},name:{height}p')
+            else:
+                stream_map.append(f'v:{i},name:{height}p')
+        
+        cmd += [
+            '-c:v', 'libx264',
+            '-preset', 'veryfast',
+            '-pix_fmt', 'yuv420p',
+            '-sc_threshold', '0',
+            '-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})',
+            '-c:a', 'aac',
+            '-f', 'hls',
+            '-hls_time', str(segment_seconds),
+            '-hls_playlist_type', 'vod',
+            '-hls_flags', 'independent_segments',
+            '-hls_segment_type', segment_type,
+            '-hls_segment_filename', os.path.join(output_dir, '%v', 'segment_%03d.' + ('m4s' if segment_type == 'fmp4' else 'ts')),
+            '-master_pl_name', 'master.m3u8',
+            '-var_stream_map', ' '.join(stream_map),
+            os.path.join(output_dir, '%v', 'index.m3u8')
+        ]
+        
+        returncode, _, stderr = self._run_command(cmd, priority=PRIORITY_LOW)
+        
+        if returncode != 0:
+            raise Exception(f"FFmpeg error: {stderr}")
+        
+        return os.path.join(output_dir, 'master.m3u8')
+    
     def get_video_info(self, video_path: str) -> dict:
         """
         Get video metadata using FFprobe.
@@ -166,7 +801,25 @@ class FFmpegProcessor:
             video_path
         ]
         
-        returncode, stdout, stderr = self._run_command(cmd)
+        returncode, stdout, stderr = self._run_probe(cmd)
+        
+        if returncode != 0:
+            raise Exception(f"FFprobe error: {stderr}")
+        
+        import json
+        return json.loads(stdout)
+    
+    def _probe_with_keyframes(self, video_path: str) -> dict:
+        """Full FFprobe output plus video packet flags (keyframes) in one run."""
+        cmd = [
+            self.ffprobe_path,
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_entries', 'format:stream:packet=stream_index,pts_time,flags',
+            video_path
+        ]
+        
+        returncode, stdout, stderr = self._run_probe(cmd)
         
         if returncode != 0:
             raise Exception(f"FFprobe error: {stderr}")
@@ -174,30 +827,53 @@ class FFmpegProcessor:
         import json
         return json.loads(stdout)
     
+    def probe(self, video_path: str) -> MediaInfo:
+        """
+        Get compact, cached media info (duration, codecs, dimensions, fps,
+        keyframe times).
+        
+        Results are cached per (path, size, mtime) in memory and in a
+        ``.probe.json`` sidecar, so repeated stages and worker restarts do
+        not re-run FFprobe on an unchanged file.
+        
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            Compact media info
+        """
+        return get_probe_cache().get(video_path, self._probe_with_keyframes)
+    
     def trim_video(
         self,
         input_path: str,
         output_path: str,
         start_time: str,
-        duration: str
+        duration: str,
+        accurate: bool = False
     ) -> str:
         """
         Trim video to specified duration.
         
+        By default seeks on the input side and stream-copies, so the cut
+        snaps to the nearest keyframe without decoding the skipped part.
+        
         Args:
             input_path: Path to input video
             output_path: Path for trimmed video
             start_time: Start timestamp (HH:MM:SS)
             duration: Duration (HH:MM:SS or seconds)
+            accurate: Decode up to ``start_time`` for a frame-exact cut
             
         Returns:
             Path to trimmed video
         """
+        seek = ['-i', input_path, '-ss', start_time] if accurate else ['-ss', start_time, '-i', input_path]
+        
         cmd = [
             self.ffmpeg_path,
             '-y',
-            '-i', input_path,
-            '-ss', start_time,
+            *seek,
             '-t', duration,
             '-c', 'copy',
             output_path
@@ -238,7 +914,7 @@ class FFmpegProcessor:
             output_path
         ]
         
-        returncode, _, stderr = self._run_command(cmd)
+        returncode, _, stderr = self._run_command(cmd, priority=PRIORITY_LOW)
         
         if returncode != 0:
             raise Exception(f"FFmpeg error: {stderr}")
@@ -0,0 +1,276 @@
+"""
+Outbound HTTP Utilities
+
+Shared connection pools, timeouts, retries and pool metrics for every
+outbound provider call (OpenAI, Replicate, ElevenLabs).
+"""
+import os
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Responses worth retrying: rate limiting and transient server errors
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _setting(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+def get_timeout() -> Tuple[float, float]:
+    """Get the (connect, read) timeout for ``requests`` calls."""
+    return _setting('HTTP_CONNECT_TIMEOUT', '5'), _setting('HTTP_READ_TIMEOUT', '60')
+
+
+def get_httpx_timeout() -> httpx.Timeout:
+    """Get the equivalent timeout for ``httpx``-based SDK clients."""
+    connect, read = get_timeout()
+    return httpx.Timeout(read, connect=connect, pool=connect)
+
+
+def get_httpx_limits() -> httpx.Limits:
+    """Get per-host connection pool limits for ``httpx``-based SDK clients."""
+    pool_size = int(_setting('HTTP_POOL_MAXSIZE', '20'))
+    return httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+
+def get_max_retries() -> int:
+    """Get the max retry count for retryable responses."""
+    return int(_setting('HTTP_MAX_RETRIES', '3'))
+
+
+class ProviderRetry(Retry):
+    """
+    Retry policy that never replays a request the provider may have billed.
+    
+    Idempotent methods are retried on read errors and ``HTTP_RETRY_STATUSES``.
+    Other methods (paid POST submissions) are only retried on connect
+    errors, when nothing reached the server, and on 429, which is rejected
+    before any work is done.
+    """
+    
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class PoolMetrics:
+    """Thread-safe connection pool counters for one host."""
+    
+    def __init__(self, host: str, max_connections: int):
+        self.host = host
+        self.max_connections = max_connections
+        self.requests = 0
+        self.in_flight = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+    
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+    
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+    
+    def snapshot(self) -> dict:
+        """Return checked-out, waiting and connection reuse figures."""
+        with self._lock:
+            reused = self.requests - self.connections_opened
+            return {
+                'requests': self.requests,
+                'checked_out': min(self.in_flight, self.max_connections),
+                'waiting': max(0, self.in_flight - self.max_connections),
+                'connections_opened': self.connections_opened,
+                'reuse_ratio': round(max(0, reused) / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+_metrics: Dict[str, PoolMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def _metrics_for(url, max_connections: int) -> PoolMetrics:
+    host = urlsplit(str(url)).netloc
+    with _metrics_lock:
+        if host not in _metrics:
+            _metrics[host] = PoolMetrics(host, max_connections)
+        return _metrics[host]
+
+
+def get_pool_metrics() -> Dict[str, dict]:
+    """Get pool metrics for every host contacted by this process."""
+    with _metrics_lock:
+        return {host: metrics.snapshot() for host, metrics in _metrics.items()}
+
+
+class MeteredHTTPAdapter(HTTPAdapter):
+    """``requests`` adapter that records per-host pool metrics."""
+    
+    def _connections_opened(self, host: str) -> int:
+        pools = self.poolmanager.pools
+        return sum(
+            pool.num_connections
+            for pool in (pools.get(key) for key in pools.keys())
+            if pool is not None and pool.host == host
+        )
+    
+    def send(self, request, **kwargs):
+        metrics = _metrics_for(request.url, self._pool_maxsize)
+        host = urlsplit(request.url).hostname
+        opened_before = self._connections_opened(host)
+        
+        metrics.acquire()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            metrics.release()
+            for _ in range(self._connections_opened(host) - opened_before):
+                metrics.connection_opened()
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """``httpx`` transport wrapper that records per-host pool metrics."""
+    
+    def __init__(self, transport: Optional[httpx.HTTPTransport] = None):
+        self.limits = get_httpx_limits()
+        self.transport = transport or httpx.HTTPTransport(limits=self.limits, retries=1)
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = _metrics_for(request.url, self.limits.max_connections)
+        
+        def trace(event_name, info):
+            if event_name == 'connection.connect_tcp.complete':
+                metrics.connection_opened()
+        
+        request.extensions.setdefault('trace', trace)
+        
+        metrics.acquire()
+        try:
+            return self.transport.handle_request(request)
+        finally:
+            metrics.release()
+    
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    """Async variant of :class:`MeteredTransport`."""
+    
+    def __init__(self, transport: Optional[httpx.AsyncHTTPTransport] = None):
+        self.limits = get_httpx_limits()
+        self.transport = transport or httpx.AsyncHTTPTransport(limits=self.limits, retries=1)
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = _metrics_for(request.url, self.limits.max_connections)
+        
+        async def trace(event_name, info):
+            if event_name == 'connection.connect_tcp.complete':
+                metrics.connection_opened()
+        
+        request.extensions.setdefault('trace', trace)
+        
+        metrics.acquire()
+        try:
+            return await self.transport.handle_async_request(request)
+        finally:
+            metrics.release()
+    
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the shared ``requests`` session for this process.
+    
+    Connections are pooled per host, and 429/5xx responses are retried
+    with jittered exponential backoff (honouring ``Retry-After``); see
+    :class:`ProviderRetry` for which methods are replayed.
+    """
+    global _session
+    
+    with _session_lock:
+        if _session is None:
+            backoff = _setting('HTTP_BACKOFF_FACTOR', '0.5')
+            retry = ProviderRetry(
+                total=get_max_retries(),
+                backoff_factor=backoff,
+                backoff_jitter=backoff,
+                status_forcelist=HTTP_RETRY_STATUSES,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = MeteredHTTPAdapter(
+                pool_connections=int(_setting('HTTP_POOL_HOSTS', '10')),
+                pool_maxsize=int(_setting('HTTP_POOL_MAXSIZE', '20')),
+                max_retries=retry
+            )
+            
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        
+        return _session
+
+
+def iter_download(url: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """
+    Stream a remote file in chunks through the shared session.
+    
+    The response is released once the iterator is exhausted or closed.
+    """
+    with get_session().get(url, stream=True, timeout=get_timeout()) as response:
+        response.raise_for_status()
+        yield from response.iter_content(chunk_size=chunk_size)
+
+
+def download_to_file(url: str, path: str, chunk_size: int = 1024 * 1024) -> int:
+    """
+    Stream a remote file to disk through the shared session.
+    
+    Args:
+        url: Source URL
+        path: Destination file path
+        chunk_size: Read size in bytes
+        
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    tmp_path = f"{path}.part"
+    
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter_download(url, chunk_size):
+            f.write(chunk)
+            written += len(chunk)
+    
+    os.replace(tmp_path, path)
+    return written
+
+
+def reset_http_clients() -> None:
+    """Close the shared session (e.g. after a worker fork)."""
+    global _session
+    
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
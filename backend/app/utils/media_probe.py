@@ -0,0 +1,192 @@
+"""
+Media Probe Cache
+
+Compact, cached ``ffprobe`` results keyed on (path, size, mtime), with an
+in-memory LRU in front of a JSON sidecar stored next to the media file.
+"""
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = '.probe.json'
+
+
+class MediaInfo(TypedDict):
+    """Compact probe result."""
+    duration: float
+    size: int
+    format: str
+    bit_rate: Optional[int]
+    video_codec: Optional[str]
+    audio_codec: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+    fps: Optional[float]
+    keyframes: List[float]
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    """Parse an ffprobe frame rate such as ``25/1``."""
+    if not rate:
+        return None
+    num, _, den = rate.partition('/')
+    try:
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return round(value, 3) if value else None
+
+
+def compact_probe(raw: Dict[str, Any]) -> MediaInfo:
+    """
+    Reduce full ``ffprobe`` JSON to the fields the pipeline uses.
+    
+    Args:
+        raw: Output of ``ffprobe -show_format -show_streams`` (with video
+            packets for keyframe times)
+            
+    Returns:
+        Compact media info
+    """
+    fmt = raw.get('format', {})
+    streams = raw.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+    
+    keyframes = sorted(
+        float(packet['pts_time'])
+        for packet in raw.get('packets', [])
+        if packet.get('stream_index') == video.get('index')
+        and 'K' in packet.get('flags', '')
+        and packet.get('pts_time') not in (None, 'N/A')
+    )
+    
+    return {
+        'duration': float(fmt.get('duration') or video.get('duration') or 0),
+        'size': int(fmt.get('size') or 0),
+        'format': fmt.get('format_name', ''),
+        'bit_rate': int(fmt['bit_rate']) if fmt.get('bit_rate') else None,
+        'video_codec': video.get('codec_name'),
+        'audio_codec': audio.get('codec_name'),
+        'width': video.get('width'),
+        'height': video.get('height'),
+        'fps': _parse_rate(video.get('avg_frame_rate')) or _parse_rate(video.get('r_frame_rate')),
+        'keyframes': keyframes,
+    }
+
+
+class MediaProbeCache:
+    """Two-tier (LRU + sidecar) cache of compact probe results."""
+    
+    def __init__(self, max_entries: int = 256, sidecars: bool = True):
+        self.max_entries = max_entries
+        self.sidecars = sidecars
+        self._entries: 'OrderedDict[Tuple[str, int, int], MediaInfo]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'memory_hits': 0, 'sidecar_hits': 0, 'probes': 0}
+    
+    @staticmethod
+    def file_key(path: str) -> Tuple[str, int, int]:
+        """Cache key: a changed file gets a new size or mtime."""
+        stat = os.stat(path)
+        return os.path.realpath(path), stat.st_size, stat.st_mtime_ns
+    
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def _remember(self, key: Tuple[str, int, int], info: MediaInfo) -> None:
+        with self._lock:
+            self._entries[key] = info
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def _read_sidecar(self, key: Tuple[str, int, int]) -> Optional[MediaInfo]:
+        path, size, mtime_ns = key
+        try:
+            with open(path + SIDECAR_SUFFIX) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if data.get('size') != size or data.get('mtime_ns') != mtime_ns:
+            return None
+        return data.get('info')
+    
+    def _write_sidecar(self, key: Tuple[str, int, int], info: MediaInfo) -> None:
+        path, size, mtime_ns = key
+        tmp_path = f"{path}{SIDECAR_SUFFIX}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'size': size, 'mtime_ns': mtime_ns, 'info': info}, f)
+            os.replace(tmp_path, path + SIDECAR_SUFFIX)
+        except OSError as e:
+            logger.warning('Could not write probe sidecar for %s: %s', path, e)
+    
+    def get(self, path: str, probe: Callable[[str], Dict[str, Any]]) -> MediaInfo:
+        """
+        Return cached media info for a file, probing it on a miss.
+        
+        Args:
+            path: Media file path
+            probe: Callable returning raw ffprobe JSON for the path
+        """
+        key = self.file_key(path)
+        
+        with self._lock:
+            info = self._entries.get(key)
+            if info is not None:
+                self._entries.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                return info
+        
+        info = self._read_sidecar(key) if self.sidecars else None
+        if info is not None:
+            self._count('sidecar_hits')
+        else:
+            info = compact_probe(probe(path))
+            self._count('probes')
+            if self.sidecars:
+                self._write_sidecar(key, info)
+        
+        self._remember(key, info)
+        return info
+    
+    def invalidate(self, path: str) -> None:
+        """Forget a file (e.g. before rewriting it in place)."""
+        real_path = os.path.realpath(path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == real_path]:
+                del self._entries[key]
+        
+        try:
+            os.remove(real_path + SIDECAR_SUFFIX)
+        except FileNotFoundError:
+            pass
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/probe counters for this process."""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        return stats
+
+
+_probe_cache: Optional[MediaProbeCache] = None
+
+
+def get_probe_cache() -> MediaProbeCache:
+    """Get the process-wide probe cache."""
+    global _probe_cache
+    if _probe_cache is None:
+        _probe_cache = MediaProbeCache(
+            max_entries=int(os.getenv('PROBE_CACHE_MAX_ENTRIES', '256')),
+            sidecars=os.getenv('PROBE_SIDECARS', 'True').lower() == 'true'
+        )
+    return _probe_cache
@@ -0,0 +1,64 @@
+"""
+Keyset Pagination Helpers
+"""
+import json
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.extensions import db
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a ``(created_at, id)`` position as an opaque cursor.
+    
+    Args:
+        created_at: Timestamp of the last row on the page
+        row_id: ID of the last row on the page
+        
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+    
+    Returns:
+        ``(created_at, id)`` tuple, or None if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def estimate_count(query) -> int:
+    """
+    Approximate row count of a query from the planner (PostgreSQL).
+    
+    Avoids a full ``COUNT(*)``; other databases fall back to an exact count.
+    
+    Args:
+        query: SQLAlchemy query (ordering is ignored)
+        
+    Returns:
+        Estimated number of rows
+    """
+    query = query.order_by(None)
+    
+    if db.engine.dialect.name != 'postgresql':
+        return query.count()
+    
+    sql = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    plan = db.session.execute(db.text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,84 @@
+"""
+Query Plan Inspection
+
+Runs EXPLAIN for ORM queries and reports which indexes and table scans
+the planner chose (PostgreSQL and SQLite), and counts the statements a
+block of code issues.
+"""
+import json
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, Set
+
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+def _walk(plan: dict):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _walk(child)
+
+
+def explain(query) -> Dict[str, Set[str]]:
+    """
+    Summarize the plan of a query.
+    
+    Args:
+        query: SQLAlchemy query
+        
+    Returns:
+        Dictionary with the ``indexes`` used and the tables read by
+        full ``seq_scans``
+    """
+    dialect = db.engine.dialect
+    sql = query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+    indexes, seq_scans = set(), set()
+    
+    if dialect.name == 'postgresql':
+        plan = db.session.execute(db.text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        
+        for node in _walk(plan[0]['Plan']):
+            if node.get('Index Name'):
+                indexes.add(node['Index Name'])
+            if node['Node Type'] == 'Seq Scan':
+                seq_scans.add(node['Relation Name'])
+    else:
+        # SQLite: "SEARCH videos USING INDEX ix_... (user_id=?)" / "SCAN videos"
+        for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')):
+            detail = row[-1].split()
+            if 'INDEX' in detail:
+                indexes.add(detail[detail.index('INDEX') + 1])
+            elif detail[0] == 'SCAN' and 'PRIMARY' not in detail:
+                seq_scans.add(detail[1])
+    
+    return {'indexes': indexes, 'seq_scans': seq_scans}
+
+
+@contextmanager
+def count_statements() -> Iterator[Counter]:
+    """
+    Count the SQL statements and commits issued inside the block.
+    
+    Yields:
+        Counter keyed by statement verb (``SELECT``, ``UPDATE``, ...) plus
+        ``commits``, filled in as the block runs
+    """
+    counts = Counter()
+    
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counts[statement.split(None, 1)[0].upper()] += 1
+    
+    def on_commit(conn):
+        counts['commits'] += 1
+    
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    event.listen(db.engine, 'commit', on_commit)
+    try:
+        yield counts
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+        event.remove(db.engine, 'commit', on_commit)
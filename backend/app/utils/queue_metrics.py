@@ -0,0 +1,83 @@
+"""
+Celery Queue-Wait Metrics
+
+Time from publishing a task to a worker starting it, aggregated per queue
+across worker processes in Redis.
+"""
+import logging
+from typing import Dict
+
+import redis
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = 'celery:queue_wait'
+RECENT_KEY = 'celery:queue_wait:recent:{}'
+
+# Recent samples kept per queue for percentiles
+RECENT_SAMPLES = 1000
+
+
+def record_queue_wait(queue: str, wait_seconds: float) -> None:
+    """
+    Record how long a task waited in a queue (best effort).
+    
+    Args:
+        queue: Queue name
+        wait_seconds: Seconds between publish and task start
+    """
+    wait_seconds = max(0.0, wait_seconds)
+    
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hincrby(METRICS_KEY, f'{queue}:tasks', 1)
+        pipe.hincrbyfloat(METRICS_KEY, f'{queue}:wait_seconds', wait_seconds)
+        pipe.lpush(RECENT_KEY.format(queue), round(wait_seconds, 3))
+        pipe.ltrim(RECENT_KEY.format(queue), 0, RECENT_SAMPLES - 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.debug('Queue-wait metrics update failed: %s', e)
+
+
+def _percentile(samples, fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def get_queue_wait_metrics() -> Dict[str, Dict[str, float]]:
+    """
+    Queue-wait totals and recent percentiles per queue.
+    
+    Returns:
+        Dictionary keyed by queue name with ``tasks``, ``avg_wait_seconds``
+        and ``p50``/``p95``/``max`` of the recent samples
+    """
+    try:
+        r = get_redis()
+        raw = r.hgetall(METRICS_KEY)
+        queues = sorted({key.rsplit(':', 1)[0] for key in raw})
+        
+        pipe = r.pipeline()
+        for queue in queues:
+            pipe.lrange(RECENT_KEY.format(queue), 0, -1)
+        recent = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning('Queue-wait metrics read failed: %s', e)
+        return {}
+    
+    metrics = {}
+    for queue, values in zip(queues, recent):
+        tasks = int(raw.get(f'{queue}:tasks', 0))
+        total = float(raw.get(f'{queue}:wait_seconds', 0))
+        samples = sorted(float(value) for value in values)
+        
+        metrics[queue] = {
+            'tasks': tasks,
+            'avg_wait_seconds': round(total / tasks, 3) if tasks else 0.0,
+            'p50_wait_seconds': _percentile(samples, 0.5) if samples else 0.0,
+            'p95_wait_seconds': _percentile(samples, 0.95) if samples else 0.0,
+            'max_wait_seconds': samples[-1] if samples else 0.0,
+        }
+    
+    return metrics
@@ -0,0 +1,23 @@
+"""
+Redis Client
+
+Process-wide Redis connection shared by coordination and progress features.
+"""
+import os
+from typing import Optional
+
+import redis
+
+_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the shared Redis client for this process."""
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(
+            os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+            decode_responses=True,
+            socket_connect_timeout=2
+        )
+    return _redis
@@ -0,0 +1,69 @@
+"""
+Webhook Signing Utilities
+
+Replicate-compatible (Standard Webhooks) signature creation and verification.
+"""
+import base64
+import hashlib
+import hmac
+import time
+from typing import Mapping
+
+
+def _secret_bytes(secret: str) -> bytes:
+    """Decode a ``whsec_``-prefixed signing secret."""
+    if secret.startswith('whsec_'):
+        return base64.b64decode(secret[len('whsec_'):])
+    return secret.encode()
+
+
+def sign_webhook(secret: str, webhook_id: str, timestamp: str, body: str) -> str:
+    """
+    Compute a webhook signature.
+    
+    Args:
+        secret: Signing secret (``whsec_...``)
+        webhook_id: Unique message ID (``webhook-id`` header)
+        timestamp: Unix timestamp string (``webhook-timestamp`` header)
+        body: Raw request body
+    
+    Returns:
+        Signature header value (``v1,<base64 digest>``)
+    """
+    signed_content = f"{webhook_id}.{timestamp}.{body}".encode()
+    digest = hmac.new(_secret_bytes(secret), signed_content, hashlib.sha256).digest()
+    return f"v1,{base64.b64encode(digest).decode()}"
+
+
+def verify_webhook(secret: str, headers: Mapping[str, str], body: str, tolerance: int = 300) -> bool:
+    """
+    Verify a signed webhook request.
+    
+    Args:
+        secret: Signing secret (``whsec_...``)
+        headers: Request headers
+        body: Raw request body
+        tolerance: Max allowed clock skew in seconds
+    
+    Returns:
+        True if the signature is valid and fresh, False otherwise
+    """
+    webhook_id = headers.get('webhook-id')
+    timestamp = headers.get('webhook-timestamp')
+    signatures = headers.get('webhook-signature')
+    
+    if not webhook_id or not timestamp or not signatures:
+        return False
+    
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+    except ValueError:
+        return False
+    
+    expected = sign_webhook(secret, webhook_id, timestamp, body)
+    
+    return any(
+        hmac.compare_digest(expected, candidate)
+        for candidate in signatures.split()
+    )
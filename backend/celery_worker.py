@@ -3,11 +3,10 @@ Celery Worker Entry Point
 
 Run with: celery -A celery_worker.celery worker --loglevel=info
 """
-from app import create_app
-from app.tasks.video_tasks import celery_app
+from app.tasks.video_tasks import celery_app, get_flask_app
 
-# Create Flask app for context
-flask_app = create_app()
+# Shared Flask app for context (reused by every task in this process)
+flask_app = get_flask_app()
 
 # Alias for celery CLI
 celery = celery_app
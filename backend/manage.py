@@ -7,15 +7,28 @@ Usage:
     python manage.py init-db     # Initialize database
     python manage.py migrate     # Run migrations
     python manage.py shell       # Open interactive shell
+    python manage.py run-poller  # Run centralized provider status poller
+    python manage.py run-dispatcher  # Run fair-share batch dispatcher
+    python manage.py bench-poller  # Benchmark batched status checks
+    python manage.py bench-task-overhead  # Benchmark per-task setup cost
+    python manage.py probe FILE...  # Show cached media info
+    python manage.py bench-encode  # Benchmark serial vs segment-parallel encoding
+    python manage.py check-query-plans  # Assert hot queries use their indexes
+    python manage.py count-task-statements  # SQL statements per generation task run
 """
 import os
 import sys
+import time
+import asyncio
 import click
 from flask.cli import FlaskGroup
 
 from app import create_app
 from app.extensions import db
 from app.models import User, Video, GenerationTask
+from app.services.ai_provider_service import AIProviderService, MockProvider
+from app.services.text_to_video_service import TextToVideoService
+from app.services.status_poller import StatusPoller
 
 
 def create_cli_app():
@@ -77,6 +90,314 @@ def create_user(email, password, name):
         click.echo(f'User {email} created successfully.')
 
 
+@cli.command('run-poller')
+def run_poller():
+    """Run the centralized provider status poller (VIDEO_STATUS_POLLER=service only)."""
+    app = create_app()
+    if app.config['VIDEO_STATUS_POLLER'] != 'service':
+        # poll_video_status tasks already poll in 'task' mode; running both doubles provider traffic
+        click.echo('VIDEO_STATUS_POLLER is not "service"; status polling runs as Celery tasks. Exiting.', err=True)
+        raise SystemExit(1)
+    
+    with app.app_context():
+        poller = StatusPoller(max_concurrency=app.config['STATUS_POLLER_CONCURRENCY'])
+        click.echo('Status poller started.')
+        poller.run_forever(app.config['STATUS_POLLER_INTERVAL'])
+
+
+@cli.command('run-dispatcher')
+def run_dispatcher():
+    """Run the fair-share dispatcher for batch generation tasks (BATCH_DISPATCH=fair only)."""
+    from app.services.fair_scheduler import FairScheduler
+    
+    app = create_app()
+    if app.config['BATCH_DISPATCH'] != 'fair':
+        click.echo('BATCH_DISPATCH is not "fair"; batch tasks go straight to the queue. Exiting.', err=True)
+        raise SystemExit(1)
+    
+    with app.app_context():
+        scheduler = FairScheduler.from_config(app.config)
+        click.echo(f'Fair-share dispatcher started (queue depth {scheduler.queue_depth}).')
+        scheduler.run_forever(app.config['FAIR_SHARE_INTERVAL'])
+
+
+@cli.command('bench-poller')
+@click.option('--predictions', default=2000, help='Number of in-flight predictions')
+@click.option('--latency', default=0.5, help='Simulated provider latency (seconds)')
+@click.option('--concurrency', default=100, help='Max in-flight status checks')
+def bench_poller(predictions, latency, concurrency):
+    """Benchmark batched status checks against a MockProvider."""
+    poller = StatusPoller(
+        max_concurrency=concurrency,
+        providers={'mock': MockProvider(latency=latency)}
+    )
+    batch = [('mock', f'mock_bench_{i}') for i in range(predictions)]
+    
+    started = time.perf_counter()
+    results = asyncio.run(poller.check_many(batch))
+    elapsed = time.perf_counter() - started
+    
+    succeeded = sum(1 for r in results if r.get('status') == 'succeeded')
+    click.echo(f'Checked {len(results)} predictions ({succeeded} succeeded) in {elapsed:.2f}s')
+    click.echo(f'Throughput: {len(results) / elapsed:.0f} checks/s')
+    click.echo(f'Sequential estimate: {predictions * latency:.0f}s')
+
+
+@cli.command('bench-task-overhead')
+@click.option('--iterations', default=50, help='Number of simulated task runs')
+def bench_task_overhead(iterations):
+    """Compare per-task setup cost: fresh app and clients vs worker singletons."""
+    from app.tasks.video_tasks import get_flask_app, get_video_service
+    
+    def per_task_setup():
+        # Previous behaviour: new app, service, provider and OpenAI client per task
+        app = create_app()
+        with app.app_context():
+            AIProviderService.reset_clients()
+            TextToVideoService()
+            AIProviderService.get_openai_client('sk-benchmark')
+    
+    def worker_singletons():
+        app = get_flask_app()
+        with app.app_context():
+            get_video_service()
+            AIProviderService.get_openai_client('sk-benchmark')
+    
+    for label, setup in (('per-task', per_task_setup), ('singletons', worker_singletons)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            setup()
+        elapsed = time.perf_counter() - started
+        click.echo(f'{label:>10}: {elapsed * 1000 / iterations:.2f} ms/task over {iterations} runs')
+
+
+@cli.command('probe')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--refresh', is_flag=True, help='Ignore cached results and re-probe')
+def probe(paths, refresh):
+    """Show cached media info (codecs, dimensions, fps, keyframes)."""
+    from app.utils.ffmpeg_utils import FFmpegProcessor
+    from app.utils.media_probe import get_probe_cache
+    
+    processor = FFmpegProcessor()
+    for path in paths:
+        if refresh:
+            get_probe_cache().invalidate(path)
+        
+        started = time.perf_counter()
+        info = processor.probe(path)
+        elapsed = time.perf_counter() - started
+        
+        click.echo(
+            f"{path}: {info['duration']:.2f}s {info['width']}x{info['height']} "
+            f"@ {info['fps']} fps, {info['video_codec']}/{info['audio_codec'] or '-'}, "
+            f"{len(info['keyframes'])} keyframes ({elapsed * 1000:.1f} ms)"
+        )
+    
+    click.echo(f'Cache: {get_probe_cache().stats()}')
+
+
+@cli.command('bench-encode')
+@click.option('--duration', default=60, help='Synthetic video length (seconds)')
+@click.option('--size', default='1280x720', help='Synthetic video size')
+@click.option('--segments', default=0, help='Parallel chunks (0 = scheduler slot count)')
+@click.option('--preset', default='medium', help='x264 preset')
+def bench_encode(duration, size, segments, preset):
+    """Benchmark serial vs split-encode-concat x264 on a lavfi test source."""
+    import re
+    import shutil
+    import subprocess
+    import tempfile
+    from app.utils.ffmpeg_utils import FFmpegProcessor
+    
+    processor = FFmpegProcessor()
+    work_dir = tempfile.mkdtemp(prefix='bench-encode-')
+    source_path = os.path.join(work_dir, 'source.mp4')
+    
+    def psnr(path):
+        result = subprocess.run(
+            [processor.ffmpeg_path, '-i', path, '-i', source_path, '-lavfi', 'psnr', '-f', 'null', '-'],
+            capture_output=True,
+            text=True
+        )
+        match = re.search(r'average:([\d.]+|inf)', result.stderr)
+        return match.group(1) if match else '?'
+    
+    try:
+        # Near-lossless source with a keyframe every 2s, like provider outputs
+        subprocess.run([
+            processor.ffmpeg_path, '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate=25:duration={duration}',
+            '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-qp', '0', '-g', '50',
+            '-c:a', 'aac', source_path
+        ], check=True)
+        
+        runs = (
+            ('serial', lambda out: processor.optimize_video(source_path, out, preset=preset)),
+            ('parallel', lambda out: processor.optimize_video_parallel(source_path, out, preset=preset, segments=segments or None)),
+        )
+        for label, encode in runs:
+            output_path = os.path.join(work_dir, f'{label}.mp4')
+            started = time.perf_counter()
+            encode(output_path)
+            elapsed = time.perf_counter() - started
+            click.echo(
+                f'{label:>8}: {elapsed:.2f}s, {os.path.getsize(output_path) / 1024 ** 2:.1f} MiB, '
+                f'PSNR {psnr(output_path)} dB'
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+@cli.command('check-query-plans')
+@click.option('--users', default=200, help='Seeded users')
+@click.option('--videos-per-user', default=100, help='Seeded videos per user')
+def check_query_plans(users, videos_per_user):
+    """
+    Seed a large dataset and assert the hot video queries use index scans.
+    
+    Runs in a transaction that is rolled back; exits non-zero on a plan
+    regression.
+    """
+    import uuid
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert, tuple_
+    from app.utils.query_plans import explain
+    
+    app = create_app()
+    with app.app_context():
+        run_id = uuid.uuid4().hex[:8]
+        base = datetime.utcnow()
+        
+        db.session.execute(insert(User), [
+            {'email': f'plan-{run_id}-{i}@example.com', 'password_hash': '-'}
+            for i in range(users)
+        ])
+        user_ids = [u.id for u in User.query.filter(User.email.like(f'plan-{run_id}-%')).all()]
+        
+        statuses = ('completed', 'completed', 'completed', 'failed', 'processing')
+        db.session.execute(insert(Video), [
+            {
+                'user_id': user_id,
+                'prompt': 'query plan check',
+                'status': statuses[i % len(statuses)],
+                'created_at': base - timedelta(minutes=i)
+            }
+            for user_id in user_ids
+            for i in range(videos_per_user)
+        ])
+        video_ids = [row.id for row in db.session.query(Video.id).filter(Video.user_id.in_(user_ids))]
+        
+        db.session.execute(insert(GenerationTask), [
+            {'video_id': video_id, 'celery_task_id': f'plan-{run_id}-{video_id}-{n}', 'created_at': base}
+            for video_id in video_ids
+            for n in range(2)
+        ])
+        
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text('ANALYZE users, videos, generation_tasks'))
+        else:
+            db.session.execute(db.text('ANALYZE'))
+        
+        user_id = user_ids[len(user_ids) // 2]
+        newest = Video.query.filter_by(user_id=user_id).order_by(Video.created_at.desc(), Video.id.desc()).first()
+        keyset_order = (Video.created_at.desc(), Video.id.desc())
+        
+        checks = (
+            ('list videos', 'ix_videos_user_created',
+             Video.query.filter_by(user_id=user_id).order_by(*keyset_order).limit(21)),
+            ('list videos by status', 'ix_videos_user_status_created',
+             Video.query.filter_by(user_id=user_id, status='failed').order_by(*keyset_order).limit(21)),
+            ('list videos after cursor', 'ix_videos_user_created',
+             Video.query.filter_by(user_id=user_id)
+             .filter(tuple_(Video.created_at, Video.id) < (newest.created_at, newest.id))
+             .order_by(*keyset_order).limit(21)),
+            ('task by celery id', 'ix_generation_tasks_celery_task_id',
+             GenerationTask.query.filter_by(celery_task_id=f'plan-{run_id}-{newest.id}-0')),
+            ('latest task of video', 'ix_generation_tasks_video_created',
+             GenerationTask.query.filter_by(video_id=newest.id).order_by(GenerationTask.created_at.desc()).limit(1)),
+        )
+        
+        failures = 0
+        try:
+            for label, index, query in checks:
+                plan = explain(query)
+                ok = index in plan['indexes'] and not plan['seq_scans']
+                failures += not ok
+                click.echo(
+                    f"{'ok  ' if ok else 'FAIL'} {label}: indexes={sorted(plan['indexes'])} "
+                    f"seq_scans={sorted(plan['seq_scans'])} (expected {index})"
+                )
+        finally:
+            db.session.rollback()
+        
+        if failures:
+            raise SystemExit(1)
+
+
+@cli.command('count-task-statements')
+@click.option('--runs', default=5, help='Number of task runs')
+@click.option('--max-commits', default=0, help='Exit non-zero if a run commits more often (0 = report only)')
+def count_task_statements(runs, max_commits):
+    """
+    Count SQL statements and commits of one ``generate_video_task`` run.
+    
+    Uses the mock provider; tasks it dispatches go to an in-memory broker
+    and are not executed. Created rows are deleted afterwards.
+    """
+    import uuid
+    from app.tasks import video_tasks
+    from app.utils.query_plans import count_statements
+    
+    os.environ['AI_VIDEO_PROVIDER'] = 'mock'
+    video_tasks.celery_app.conf.update(broker_url='memory://', result_backend='cache+memory://')
+    
+    app = video_tasks.get_flask_app()
+    app.config.update(VIDEO_CACHE_ENABLED=False, VIDEO_COALESCE_ENABLED=False)
+    
+    with app.app_context():
+        run_id = uuid.uuid4().hex[:8]
+        user = User(email=f'statements-{run_id}@example.com', password_hash='-')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        
+        worst = 0
+        try:
+            for n in range(runs):
+                video = Video(user_id=user_id, prompt=f'statement count {n}', status='pending')
+                db.session.add(video)
+                db.session.flush()
+                task_id = f'statements-{run_id}-{n}'
+                db.session.add(GenerationTask(video_id=video.id, celery_task_id=task_id))
+                db.session.commit()
+                video_id = video.id
+                db.session.remove()
+                
+                with count_statements() as counts:
+                    result = video_tasks.generate_video_task.apply((video_id,), task_id=task_id).get()
+                db.session.remove()
+                
+                commits = counts.pop('commits', 0)
+                worst = max(worst, commits)
+                verbs = ' '.join(f'{verb}={count}' for verb, count in sorted(counts.items()))
+                click.echo(
+                    f"run {n + 1}: {result.get('status')} - {sum(counts.values())} statements "
+                    f"({verbs}), {commits} commits"
+                )
+        finally:
+            video_ids = [row.id for row in db.session.query(Video.id).filter_by(user_id=user_id)]
+            GenerationTask.query.filter(GenerationTask.video_id.in_(video_ids)).delete(synchronize_session=False)
+            Video.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+        
+        if max_commits and worst > max_commits:
+            click.echo(f'FAIL: {worst} commits per run (max {max_commits})')
+            raise SystemExit(1)
+
+
 @cli.command()
 def shell():
     """Open interactive shell with app context."""
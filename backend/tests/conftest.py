@@ -0,0 +1,56 @@
+"""
+Shared test fixtures: an in-memory SQLite app, a fake Redis and an
+in-memory Celery broker.
+"""
+import os
+
+os.environ.setdefault('AI_VIDEO_PROVIDER', 'mock')
+
+import fakeredis
+import pytest
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models import User, Video
+from app.tasks import video_tasks
+from app.utils import redis_client
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    """Process-wide Redis client replaced by an in-memory fake."""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_client, '_redis', client)
+    return client
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """Flask app on in-memory SQLite, also used by the Celery tasks."""
+    monkeypatch.setenv('VIDEO_OUTPUT_DIR', str(tmp_path / 'media'))
+    # PostgreSQL ARRAY column; stored as JSON on SQLite
+    monkeypatch.setattr(Video.__table__.c.seo_tags, 'type', db.JSON())
+    
+    app = create_app(TestingConfig)
+    app.config.update(VIDEO_OUTPUT_DIR=str(tmp_path / 'media'))
+    
+    monkeypatch.setattr(video_tasks, '_flask_app', app)
+    monkeypatch.setattr(video_tasks, '_video_service', None)
+    video_tasks.celery_app.conf.update(broker_url='memory://', result_backend='cache+memory://')
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    """A registered user."""
+    user = User(email='user@example.com')
+    user.set_password('Passw0rd!')
+    db.session.add(user)
+    db.session.commit()
+    return user
@@ -0,0 +1,58 @@
+"""
+Tests for batch video creation.
+"""
+from unittest import mock
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.models import GenerationTask, Video
+
+
+@pytest.fixture
+def post_batch(app, user):
+    token = create_access_token(identity=str(user.id))
+    client = app.test_client()
+    
+    def post(videos):
+        return client.post('/api/videos/batch', json={'videos': videos}, headers={'Authorization': f'Bearer {token}'})
+    
+    return post
+
+
+def test_batch_rejects_invalid_items_by_index(post_batch):
+    valid = {'prompt': 'Waves crashing on a rocky shore'}
+    items = [
+        valid,
+        {'prompt': 'short'},
+        {**valid, 'resolution': '99999x1'},
+        {**valid, 'resolution': 1024},
+        {**valid, 'style': ['cinematic']},
+        {**valid, 'voice_id': 42},
+        {**valid, 'script': {'text': 'hello'}},
+    ]
+    
+    with mock.patch('app.routes.video.group'):
+        response = post_batch(items)
+    
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['created'] == 1
+    assert [result['index'] for result in body['results'] if result['status'] == 'rejected'] == [1, 2, 3, 4, 5, 6]
+    assert Video.query.count() == 1
+
+
+def test_batch_fails_committed_videos_when_queueing_fails(post_batch):
+    with mock.patch('app.routes.video.group') as group:
+        group.return_value.apply_async.side_effect = ConnectionError('broker down')
+        response = post_batch([{'prompt': 'Waves crashing on a rocky shore'}, {'prompt': 'bad'}])
+    
+    assert response.status_code == 503
+    body = response.get_json()
+    assert body['failed'] == 1
+    assert body['results'][0]['status'] == 'failed'
+    assert body['results'][1]['status'] == 'rejected'
+    
+    video = Video.query.one()
+    assert video.status == 'failed'
+    assert GenerationTask.query.filter_by(video_id=video.id).one().status == 'failed'
@@ -0,0 +1,65 @@
+"""
+Tests for cancelling FFmpeg jobs across processes.
+"""
+import threading
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.models import Video
+from app.utils import ffmpeg_scheduler
+from app.utils.ffmpeg_scheduler import CANCEL_KEY, cancel_scope, request_cancel
+from app.utils.ffmpeg_utils import FFmpegProcessor
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setenv('FFMPEG_LOCK_DIR', str(tmp_path / 'slots'))
+    monkeypatch.setattr(ffmpeg_scheduler, '_scheduler', None)
+    processor = FFmpegProcessor()
+    # Commands below are not FFmpeg, so no thread cap is inserted
+    processor.ffmpeg_path = 'ffmpeg'
+    return processor
+
+
+def test_cancel_request_kills_the_running_job(processor):
+    results = []
+    
+    def run():
+        with cancel_scope(7):
+            results.append(processor._run_command(['sleep', '30']))
+    
+    runner = threading.Thread(target=run)
+    started = time.monotonic()
+    runner.start()
+    time.sleep(0.2)
+    request_cancel(7)
+    runner.join(timeout=10)
+    
+    assert not runner.is_alive()
+    assert results == [(-1, '', 'Command cancelled')]
+    assert time.monotonic() - started < 5
+
+
+def test_cancel_request_leaves_other_videos_running(processor):
+    request_cancel(8)
+    
+    with cancel_scope(7):
+        returncode, _, _ = processor._run_command(['sh', '-c', 'sleep 1.5'])
+    
+    assert returncode == 0
+
+
+def test_delete_video_requests_cancellation(app, user, fake_redis):
+    video = Video(user_id=user.id, prompt='A quiet harbour at dawn')
+    db.session.add(video)
+    db.session.commit()
+    video_id = video.id
+    token = create_access_token(identity=str(user.id))
+    
+    response = app.test_client().delete(f'/api/videos/{video_id}', headers={'Authorization': f'Bearer {token}'})
+    
+    assert response.status_code == 200
+    assert fake_redis.exists(CANCEL_KEY.format(video_id))
@@ -0,0 +1,70 @@
+"""
+Tests for keyframe-aligned chunking of parallel encodes.
+"""
+import os
+import shutil
+import subprocess
+from unittest import mock
+
+import pytest
+
+from app.utils import ffmpeg_scheduler
+from app.utils.ffmpeg_utils import FFmpegProcessor
+
+split_points = FFmpegProcessor.split_points
+
+
+def test_split_points_cuts_at_evenly_spaced_keyframes():
+    keyframes = [float(t) for t in range(0, 60, 2)]
+    
+    assert split_points(keyframes, 60, 3) == [20.0, 40.0]
+
+
+def test_split_points_snaps_to_the_nearest_keyframe():
+    assert split_points([0, 7, 19, 33, 45, 58], 60, 3) == [19, 45]
+
+
+def test_split_points_never_cuts_at_the_ends():
+    assert split_points([0, 60], 60, 3) == []
+
+
+def test_split_points_drops_duplicate_cuts():
+    assert split_points([0, 30], 60, 4) == [30]
+
+
+def test_split_points_keeps_short_videos_whole():
+    keyframes = [float(t) for t in range(0, 15)]
+    
+    assert split_points(keyframes, 15, 4) == []
+    assert split_points(keyframes, 15, 4, min_segment_seconds=5) == [5.0, 10.0]
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg not installed')
+def test_optimize_video_parallel_encodes_each_chunk(tmp_path, monkeypatch):
+    monkeypatch.setenv('FFMPEG_LOCK_DIR', str(tmp_path / 'slots'))
+    monkeypatch.setattr(ffmpeg_scheduler, '_scheduler', None)
+    source = str(tmp_path / 'source.mp4')
+    subprocess.run([
+        'ffmpeg', '-y', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=160x90:rate=10:duration=24',
+        '-c:v', 'libx264', '-g', '20', '-keyint_min', '20', '-sc_threshold', '0', source
+    ], check=True)
+    
+    processor = FFmpegProcessor()
+    info = {'duration': 24.0, 'keyframes': [float(t) for t in range(0, 24, 2)]}
+    encodes = []
+    run_command = processor._run_command
+    
+    def record(cmd, *args, **kwargs):
+        if '-crf' in cmd:
+            encodes.append(os.path.basename(cmd[cmd.index('-i') + 1]))
+        return run_command(cmd, *args, **kwargs)
+    
+    output = str(tmp_path / 'out.mp4')
+    with mock.patch.object(processor, 'probe', return_value=info), \
+            mock.patch.object(processor, '_run_command', side_effect=record):
+        assert processor.optimize_video_parallel(source, output, segments=2, preset='ultrafast') == output
+    
+    assert sorted(encodes) == ['chunk_000.mkv', 'chunk_001.mkv']
+    assert os.path.getsize(output) > 0
+    # Work directory is removed
+    assert [name for name in os.listdir(tmp_path) if name.startswith('.encode-')] == []
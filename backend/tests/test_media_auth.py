@@ -0,0 +1,68 @@
+"""
+Tests for media authorization by header and per-video media cookie.
+"""
+import os
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.models import Video
+
+
+@pytest.fixture
+def videos(app, user):
+    """Two of the user's videos, each with a storyboard sprite on disk."""
+    ids = []
+    for _ in range(2):
+        video = Video(user_id=user.id, prompt='A quiet harbour at dawn', status='completed')
+        db.session.add(video)
+        db.session.commit()
+        video_dir = os.path.join(app.config['VIDEO_OUTPUT_DIR'], str(video.id))
+        os.makedirs(video_dir)
+        with open(os.path.join(video_dir, 'storyboard.jpg'), 'wb') as f:
+            f.write(b'sprite')
+        ids.append(video.id)
+    return ids
+
+
+@pytest.fixture
+def token(user):
+    return create_access_token(identity=str(user.id))
+
+
+def test_media_accepts_the_authorization_header(app, videos, token):
+    response = app.test_client().get(f'/api/media/{videos[0]}/storyboard.jpg', headers={'Authorization': f'Bearer {token}'})
+    
+    assert response.status_code == 200
+    assert response.data == b'sprite'
+
+
+def test_media_rejects_tokens_in_the_url(app, videos, token):
+    response = app.test_client().get(f'/api/media/{videos[0]}/storyboard.jpg?jwt={token}')
+    
+    assert response.status_code == 401
+
+
+def test_media_cookie_is_scoped_to_one_video(app, videos, token):
+    client = app.test_client()
+    
+    response = client.post(f'/api/media/{videos[0]}/session', headers={'Authorization': f'Bearer {token}'})
+    
+    assert response.status_code == 200
+    cookie = client.get_cookie('media_token', path=f'/api/media/{videos[0]}/')
+    assert cookie and cookie.http_only
+    
+    # No header: the browser sends the cookie for this video's paths only
+    assert client.get(f'/api/media/{videos[0]}/storyboard.jpg').status_code == 200
+    assert client.get(f'/api/media/{videos[1]}/storyboard.jpg').status_code == 401
+
+
+def test_media_cookie_for_another_video_is_rejected(app, videos, token):
+    client = app.test_client()
+    client.post(f'/api/media/{videos[0]}/session', headers={'Authorization': f'Bearer {token}'})
+    value = client.get_cookie('media_token', path=f'/api/media/{videos[0]}/').value
+    
+    client.set_cookie('media_token', value, path=f'/api/media/{videos[1]}/')
+    
+    assert client.get(f'/api/media/{videos[1]}/storyboard.jpg').status_code == 401
@@ -0,0 +1,44 @@
+"""
+Tests for the SSE progress stream.
+"""
+from unittest import mock
+
+import redis
+
+from app.services.progress_events import ProgressEvents
+
+
+def test_events_published_before_the_snapshot_are_delivered(app):
+    events = ProgressEvents(heartbeat=1, max_lifetime=2)
+    
+    pubsub = events.subscribe(video_id=1)
+    # Committed after subscribing but before the snapshot was read
+    events.publish({'video_id': 1, 'status': 'completed'})
+    messages = list(events.stream(pubsub, {'video_id': 1, 'status': 'processing'}, video_id=1))
+    
+    assert messages[1].startswith('event: snapshot')
+    assert messages[-1].startswith('event: progress')
+    assert '"completed"' in messages[-1]
+
+
+def test_stream_ends_cleanly_on_redis_errors(app):
+    events = ProgressEvents()
+    pubsub = mock.Mock()
+    pubsub.get_message.side_effect = redis.ConnectionError('gone')
+    
+    messages = list(events.stream(pubsub, {'video_id': 1, 'status': 'processing'}, video_id=1))
+    
+    assert len(messages) == 2  # retry hint and snapshot
+    pubsub.close.assert_called_once()
+
+
+def test_stream_sends_the_snapshot_when_redis_is_down(app):
+    events = ProgressEvents()
+    
+    with mock.patch.object(events.redis, 'pubsub') as pubsub:
+        pubsub.return_value.subscribe.side_effect = redis.ConnectionError('down')
+        assert events.subscribe(user_id=1) is None
+    
+    messages = list(events.stream(None, {'videos': []}))
+    
+    assert messages == ['retry: 3000\n\n', 'event: snapshot\ndata: {"videos": []}\n\n']
@@ -0,0 +1,70 @@
+"""
+Tests for query plan inspection of the hot video queries (SQLite planner).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, tuple_
+
+from app.extensions import db
+from app.models import GenerationTask, User, Video
+from app.utils.query_plans import explain
+
+KEYSET_ORDER = (Video.created_at.desc(), Video.id.desc())
+
+
+@pytest.fixture
+def seeded(app):
+    """A few users with enough videos and tasks for the planner to prefer indexes."""
+    db.session.execute(insert(User), [
+        {'email': f'plan-{i}@example.com', 'password_hash': '-'} for i in range(5)
+    ])
+    user_ids = [user.id for user in User.query.all()]
+    
+    base = datetime.utcnow()
+    statuses = ('completed', 'completed', 'failed', 'processing')
+    db.session.execute(insert(Video), [
+        {
+            'user_id': user_id,
+            'prompt': 'plan',
+            'status': statuses[i % len(statuses)],
+            'created_at': base - timedelta(minutes=i)
+        }
+        for user_id in user_ids
+        for i in range(50)
+    ])
+    db.session.execute(insert(GenerationTask), [
+        {'video_id': video_id, 'celery_task_id': f'plan-{video_id}', 'created_at': base}
+        for (video_id,) in db.session.query(Video.id)
+    ])
+    db.session.execute(db.text('ANALYZE'))
+    
+    return user_ids[2]
+
+
+@pytest.mark.parametrize('label, index, build', [
+    ('list videos', 'ix_videos_user_created',
+     lambda user_id: Video.query.filter_by(user_id=user_id).order_by(*KEYSET_ORDER).limit(21)),
+    ('list videos by status', 'ix_videos_user_status_created',
+     lambda user_id: Video.query.filter_by(user_id=user_id, status='failed').order_by(*KEYSET_ORDER).limit(21)),
+    ('list videos after cursor', 'ix_videos_user_created',
+     lambda user_id: Video.query.filter_by(user_id=user_id)
+     .filter(tuple_(Video.created_at, Video.id) < (datetime.utcnow(), 10 ** 6))
+     .order_by(*KEYSET_ORDER).limit(21)),
+    ('task by celery id', 'ix_generation_tasks_celery_task_id',
+     lambda user_id: GenerationTask.query.filter_by(celery_task_id='plan-1')),
+    ('latest task of video', 'ix_generation_tasks_video_created',
+     lambda user_id: GenerationTask.query.filter_by(video_id=1).order_by(GenerationTask.created_at.desc()).limit(1)),
+])
+def test_hot_queries_use_their_indexes(seeded, label, index, build):
+    plan = explain(build(seeded))
+    
+    assert index in plan['indexes'], label
+    assert not plan['seq_scans'], label
+
+
+def test_explain_reports_full_table_scans(seeded):
+    plan = explain(Video.query.filter_by(prompt='plan'))
+    
+    assert plan['seq_scans'] == {'videos'}
+    assert not plan['indexes']
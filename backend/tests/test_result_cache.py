@@ -0,0 +1,48 @@
+"""
+Tests for storing finished generations in the result cache.
+"""
+import os
+
+from app.extensions import db
+from app.models import GenerationTask, Video
+from app.services.result_cache import VideoResultCache
+from app.tasks import video_tasks
+
+
+def test_cache_video_result_links_the_archived_source(app, user):
+    video_dir = os.path.join(app.config['VIDEO_OUTPUT_DIR'], '1')
+    os.makedirs(video_dir)
+    source_path = os.path.join(video_dir, 'source.mp4')
+    with open(source_path, 'wb') as f:
+        f.write(b'provider output')
+    
+    video = Video(user_id=user.id, prompt='A quiet harbour at dawn', status='completed')
+    db.session.add(video)
+    db.session.flush()
+    task_record = GenerationTask(
+        video_id=video.id,
+        celery_task_id='cache-task',
+        fingerprint='f' * 64,
+        provider='mock',
+        output_path=source_path
+    )
+    db.session.add(task_record)
+    db.session.commit()
+    
+    result = video_tasks.cache_video_result.apply((task_record.id,)).get()
+    
+    assert result['size_bytes'] == len(b'provider output')
+    entry = VideoResultCache.from_config(app.config).lookup('f' * 64)
+    # Same file, not a second download
+    assert os.path.samefile(entry.file_path, source_path)
+
+
+def test_cache_video_result_skips_tasks_without_a_local_source(app, user):
+    video = Video(user_id=user.id, prompt='A quiet harbour at dawn', status='completed')
+    db.session.add(video)
+    db.session.flush()
+    task_record = GenerationTask(video_id=video.id, celery_task_id='cache-task', fingerprint='f' * 64)
+    db.session.add(task_record)
+    db.session.commit()
+    
+    assert video_tasks.cache_video_result.apply((task_record.id,)).get() == {'error': 'No local output to cache'}
@@ -0,0 +1,52 @@
+"""
+Tests for SQL statement and commit counting around generation tasks.
+"""
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import GenerationTask, Video
+from app.tasks import video_tasks
+from app.utils.query_plans import count_statements
+
+
+def test_count_statements_counts_by_verb_and_commits(app, user):
+    user_id = user.id
+    
+    with count_statements() as counts:
+        db.session.execute(select(Video.id)).all()
+        db.session.add(Video(user_id=user_id, prompt='counted'))
+        db.session.commit()
+    
+    assert counts['SELECT'] == 1
+    assert counts['INSERT'] == 1
+    assert counts['commits'] == 1
+
+
+def test_count_statements_stops_counting_after_the_block(app, user):
+    with count_statements() as counts:
+        pass
+    db.session.execute(select(Video.id)).all()
+    
+    assert sum(counts.values()) == 0
+
+
+def test_generate_video_task_commits_once_per_stage(app, user):
+    app.config.update(VIDEO_CACHE_ENABLED=False, VIDEO_COALESCE_ENABLED=False)
+    video = Video(user_id=user.id, prompt='statement count', status='pending')
+    db.session.add(video)
+    db.session.flush()
+    db.session.add(GenerationTask(video_id=video.id, celery_task_id='count-task'))
+    db.session.commit()
+    video_id = video.id
+    db.session.remove()
+    
+    with count_statements() as counts:
+        result = video_tasks.generate_video_task.apply((video_id,), task_id='count-task').get()
+    
+    assert result['status'] == 'processing'
+    # 'started' (status, branch counter, keys) and 'submitted' (prompt, provider task)
+    assert counts['commits'] == 2
+    # Video and task loads plus one UPDATE per table per stage; more means per-field writes crept back
+    assert counts['SELECT'] <= 4
+    assert counts['INSERT'] + counts['UPDATE'] + counts['DELETE'] <= 4
+    assert sum(n for verb, n in counts.items() if verb != 'commits') <= 8
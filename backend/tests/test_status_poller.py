@@ -0,0 +1,100 @@
+"""
+Tests for the batched status poller cycle.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from app.extensions import db
+from app.models import GenerationTask, Video
+from app.services.status_poller import StatusPoller
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def _poll(poller, loop, rows, now=None):
+    """Run one cycle over ``rows`` and return (checked predictions, applied results)."""
+    checked, applied = [], []
+    
+    async def check_many(predictions):
+        checked.extend(predictions)
+        return [{'task_id': task_id, 'status': 'processing'} for _, task_id in predictions]
+    
+    def apply(results):
+        applied.extend(results)
+        return {'completed': [], 'failed': []}
+    
+    with mock.patch.object(poller, 'load_in_flight', return_value=rows), \
+            mock.patch.object(poller, 'check_many', side_effect=check_many), \
+            mock.patch('app.tasks.video_tasks.apply_provider_results', side_effect=apply), \
+            mock.patch('app.services.status_poller.datetime', wraps=datetime) as clock:
+        if now:
+            clock.utcnow.return_value = now
+        poller.poll_once(loop)
+    
+    return checked, applied
+
+
+def test_load_in_flight_only_returns_submitted_processing_tasks(app, user):
+    video = Video(user_id=user.id, prompt='a', status='processing')
+    db.session.add(video)
+    db.session.flush()
+    db.session.add_all([
+        GenerationTask(video_id=video.id, celery_task_id='a', status='processing', provider_task_id='p-a'),
+        GenerationTask(video_id=video.id, celery_task_id='b', status='processing'),
+        GenerationTask(video_id=video.id, celery_task_id='c', status='completed', provider_task_id='p-c'),
+        GenerationTask(video_id=video.id, celery_task_id='d', status='finalizing', provider_task_id='p-d'),
+    ])
+    db.session.commit()
+    
+    assert [row[1] for row in StatusPoller().load_in_flight(100)] == ['p-a']
+
+
+def test_poll_once_fails_timed_out_predictions_without_checking_them(app, loop):
+    now = datetime.utcnow()
+    rows = [
+        ('mock', 'stale', now - timedelta(seconds=app.config['VIDEO_POLL_TIMEOUT'] + 60)),
+        ('mock', 'fresh', now - timedelta(seconds=10)),
+        (None, 'default-provider', now),
+    ]
+    
+    checked, applied = _poll(StatusPoller(), loop, rows, now)
+    
+    assert checked == [('mock', 'fresh'), (app.config['AI_VIDEO_PROVIDER'], 'default-provider')]
+    assert {'task_id': 'stale', 'status': 'failed', 'error': 'Generation timed out'} in applied
+
+
+def test_poll_once_with_webhooks_checks_each_prediction_once_per_fallback_interval(app, loop):
+    app.config.update(
+        REPLICATE_WEBHOOK_URL='https://example.com/hook',
+        VIDEO_WEBHOOK_FALLBACK_INTERVAL=300,
+        VIDEO_POLL_TIMEOUT=3600
+    )
+    now = datetime.utcnow()
+    rows = [
+        ('mock', 'missed', now - timedelta(seconds=400)),
+        ('mock', 'recent', now - timedelta(seconds=30)),
+    ]
+    poller = StatusPoller()
+    
+    assert _poll(poller, loop, rows, now)[0] == [('mock', 'missed')]
+    assert _poll(poller, loop, rows, now + timedelta(seconds=5))[0] == []
+    assert _poll(poller, loop, rows, now + timedelta(seconds=301))[0] == [('mock', 'missed'), ('mock', 'recent')]
+
+
+def test_poll_once_forgets_predictions_that_left_flight(app, loop):
+    app.config.update(REPLICATE_WEBHOOK_URL='https://example.com/hook', VIDEO_WEBHOOK_FALLBACK_INTERVAL=300)
+    now = datetime.utcnow()
+    poller = StatusPoller()
+    
+    _poll(poller, loop, [('mock', 'done', now - timedelta(seconds=400))], now)
+    _poll(poller, loop, [], now)
+    
+    assert poller.next_check == {}
@@ -0,0 +1,41 @@
+"""
+Tests for per-process setup after the Celery prefork pool forks a child.
+"""
+from unittest import mock
+
+import requests
+
+from app.extensions import db
+from app.services.ai_provider_service import AIProviderService
+from app.services.text_to_video_service import TextToVideoService
+from app.tasks import video_tasks
+from app.utils import http_client
+
+
+def test_init_worker_process_replaces_inherited_clients(app, monkeypatch):
+    monkeypatch.setattr(http_client, '_session', None)
+    inherited_service = video_tasks.get_video_service()
+    inherited_session = http_client.get_session()
+    monkeypatch.setitem(AIProviderService._video_providers, 'inherited', object())
+    monkeypatch.setitem(AIProviderService._openai_clients, 'inherited', object())
+    
+    with mock.patch.object(db.engine, 'dispose') as dispose, \
+            mock.patch.object(requests.Session, 'close') as close:
+        video_tasks.init_worker_process()
+    
+    dispose.assert_called_once_with(close=False)
+    close.assert_called_once_with()
+    assert http_client._session is None
+    assert 'inherited' not in AIProviderService._video_providers
+    assert 'inherited' not in AIProviderService._openai_clients
+    
+    # A fresh service is created eagerly and reused afterwards
+    service = video_tasks._video_service
+    assert isinstance(service, TextToVideoService)
+    assert service is not inherited_service
+    assert video_tasks.get_video_service() is service
+    assert http_client.get_session() is not inherited_session
+
+
+def test_get_video_service_is_created_once_per_process(app):
+    assert video_tasks.get_video_service() is video_tasks.get_video_service()